@@ -35,20 +35,30 @@ class ConfigManager:
                 "connect_timeout_seconds": 10,
                 "read_timeout_seconds": 120,
                 "chunk_size": 8192,
-                "verify_downloads": False
+                "verify_downloads": False,
+                "segment_count": 8,
+                "segment_min_file_mb": 16,
+                "segment_retries": 3,
+                "pool_connections": 10,
+                "pool_maxsize": 32,
+                "pool_idle_timeout_seconds": 120
             },
             "scraping": {
                 "start_from_last_page": True,
                 "pages_per_batch": 10,
                 "wait_time_ms": 1000,
                 "max_concurrent_pages": 5,
-                "skip_existing_files": True
+                "skip_existing_files": True,
+                "session_state_file": "selenium_session_state.json",
+                "session_state_max_age_hours": 24
             },
             "storage": {
                 "create_subdirectories": True,
                 "compress_json": False,
                 "backup_progress": True,
-                "cleanup_incomplete": False
+                "cleanup_incomplete": False,
+                "ledger_scan_workers": 8,
+                "ledger_reconcile_seconds": 600
             },
             "logging": {
                 "log_level": "INFO",
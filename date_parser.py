@@ -1,21 +1,99 @@
 import re
+import time
 import logging
+from functools import lru_cache
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import dateutil.parser
 
+# Relative date patterns, tried in this order (compiled once per process)
+RELATIVE_PATTERNS = [
+    (re.compile(r'(\d+)\s*(?:days?|d)\s*ago'), 'days'),
+    (re.compile(r'(\d+)\s*(?:weeks?|w)\s*ago'), 'weeks'),
+    (re.compile(r'(\d+)\s*(?:months?|mon)\s*ago'), 'months'),
+    (re.compile(r'(\d+)\s*(?:years?|y)\s*ago'), 'years'),
+    (re.compile(r'(\d+)\s*(?:hours?|h)\s*ago'), 'hours'),
+    (re.compile(r'(\d+)\s*(?:minutes?|min|m)\s*ago'), 'minutes'),
+    (None, 'yesterday'),
+    (None, 'today'),
+]
+
+ABSOLUTE_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%d %B %Y",
+    "%d %b %Y"
+)
+
+# Quick shape check so strptime only runs on text that can be a date
+_ABSOLUTE_DATE_SHAPE = re.compile(r'^\d{1,4}[-/ ]|^[a-z]+ \d')
+
+
 class DateParser:
-    def __init__(self):
+    def __init__(self, cache_size=1024, time_bucket_seconds=60):
+        """
+        Args:
+            cache_size: Distinct (text, time bucket) results kept in the LRU cache
+            time_bucket_seconds: Relative dates ("2 days ago") are cached for this
+                long, so a cached epoch is at most this much older than a fresh one
+        """
         self.logger = logging.getLogger('Rule34Scraper')
+        self.time_bucket_seconds = max(1, int(time_bucket_seconds))
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse_normalized)
+    
+    @staticmethod
+    def normalize(upload_date_text):
+        """Cache key form of a date string: lowercased, whitespace collapsed"""
+        return " ".join(upload_date_text.split()).lower()
+    
+    def _time_bucket(self):
+        return int(time.time() // self.time_bucket_seconds)
     
     def parse_upload_date_to_epoch(self, upload_date_text):
         """Convert various date formats to epoch milliseconds"""
         if not upload_date_text or not upload_date_text.strip():
             return None
         
+        return self._parse_cached(self.normalize(upload_date_text), self._time_bucket())
+    
+    def parse_many(self, upload_date_texts):
+        """
+        Convert a batch of date strings (e.g. a whole listing page) to epoch milliseconds.
+        
+        Identical strings are parsed once and every string in the batch is
+        resolved against the same time bucket.
+        
+        Returns:
+            List of epoch milliseconds (or None) in input order
+        """
+        bucket = self._time_bucket()
+        resolved = {}
+        results = []
+        for upload_date_text in upload_date_texts:
+            if not upload_date_text or not upload_date_text.strip():
+                results.append(None)
+                continue
+            
+            key = self.normalize(upload_date_text)
+            if key not in resolved:
+                resolved[key] = self._parse_cached(key, bucket)
+            results.append(resolved[key])
+        return results
+    
+    def cache_info(self):
+        """Hit/miss statistics of the parse cache"""
+        return self._parse_cached.cache_info()
+    
+    def clear_cache(self):
+        self._parse_cached.cache_clear()
+    
+    def _parse_normalized(self, upload_date_text, time_bucket):
+        """Uncached parse of normalized text (time_bucket only keys the cache)"""
         try:
             current_time = datetime.now()
-            upload_date_text = upload_date_text.strip().lower()
             
             # Try relative date parsing first
             epoch_time = self.parse_relative_date(upload_date_text, current_time)
@@ -38,18 +116,7 @@ class DateParser:
     def parse_relative_date(self, upload_date_text, current_time):
         """Handle relative dates like '5 days ago', '2 weeks ago'"""
         try:
-            relative_patterns = [
-                (r'(\d+)\s*(?:days?|d)\s*ago', 'days'),
-                (r'(\d+)\s*(?:weeks?|w)\s*ago', 'weeks'),
-                (r'(\d+)\s*(?:months?|mon)\s*ago', 'months'),
-                (r'(\d+)\s*(?:years?|y)\s*ago', 'years'),
-                (r'(\d+)\s*(?:hours?|h)\s*ago', 'hours'),
-                (r'(\d+)\s*(?:minutes?|min|m)\s*ago', 'minutes'),
-                (r'yesterday', 'yesterday'),
-                (r'today', 'today'),
-            ]
-            
-            for pattern, time_unit in relative_patterns:
+            for pattern, time_unit in RELATIVE_PATTERNS:
                 if time_unit == 'yesterday':
                     if 'yesterday' in upload_date_text:
                         upload_date = current_time - timedelta(days=1)
@@ -58,7 +125,7 @@ class DateParser:
                     if 'today' in upload_date_text:
                         return int(current_time.timestamp() * 1000)
                 else:
-                    match = re.search(pattern, upload_date_text)
+                    match = pattern.search(upload_date_text)
                     if match:
                         amount = int(match.group(1))
                         if time_unit == 'days':
@@ -83,17 +150,10 @@ class DateParser:
     def parse_absolute_date(self, upload_date_text):
         """Handle absolute date formats like '2023-01-15'"""
         try:
-            date_formats = [
-                "%Y-%m-%d",
-                "%m/%d/%Y",
-                "%d/%m/%Y",
-                "%B %d, %Y",
-                "%b %d, %Y",
-                "%d %B %Y",
-                "%d %b %Y"
-            ]
+            if not _ABSOLUTE_DATE_SHAPE.match(upload_date_text):
+                return None
             
-            for fmt in date_formats:
+            for fmt in ABSOLUTE_DATE_FORMATS:
                 try:
                     parsed_date = datetime.strptime(upload_date_text, fmt)
                     return int(parsed_date.timestamp() * 1000)
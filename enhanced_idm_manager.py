@@ -25,6 +25,8 @@ import re
 from urllib.parse import urljoin
 import logging
 
+from web_driver_manager import DETAIL_READY_SELECTORS
+
 class EnhancedIDMManager:
     """
     Enhanced IDM Manager that handles both video parsing and downloading.
@@ -162,8 +164,8 @@ class EnhancedIDMManager:
                 self.logger.error(f"Failed to navigate to video page: {video_url}")
                 return None
 
-            # Wait for page to load
-            time.sleep(3)
+            # Wait for the video player or metadata instead of a fixed delay
+            self.web_driver_manager.wait_until_ready(DETAIL_READY_SELECTORS, label="detail_ready")
 
             video_data = {
                 "video_id": video_id,
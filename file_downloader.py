@@ -12,13 +12,13 @@ import asyncio
 from pathlib import Path
 from urllib.parse import urlparse
 from typing import Optional, Callable, Dict, Any, List
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from idm_downloader import IDMDownloader
 from file_validator import FileValidator
-
-# Retry utilities
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from new.segmented_downloader import PART_SUFFIX, STATE_SUFFIX, SegmentedDownloader
+from new.session_registry import get_session_registry
+from new.storage_ledger import get_storage_ledger
 
 class FileDownloader:
     """
@@ -55,6 +55,9 @@ class FileDownloader:
         self.max_storage_gb = self.config.get("general", {}).get("max_storage_gb", 100)
         self.max_storage_bytes = self.max_storage_gb * 1024**3
         
+        # Running usage of the download tree (scanned once, then updated as files are written)
+        self.storage_ledger = get_storage_ledger(download_path, self.config)
+        
         # Check download method and IDM availability
         self.download_method = self.config.get("download", {}).get("download_method", "direct")
         if self.download_method == "idm":
@@ -65,6 +68,16 @@ class FileDownloader:
                 self.logger.error("IDM download method selected but IDM is not available!")
                 self.logger.error(f"Please install IDM or check path: {self.idm_downloader.idm_path}")
         
+        # Process-wide per-host sessions: connections are reused across files and downloader instances
+        self.session_registry = get_session_registry(self.config)
+        
+        # Native multi-connection downloads for videos (portable alternative to IDM)
+        self.segmented_downloader = None
+        if self.download_method == "segmented":
+            self.segmented_downloader = SegmentedDownloader.from_config(
+                self.config, headers=self._get_headers(), session_lease=self.session_registry.lease)
+            self.logger.info(f"Segmented download method selected ({self.segmented_downloader.segments} connections per video)")
+        
         self.logger.info("FileDownloader initialized successfully with file_validator and thread safety")
     
     def get_thread_name(self):
@@ -89,15 +102,9 @@ class FileDownloader:
         self.logger.warning(f"[{thread_name}] {message}")
     
     def _check_storage_space_before_download(self, expected_size_bytes=None):
-        """Check if we have enough storage space before starting download"""
+        """Check if we have enough storage space before starting download (O(1) ledger lookup)"""
         try:
-            download_path = self.config.get("general", {}).get("download_path", "C:\\scraper_downloads\\")
-            current_usage = 0
-            for dirpath, dirnames, filenames in os.walk(download_path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        current_usage += os.path.getsize(filepath)
+            current_usage = self.storage_ledger.usage_bytes()
             
             # If we have expected size, check if it would exceed limit
             if expected_size_bytes:
@@ -190,7 +197,8 @@ class FileDownloader:
         """
         try:
             h = self._get_headers()
-            r = requests.head(url, headers=h, allow_redirects=True, timeout=timeout)
+            with self.session_registry.lease(url) as session:
+                r = session.head(url, headers=h, allow_redirects=True, timeout=timeout)
             if r.status_code == 200:
                 cl = r.headers.get('Content-Length') or r.headers.get('content-length')
                 if cl and cl.isdigit():
@@ -265,13 +273,19 @@ class FileDownloader:
             
             # Choose download method based on configuration
             download_method = self.config.get("download", {}).get("download_method", "direct")
-            if download_method == "idm":
-                success = self._idm_download(url, filepath, progress_callback=progress_callback)
-            else:
-                success = self._requests_stream_download(url, filepath, progress_callback=progress_callback)
+            with self._track_storage(filepath):
+                if download_method == "idm":
+                    success = self._idm_download(url, filepath, progress_callback=progress_callback)
+                elif download_method == "segmented" and file_type == "video":
+                    success = self._segmented_download(url, filepath, progress_callback=progress_callback)
+                else:
+                    success = self._requests_stream_download(url, filepath, progress_callback=progress_callback)
             
             if success:
                 self.log_info(f"{file_type.title()} download completed successfully: {filepath.name}")
+                stats = self.session_registry.get_stats()
+                self.logger.debug(f"Connection reuse: {stats['reused_connections']} reused / "
+                                  f"{stats['new_connections']} new ({stats['active_hosts']} hosts)")
             else:
                 self.log_error(f"{file_type.title()} download failed: {filepath.name}")
             
@@ -281,6 +295,17 @@ class FileDownloader:
             self.log_error(f"Unexpected error in download_file for {file_type} {filepath.name}: {e}")
             return False
 
+    @contextmanager
+    def _track_storage(self, filepath: Path):
+        """Apply the size change of a download (final file and its temp files) to the storage ledger"""
+        paths = [filepath.with_name(filepath.name + suffix) for suffix in (".part", PART_SUFFIX, STATE_SUFFIX)]
+        with self.storage_ledger.track(filepath, *paths) as tracker:
+            self._local.storage_tracker = tracker
+            try:
+                yield tracker
+            finally:
+                self._local.storage_tracker = None
+
     def _idm_download(self, url: str, filepath: Path, progress_callback: Optional[Callable]=None) -> bool:
         """
         Download file using IDM with proper queue management.
@@ -324,6 +349,58 @@ class FileDownloader:
         self.log_error(f"All IDM download attempts failed for {filepath.name}")
         return False
 
+    def _segmented_download(self, url: str, filepath: Path, progress_callback: Optional[Callable]=None) -> bool:
+        """
+        Download a video over concurrent byte ranges (download_method "segmented").
+        Falls back to the streaming download when the server cannot serve ranges.
+        """
+        if self.segmented_downloader is None:
+            self.segmented_downloader = SegmentedDownloader.from_config(
+                self.config, headers=self._get_headers(), session_lease=self.session_registry.lease)
+        
+        last_update = [0.0]
+        
+        def on_progress(done: int, total: int):
+            # Throttled like the streaming download (segments report from several threads)
+            current_time = time.time()
+            if current_time - last_update[0] < 1.0 and done < total:
+                return
+            last_update[0] = current_time
+            percent = min(100.0, done / total * 100.0)
+            self._show_progress_bar(filepath.name, percent, total / (1024 * 1024))
+            if progress_callback:
+                try:
+                    progress_callback(str(filepath), percent)
+                except Exception:
+                    pass
+        
+        # Segments lease the host's session per request; this lease keeps it (and its warm
+        # connections) across segment retries and backoffs
+        with self.session_registry.lease(url):
+            result = self.segmented_downloader.download(url, filepath, progress_callback=on_progress)
+        if result.fallback:
+            self.log_info(f"Segmented download not possible, streaming instead: {filepath.name}")
+            return self._requests_stream_download(url, filepath, progress_callback=progress_callback)
+        
+        if not result.success:
+            self._clear_progress_line()
+            self.log_error(f"Segmented download failed for {filepath.name}: {result.error} "
+                           f"(progress kept for resume)")
+            return False
+        
+        if self.verify_download_integrity(filepath):
+            self.log_info(f"Successfully downloaded: {filepath.name} ({result.segments} segments, "
+                          f"{result.segment_retries} segment retries, {result.resumed_bytes} bytes resumed)")
+            return True
+        
+        self._clear_progress_line()
+        self.log_warning(f"Downloaded file failed integrity check: {filepath.name}")
+        try:
+            filepath.unlink(missing_ok=True)
+        except Exception:
+            pass
+        return False
+
     # ------------------------
     # requests streaming download with storage monitoring - THREAD SAFE
     # ------------------------
@@ -332,7 +409,15 @@ class FileDownloader:
                                 progress_callback: Optional[Callable[[str, float], None]] = None) -> bool:
         """
         Stream file via requests with storage monitoring during download (THREAD SAFE)
+
+        The host's session is leased for the whole transfer, so the idle
+        eviction in the session registry cannot close it mid-stream.
         """
+        with self.session_registry.lease(url) as session:
+            return self._stream_with_session(session, url, filepath, progress_callback)
+
+    def _stream_with_session(self, session, url: str, filepath: Path,
+                             progress_callback: Optional[Callable[[str, float], None]]) -> bool:
         headers_base = self._get_headers()
         download_conf = self.config.get("download", {})
         
@@ -342,23 +427,10 @@ class FileDownloader:
         connect_timeout = int(download_conf.get("connect_timeout_seconds", 30) or 30)
         read_timeout = int(download_conf.get("read_timeout_seconds", 300) or 300)
         
-        session = requests.Session()
-        
-        # Configure more aggressive retries
-        retry_strategy = Retry(
-            total=5,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET", "HEAD"],
-            backoff_factor=2,
-            respect_retry_after_header=True
-        )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=20, pool_block=True)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-        
         tmp_path = filepath.with_suffix(filepath.suffix + ".part")
         self._ensure_parent(tmp_path)
+        # Live byte counts for the storage ledger (set by download_file)
+        tracker = getattr(self._local, 'storage_tracker', None)
         
         attempt = 0
         while attempt <= max_retries:
@@ -388,6 +460,8 @@ class FileDownloader:
                     # If server responded 200 while we requested Range, restart from scratch
                     if existing > 0 and r.status_code == 200:
                         self.log_info(f"Server doesn't support resume, restarting download for {filepath.name}")
+                        if tracker:
+                            tracker.add(-existing)
                         existing = 0
                         mode = 'wb'
                     
@@ -409,6 +483,8 @@ class FileDownloader:
                             if chunk:
                                 f.write(chunk)
                                 downloaded += len(chunk)
+                                if tracker:
+                                    tracker.add(len(chunk))
                                 
                                 # Check storage limit every 10 seconds during download
                                 current_time = time.time()
@@ -558,7 +634,7 @@ class FileDownloader:
                 else:
                     file_size = thumbnail_path.stat().st_size if thumbnail_path.exists() else 0
                     self.log_warning(f"Thumbnail too small ({file_size} bytes, minimum {min_thumb_size}), removing: {thumbnail_path.name}")
-                    thumbnail_path.unlink(missing_ok=True)
+                    self.storage_ledger.discard(thumbnail_path)
                     return False
                     
             except Exception as e:
@@ -684,4 +760,8 @@ class FileDownloader:
                 return filepath.stat().st_size / (1024 * 1024)
             return 0.0
         except Exception:
-            return 0.0
\ No newline at end of file
+            return 0.0
+
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Connection reuse across all downloads in this process (new vs reused connections)"""
+        return self.session_registry.get_stats()
\ No newline at end of file
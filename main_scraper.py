@@ -546,6 +546,15 @@ class VideoScraper:
             
     async def run_backwards_scrape(self, start_page):
         """Run scrape from high page numbers going backwards to page 1 + FORCE STOP SUPPORT"""
+        # Keep the Crawl4AI browsers warm for the whole scrape
+        await self.video_info_extractor.start()
+        try:
+            await self._run_backwards_scrape(start_page)
+        finally:
+            await self.video_info_extractor.close()
+
+    async def _run_backwards_scrape(self, start_page):
+        """Backwards page loop run inside the extractor's crawler lifecycle"""
         current_page = start_page
         self.logger.info(f"STARTING BACKWARDS SCRAPE")
         self.logger.info(f"Begin page: {start_page}")
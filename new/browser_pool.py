@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Browser Pool Module
+
+Long-lived Playwright browser pool shared by the parsing components.
+Keeps one Chromium per worker with a fixed set of reusable contexts and
+pages, health-checks pages before handing them out and recycles them
+after a configurable number of navigations.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+import logging
+
+from playwright.async_api import async_playwright
+
+from resource_blocker import ResourceBlockPolicy
+from session_state import SessionStateStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledPage:
+    """A reusable page slot inside the pool."""
+    slot_id: int
+    context_index: int
+    page: Any = None
+    navigations: int = 0
+    mode: Optional[str] = None
+
+
+class BrowserPool:
+    """Owns one Chromium instance and a set of reusable contexts and pages."""
+
+    def __init__(self, contexts: int = 2, pages_per_context: int = 2,
+                 max_navigations_per_page: int = 50, headless: bool = True,
+                 user_agent: Optional[str] = None,
+                 launch_args: Optional[List[str]] = None,
+                 resource_policy: Optional[ResourceBlockPolicy] = None,
+                 session_store: Optional[SessionStateStore] = None):
+        """
+        Initialize browser pool.
+
+        Args:
+            contexts: Number of browser contexts to keep open
+            pages_per_context: Number of reusable pages per context
+            max_navigations_per_page: Recycle a page after this many leases
+            headless: Run Chromium headless
+            user_agent: Optional user agent for every context
+            launch_args: Extra Chromium command line arguments
+            resource_policy: Request blocking policy installed on every page
+            session_store: Saved age-gate session loaded into every context
+        """
+        self.context_count = max(1, contexts)
+        self.pages_per_context = max(1, pages_per_context)
+        self.max_navigations_per_page = max(1, max_navigations_per_page)
+        self.headless = headless
+        self.user_agent = user_agent
+        self.launch_args = launch_args or []
+        self.resource_policy = resource_policy
+        self.session_store = session_store
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: List[Any] = []
+        self._slots: List[PooledPage] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._restart_lock: Optional[asyncio.Lock] = None
+        self._started = False
+
+        self.stats = {
+            "leases": 0,
+            "pages_recycled": 0,
+            "contexts_recreated": 0,
+            "browser_restarts": 0,
+            "health_check_failures": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "BrowserPool":
+        """
+        Build a pool from the ``browser_pool`` section of config.json.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            Configured BrowserPool (not yet started)
+        """
+        config = config or {}
+        pool_config = config.get("browser_pool", {})
+        return cls(
+            contexts=pool_config.get("contexts", 2),
+            pages_per_context=pool_config.get("pages_per_context", 2),
+            max_navigations_per_page=pool_config.get("max_navigations_per_page", 50),
+            headless=pool_config.get("headless", True),
+            user_agent=config.get("general", {}).get("user_agent"),
+            launch_args=pool_config.get("launch_args", []),
+            resource_policy=ResourceBlockPolicy.from_config(config),
+            session_store=SessionStateStore.from_config(config)
+        )
+
+    @property
+    def size(self) -> int:
+        """Total number of page slots in the pool."""
+        return self.context_count * self.pages_per_context
+
+    @property
+    def is_started(self) -> bool:
+        """True once the browser and page slots are ready."""
+        return self._started
+
+    async def start(self) -> None:
+        """Launch the browser and warm up all contexts and pages."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._started:
+                return
+
+            logger.info(f"Starting browser pool: {self.context_count} contexts x "
+                        f"{self.pages_per_context} pages")
+
+            try:
+                self._playwright = await async_playwright().start()
+                await self._launch_browser()
+
+                self._idle = asyncio.Queue()
+                self._restart_lock = asyncio.Lock()
+                self._slots = []
+                for context_index in range(self.context_count):
+                    for _ in range(self.pages_per_context):
+                        slot = PooledPage(slot_id=len(self._slots), context_index=context_index)
+                        await self._new_page(slot)
+                        self._slots.append(slot)
+                        self._idle.put_nowait(slot)
+            except Exception:
+                logger.error("Browser pool startup failed, releasing partial resources")
+                await self._teardown()
+                raise
+
+            self._started = True
+            logger.info(f"Browser pool ready with {self.size} pages")
+
+    async def close(self) -> None:
+        """Close every page, context and the browser."""
+        if self._started:
+            logger.info(f"Closing browser pool (stats: {self.stats})")
+        self._started = False
+        await self._teardown()
+
+        # Locks bind to the loop they were first used on; the orchestrator
+        # runs each batch in a fresh asyncio.run, so drop them here.
+        self._start_lock = None
+        self._restart_lock = None
+
+    async def _teardown(self) -> None:
+        """Close whatever contexts, browser and driver currently exist."""
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Error closing context: {e}")
+
+        try:
+            if self._browser:
+                await self._browser.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser: {e}")
+
+        try:
+            if self._playwright:
+                await self._playwright.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping playwright: {e}")
+
+        self._contexts = []
+        self._slots = []
+        self._idle = None
+        self._browser = None
+        self._playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def page(self, mode: Optional[str] = None) -> AsyncIterator[Any]:
+        """
+        Lease a healthy page from the pool.
+
+        The pool is started lazily on first use. Each lease counts as one
+        navigation towards ``max_navigations_per_page``.
+
+        Args:
+            mode: Resource blocking mode (selects the policy's allowlist)
+
+        Yields:
+            Playwright Page object
+        """
+        if not self._started:
+            await self.start()
+
+        slot = await self._idle.get()
+        try:
+            await self._ensure_healthy(slot)
+            slot.mode = mode
+            self.stats["leases"] += 1
+            yield slot.page
+        finally:
+            slot.navigations += 1
+            if self._started:
+                self._idle.put_nowait(slot)
+
+    async def health_check(self) -> bool:
+        """
+        Check that the browser is still connected.
+
+        Returns:
+            True if the browser is usable
+        """
+        try:
+            return self._browser is not None and self._browser.is_connected()
+        except Exception:
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool usage statistics."""
+        return {
+            **self.stats,
+            "size": self.size,
+            "started": self._started,
+            "idle_pages": self._idle.qsize() if self._idle else 0,
+            "resource_blocking": self.resource_policy.get_stats() if self.resource_policy else None,
+            "session_state": self.session_store.get_stats() if self.session_store else None
+        }
+
+    async def apply_session_state(self, state: Dict[str, Any]) -> None:
+        """
+        Add freshly saved session cookies to every open context.
+
+        Contexts created later pick the state up from the store directly.
+
+        Args:
+            state: Playwright storage state dict
+        """
+        cookies = state.get("cookies", [])
+        if not cookies:
+            return
+
+        for context in self._contexts:
+            try:
+                await context.add_cookies(cookies)
+            except Exception as e:
+                logger.debug(f"Could not apply session cookies to context: {e}")
+
+    async def _launch_browser(self) -> None:
+        """Launch Chromium and (re)create every context."""
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=self.launch_args
+        )
+        self._contexts = []
+        for _ in range(self.context_count):
+            self._contexts.append(await self._new_context())
+
+    async def _new_context(self) -> Any:
+        """Create a browser context with the pool's shared settings."""
+        context_options = {}
+        if self.session_store is not None:
+            context_options.update(self.session_store.context_options())
+        if self.user_agent:
+            context_options["user_agent"] = self.user_agent
+        return await self._browser.new_context(**context_options)
+
+    async def _new_page(self, slot: PooledPage) -> None:
+        """Open a page for the slot and install the shared blocking policy."""
+        slot.page = await self._contexts[slot.context_index].new_page()
+        if self.resource_policy is not None:
+            await self.resource_policy.install(slot.page, lambda: slot.mode)
+
+    async def _ensure_healthy(self, slot: PooledPage) -> None:
+        """Replace the slot's page, context or browser if they are unusable."""
+        if not await self.health_check():
+            async with self._restart_lock:
+                # Another lease may already have relaunched the browser
+                if not await self.health_check():
+                    self.stats["health_check_failures"] += 1
+                    self.stats["browser_restarts"] += 1
+                    logger.warning("Browser disconnected, relaunching")
+                    await self._restart_browser()
+                    return
+
+        if slot.page is None or slot.page.is_closed():
+            self.stats["health_check_failures"] += 1
+            await self._recycle_page(slot)
+        elif slot.navigations >= self.max_navigations_per_page:
+            logger.debug(f"Recycling page slot {slot.slot_id} after {slot.navigations} navigations")
+            await self._recycle_page(slot)
+
+    async def _recycle_page(self, slot: PooledPage) -> None:
+        """Close the slot's page and open a fresh one in the same context."""
+        try:
+            if slot.page is not None and not slot.page.is_closed():
+                await slot.page.close()
+        except Exception as e:
+            logger.debug(f"Error closing recycled page: {e}")
+
+        try:
+            await self._new_page(slot)
+        except Exception as e:
+            logger.warning(f"Context {slot.context_index} unusable, recreating: {e}")
+            self._contexts[slot.context_index] = await self._new_context()
+            self.stats["contexts_recreated"] += 1
+            await self._new_page(slot)
+
+        slot.navigations = 0
+        self.stats["pages_recycled"] += 1
+
+    async def _restart_browser(self) -> None:
+        """Relaunch Chromium and give every slot a fresh page."""
+        try:
+            if self._browser:
+                await self._browser.close()
+        except Exception:
+            pass
+
+        await self._launch_browser()
+        for slot in self._slots:
+            await self._new_page(slot)
+            slot.navigations = 0
@@ -52,7 +52,10 @@ class ConfigManager:
                 "parallel_batch_size": 5,
                 "max_concurrent_downloads": 8,
                 "max_concurrent_videos": 3,
-                "use_parallel_video_processing": True
+                "use_parallel_video_processing": True,
+                "max_concurrent_listings": 3,
+                "listing_only_mode": False,
+                "listing_detail_fields": ["video_url", "tags"]
             },
             "scraping": {
                 "wait_time_ms": 3000,
@@ -64,7 +67,25 @@ class ConfigManager:
                 "max_retries": 5,
                 "chunk_size": 16384,
                 "connect_timeout_seconds": 30,
-                "read_timeout_seconds": 300
+                "read_timeout_seconds": 300,
+                "engine": "async",
+                "max_concurrent_transfers": 8,
+                "io_workers": 4,
+                "max_concurrent_segmented": 2,
+                "segment_count": 8,
+                "segment_min_file_mb": 16,
+                "segment_min_mb": 2,
+                "segment_retries": 3,
+                "pool_connections": 10,
+                "pool_maxsize": 32,
+                "pool_idle_timeout_seconds": 120
+            },
+            "quality": {
+                "policy": "max_quality",
+                "max_size_mb": 0,
+                "probe": True,
+                "probe_timeout_seconds": 10,
+                "probe_workers": 8
             },
             "validation": {
                 "required_json_fields": ["video_id", "title", "video_src"],
@@ -76,6 +97,59 @@ class ConfigManager:
                 "log_level": "INFO",
                 "log_to_file": True,
                 "log_file_path": "scraper.log"
+            },
+            "browser_pool": {
+                "contexts": 2,
+                "pages_per_context": 2,
+                "max_navigations_per_page": 50,
+                "headless": True
+            },
+            "fetcher": {
+                "engine": "http",
+                "max_connections": 20,
+                "max_connections_per_host": 10,
+                "keepalive_timeout_seconds": 30,
+                "timeout_seconds": 30,
+                "stream_stop_sections": ["json_ld", "video_info"],
+                "stream_chunk_bytes": 16384,
+                "stream_drain_max_bytes": 262144,
+                "required_fields": ["video_url"]
+            },
+            "resource_blocking": {
+                "enabled": True,
+                "blocked_resource_types": ["image", "media", "font", "stylesheet"],
+                "blocked_url_patterns": [
+                    "googlesyndication", "doubleclick", "google-analytics", "googletagmanager",
+                    "adsystem", "exoclick", "juicyads", "trafficjunky", r"\.(mp4|webm)(\?|$)"
+                ],
+                "modes": {
+                    "listing": {"allow_resource_types": ["stylesheet"]},
+                    "detail": {},
+                    "detect": {}
+                }
+            },
+            "readiness": {
+                "page_deadline_ms": 15000,
+                "default_timeout_ms": 10000
+            },
+            "parsing": {
+                "process_pool": False,
+                "workers": 0,
+                "chunk_size": 4,
+                "chunk_linger_ms": 10
+            },
+            "extraction": {
+                "engine": "dom",
+                "selector_stats_path": "selector_stats.json"
+            },
+            "storage": {
+                "ledger_scan_workers": 8,
+                "ledger_reconcile_seconds": 600
+            },
+            "session_state": {
+                "enabled": True,
+                "path": "session_state.json",
+                "max_age_hours": 24
             }
         }
 
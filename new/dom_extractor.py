@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+DOM Extractor Module
+
+Single-parse extraction engine for video pages. The page is parsed once
+with lxml's HTML parser and every field extractor runs its own compiled
+XPath against that tree, lazily, only for the fields JSON-LD did not
+answer. Label patterns ("Category:", "Artist:", "1,204 likes") run over
+the few text nodes an XPath selects instead of the whole source,
+and download links come from the anchor, source and script elements
+that can hold them. Hashtags, and the duration, views, upload date and
+thumbnail fallbacks, stay as regexes over the source, as do the meta
+keywords and hashtags of the tags field, so tags come out exactly as
+before (``#...`` names in attributes and styles included).
+
+The values match the regex engine on well-formed markup. Known
+differences, all places where the regex engine reads raw markup:
+
+- class, label and attribute matches also see single-quoted attributes
+  and ignore attribute order inside a tag
+- label text inside comments, <script>, <style> and attribute values
+  is not searched
+- meta names and properties match as written (lower case); the regex
+  engine matched them case-insensitively
+- the quality of a download link is read from the link's own text, not
+  from whatever follows it in the source
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from lxml import etree
+
+from quality_resolver import QualityCandidate, parse_candidates, select_candidate
+from video_extractor import VideoExtractor
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text after the start tag lands in .tail (they have no content)
+VOID_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "meta", "param", "source", "track", "wbr"
+])
+
+# "/descendant::" instead of "//": libxml2 evaluates "//x[predicate]" per parent node
+TITLE_XPATH = etree.XPath("/descendant::title[not(*)]")
+H1_XPATH = etree.XPath("/descendant::h1[not(*)]")
+META_NAME_XPATH = etree.XPath("/descendant::meta[@name = $value]/@content")
+META_PROPERTY_XPATH = etree.XPath("/descendant::meta[@property = $value]/@content")
+# Shared by the class-based fields; each filters the attribute strings itself
+CLASS_ATTRIBUTE_XPATH = etree.XPath("/descendant::*/@class")
+# Shared by the label and likes patterns (never script or style bodies)
+VISIBLE_TEXT_XPATH = etree.XPath("/descendant::text()[not(parent::script) and not(parent::style)]",
+                                 smart_strings=False)
+DOWNLOAD_ATTR_XPATH = etree.XPath(
+    "/descendant::a[@href][@*[contains(., 'download') or contains(name(), 'download')][name() != 'href']]/@href")
+MP4_HREF_XPATH = etree.XPath("/descendant::*/@href[contains(., '.mp4')]")
+MP4_SCRIPT_XPATH = etree.XPath("/descendant::script[contains(., '.mp4')]/text()")
+SOURCE_SRC_XPATH = etree.XPath("/descendant::source/@src")
+STRING_XPATH = etree.XPath("string()")
+
+# Tag sources read from the raw source, exactly as in VideoExtractor
+KEYWORDS_RE = re.compile(r'<meta[^>]*name="keywords"[^>]*content="([^"]*)"', re.IGNORECASE)
+HASHTAG_RE = re.compile(r'#(\w+)')
+# Label patterns (same expressions as VideoExtractor), applied per text node
+CATEGORY_TEXT_RES = [re.compile(r'Category:\s*([^\n<]+)', re.IGNORECASE),
+                     re.compile(r'Genre:\s*([^\n<]+)', re.IGNORECASE)]
+UPLOADED_BY_RE = re.compile(r'Uploaded by:\s*([^\n<]+)', re.IGNORECASE)
+BY_RE = re.compile(r'By:\s*([^\n<]+)', re.IGNORECASE)
+ARTIST_RE = re.compile(r'Artist:\s*([^\n<]+)', re.IGNORECASE)
+PERFORMER_RE = re.compile(r'Performer:\s*([^\n<]+)', re.IGNORECASE)
+LIKE_TEXT_RES = [re.compile(r'([0-9,]+)\s*likes?', re.IGNORECASE),
+                 re.compile(r'Likes?:\s*([0-9,]+)', re.IGNORECASE)]
+LIKE_SYMBOL_RES = [re.compile(r'👍\s*([0-9,]+)', re.IGNORECASE),
+                   re.compile(r'♥\s*([0-9,]+)', re.IGNORECASE)]
+LEADING_NUMBER_RE = re.compile(r'[0-9,]+')
+LINK_QUALITY_RE = re.compile(r'([0-9]+p|HD|Full HD|4K|2K)', re.IGNORECASE)
+FILE_QUALITY_RE = re.compile(r'([0-9]+p|HD|Full HD|4K|2K|MP4)', re.IGNORECASE)
+SCRIPT_LINK_RE = re.compile(r'"url":\s*"([^"]*\.mp4[^"]*)".*?"quality":\s*"([^"]*)"', re.IGNORECASE | re.DOTALL)
+MEDIA_EXTENSIONS = ('.mp4', '.webm', '.avi')
+
+
+def _raw_url(value: str) -> str:
+    """Attribute URL spelled as in the page source (the regex engine keeps ``&amp;``)."""
+    return value.replace('&', '&amp;')
+
+
+class ParsedDocument:
+    """One lxml parse of a page; each field queries the tree with its own XPath."""
+
+    def __init__(self, html_content: str, root: Optional[Any] = None):
+        """
+        Parse the page (or wrap a tree that is already parsed).
+
+        Args:
+            html_content: Raw page HTML
+            root: Root element of an existing lxml parse of html_content
+
+        Raises:
+            ValueError / lxml.etree.ParserError if the document cannot be parsed
+        """
+        self.html = html_content
+        if root is None:
+            root = self._parse(html_content)
+        self.root = root
+        # Queries shared by several fields, run on first use
+        self._class_attributes: Optional[List[Tuple[str, Any]]] = None
+        self._visible_texts: Optional[List[str]] = None
+        self._label_texts: Optional[List[str]] = None
+        self._like_texts: Optional[List[str]] = None
+
+    @staticmethod
+    def _parse(html_content: str) -> Any:
+        """Parse HTML into a plain lxml tree (no lxml.html element classes)."""
+        try:
+            root = etree.fromstring(html_content, etree.HTMLParser())
+        except ValueError:
+            # Unicode strings with an XML encoding declaration must be parsed as bytes
+            root = etree.fromstring(html_content.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+        if root is None:
+            raise ValueError("Document is empty")
+        return root
+
+    @property
+    def visible_texts(self) -> List[str]:
+        """Text nodes outside script and style, in document order."""
+        if self._visible_texts is None:
+            self._visible_texts = VISIBLE_TEXT_XPATH(self.root)
+        return self._visible_texts
+
+    @property
+    def label_texts(self) -> List[str]:
+        """Visible text nodes containing a colon (every "Label:" pattern needs one)."""
+        if self._label_texts is None:
+            self._label_texts = [text for text in self.visible_texts if ':' in text]
+        return self._label_texts
+
+    @property
+    def like_texts(self) -> List[str]:
+        """Visible text nodes mentioning likes (or a thumbs-up / heart)."""
+        if self._like_texts is None:
+            self._like_texts = [text for text in self.visible_texts
+                                if 'like' in text.lower() or '👍' in text or '♥' in text]
+        return self._like_texts
+
+    def class_texts(self, class_part: str, tag: Optional[str] = None) -> List[str]:
+        """
+        Text after the start tag of every element whose class contains
+        class_part (case-insensitive), in document order.
+
+        Args:
+            class_part: Substring of the class attribute
+            tag: Only elements with this tag name
+        """
+        if self._class_attributes is None:
+            self._class_attributes = [(value.lower(), value) for value in CLASS_ATTRIBUTE_XPATH(self.root)]
+
+        texts = []
+        for value in [value for css_class, value in self._class_attributes if class_part in css_class]:
+            element = value.getparent()
+            if tag is not None and element.tag != tag:
+                continue
+            texts.append((element.tail if element.tag in VOID_ELEMENTS else element.text) or "")
+        return texts
+
+    def meta_content(self, key_attr: str, key_value: str) -> Optional[str]:
+        """Content of the first <meta name=...> / <meta property=...> with that value (None if absent)."""
+        query = META_NAME_XPATH if key_attr == "name" else META_PROPERTY_XPATH
+        values = query(self.root, value=key_value)
+        return str(values[0]) if values else None
+
+    def first_text(self, query: Callable) -> Optional[str]:
+        """Text of the first element the query selects (None if it selects nothing)."""
+        elements = query(self.root)
+        if not elements:
+            return None
+        return elements[0].text or ""
+
+
+class DomVideoExtractor:
+    """Builds the video data dict from one parsed document."""
+
+    def __init__(self, extractor: VideoExtractor):
+        """
+        Initialize DOM extractor.
+
+        Args:
+            extractor: Regex extractor used for raw-text fields and as the fallback engine
+        """
+        self.extractor = extractor
+        self.logger = extractor.logger
+        self.page_fields = extractor.page_fields
+
+    def parse(self, html_content: str, root: Optional[Any] = None) -> Optional[ParsedDocument]:
+        """
+        Parse a page for the DOM engine.
+
+        Args:
+            html_content: Raw page HTML
+            root: Tree already parsed from html_content (skips the parse)
+
+        Returns:
+            ParsedDocument, or None if the page cannot be parsed (callers
+            fall back to the regex engine)
+        """
+        try:
+            return ParsedDocument(html_content, root)
+        except Exception as e:
+            self.logger.warning("DOM parse failed, using regex extractors", extra={"error": str(e)})
+            return None
+
+    def extract_fields(self, doc: ParsedDocument, json_ld_data: Optional[Dict[str, Any]],
+                       names: List[str]) -> Dict[str, Any]:
+        """
+        Extract the requested fields from a parsed page.
+
+        Args:
+            doc: Parsed page
+            json_ld_data: JSON-LD VideoObject of the page (None if absent)
+            names: Video data keys to extract
+
+        Returns:
+            Dict with a value for each requested key
+        """
+        artist_info = None
+        if 'uploaded_by' in names or 'artists' in names:
+            artist_info = self.extract_artist_and_uploader(doc)
+
+        html_content = doc.html
+        extractors = {
+            'title': lambda: self.extract_title(doc, json_ld_data),
+            'description': lambda: self.extract_description(doc, json_ld_data),
+            'tags': lambda: self.extract_tags(doc),
+            'categories': lambda: self.extract_categories(doc),
+            'uploaded_by': lambda: artist_info['uploader'],
+            'artists': lambda: artist_info['artists'],
+            'duration': lambda: self.extractor.extract_duration(json_ld_data, html_content),
+            'views': lambda: self.extractor.extract_views(json_ld_data, html_content),
+            'likes': lambda: self.extract_likes(doc),
+            'upload_date': lambda: self.extract_upload_date(html_content, json_ld_data),
+            'thumbnail_url': lambda: self.extract_thumbnail_url(html_content, json_ld_data),
+            'video_url': lambda: self.extract_video_src(doc)
+        }
+        return {name: extractors[name]() for name in names if name in extractors}
+
+    def extract_title(self, doc: ParsedDocument, json_ld_data: Optional[Dict]) -> str:
+        """Title: JSON-LD name, <title>, <h1>, og:title."""
+        try:
+            title = self.extractor.json_ld_title(json_ld_data)
+            if title:
+                return title
+
+            title = doc.first_text(TITLE_XPATH)
+            if title is not None:
+                title = title.strip()
+                if title and title != "404 Not Found":
+                    return title
+
+            title = doc.first_text(H1_XPATH)
+            if title is not None and title.strip():
+                return title.strip()
+
+            title = doc.meta_content("property", "og:title")
+            if title is not None and title.strip():
+                return title.strip()
+
+            return "Unknown Title"
+        except Exception as e:
+            self.logger.error("Error extracting title", extra={"error": str(e)})
+            return "Unknown Title"
+
+    def extract_description(self, doc: ParsedDocument, json_ld_data: Optional[Dict]) -> str:
+        """Description: JSON-LD, meta description, og:description, description blocks."""
+        try:
+            description = self.extractor.json_ld_description(json_ld_data)
+            if description:
+                return description
+
+            for key_attr, key_value in (("name", "description"), ("property", "og:description")):
+                description = doc.meta_content(key_attr, key_value)
+                if description is not None:
+                    description = description.strip()
+                    if description and len(description) > 5:
+                        return description
+
+            for class_part, tag in (("description", "div"), ("desc", "p")):
+                matches = doc.class_texts(class_part, tag)
+                if matches:
+                    description = matches[0].strip()
+                    if description and len(description) > 10:
+                        return description
+
+            return ""
+        except Exception as e:
+            self.logger.error("Error extracting description", extra={"error": str(e)})
+            return ""
+
+    def extract_tags(self, doc: ParsedDocument) -> List[str]:
+        """Tags: meta keywords, hashtags, tag/keyword/category elements (max 20)."""
+        try:
+            tags = []
+
+            # Raw attribute text, as the regex engine reads it (no entity decoding)
+            keywords_match = KEYWORDS_RE.search(doc.html)
+            if keywords_match:
+                keywords = keywords_match.group(1)
+                tags.extend([tag.strip() for tag in keywords.split(',') if tag.strip()])
+
+            # Over the whole source like the regex engine: '#name' in attributes counts too
+            tags.extend(HASHTAG_RE.findall(doc.html))
+
+            for class_part, tag in (("tag", None), ("keyword", None), ("category", "span")):
+                for text in doc.class_texts(class_part, tag):
+                    clean_tag = text.strip()
+                    if clean_tag and len(clean_tag) < 50:
+                        tags.append(clean_tag)
+
+            return self._unique(tags)[:20]
+        except Exception as e:
+            self.logger.error("Error extracting tags", extra={"error": str(e)})
+            return []
+
+    def extract_categories(self, doc: ParsedDocument) -> List[str]:
+        """Categories: category/genre elements and labels (max 10)."""
+        try:
+            categories = []
+
+            for class_part in ("category", "genre"):
+                for text in doc.class_texts(class_part):
+                    clean_category = text.strip()
+                    if clean_category and len(clean_category) < 100:
+                        categories.append(clean_category)
+
+            for pattern in CATEGORY_TEXT_RES:
+                for match in self._all_matches(pattern, doc.label_texts):
+                    clean_category = match.strip()
+                    if clean_category and len(clean_category) < 100:
+                        categories.append(clean_category)
+
+            return self._unique(categories)[:10]
+        except Exception as e:
+            self.logger.error("Error extracting categories", extra={"error": str(e)})
+            return []
+
+    def extract_artist_and_uploader(self, doc: ParsedDocument) -> Dict[str, Any]:
+        """Uploader (first non-empty pattern) and artists (all patterns, deduplicated)."""
+        try:
+            result = {'artists': [], 'uploader': ''}
+
+            uploader_sources = [
+                lambda: self._first_match(UPLOADED_BY_RE, doc.label_texts),
+                lambda: self._first_nonempty(doc.class_texts("uploader")),
+                lambda: self._first_nonempty(doc.class_texts("author")),
+                lambda: self._first_match(BY_RE, doc.label_texts)
+            ]
+            for source in uploader_sources:
+                match = source()
+                if match is not None and match.strip():
+                    result['uploader'] = match.strip()
+                    break
+
+            artist_sources = [
+                lambda: self._all_matches(ARTIST_RE, doc.label_texts),
+                lambda: doc.class_texts("artist"),
+                lambda: self._all_matches(PERFORMER_RE, doc.label_texts)
+            ]
+            for source in artist_sources:
+                for match in source():
+                    artist = match.strip()
+                    if artist and artist not in result['artists']:
+                        result['artists'].append(artist)
+
+            return result
+        except Exception as e:
+            self.logger.error("Error extracting artist and uploader", extra={"error": str(e)})
+            return {'artists': [], 'uploader': ''}
+
+    def extract_likes(self, doc: ParsedDocument) -> int:
+        """Likes: text patterns, like-class elements, then emoji patterns."""
+        try:
+            candidates = [lambda pattern=pattern: self._first_match(pattern, doc.like_texts) for pattern in LIKE_TEXT_RES]
+            candidates.append(lambda: self._first_leading_number(doc.class_texts("like")))
+            candidates.extend(lambda pattern=pattern: self._first_match(pattern, doc.like_texts) for pattern in LIKE_SYMBOL_RES)
+
+            for candidate in candidates:
+                likes_str = candidate()
+                if likes_str is not None:
+                    likes_str = likes_str.replace(',', '')
+                    if likes_str.isdigit():
+                        return int(likes_str)
+            return 0
+        except Exception as e:
+            self.logger.error("Error extracting likes", extra={"error": str(e)})
+            return 0
+
+    def extract_upload_date(self, html_content: str, json_ld_data: Optional[Dict]) -> str:
+        """Upload date: JSON-LD, date meta tags, upload labels, ISO dates."""
+        try:
+            date_str = self.extractor.json_ld_upload_date(json_ld_data)
+            if date_str is not None:
+                return date_str
+
+            # Raw attribute/text patterns from the shared selector schema
+            date_str = self.page_fields.field('upload_date').extract(html_content)
+            if date_str is not None:
+                try:
+                    if 'T' in date_str:
+                        parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                        return parsed_date.strftime('%Y-%m-%d')
+                    return date_str
+                except:
+                    return date_str
+
+            return "Unknown"
+        except Exception as e:
+            self.logger.error("Error extracting upload date", extra={"error": str(e)})
+            return "Unknown"
+
+    def extract_thumbnail_url(self, html_content: str, json_ld_data: Optional[Dict]) -> str:
+        """Thumbnail: JSON-LD, video poster, og:image, link image_src."""
+        try:
+            thumbnail_url = self.extractor.json_ld_thumbnail_url(json_ld_data)
+            if thumbnail_url is not None:
+                return thumbnail_url
+
+            # URLs stay raw (no unescaping), as in the regex engine
+            return self.page_fields.field('thumbnail_url').extract(html_content, default="")
+        except Exception as e:
+            self.logger.error("Error extracting thumbnail URL", extra={"error": str(e)})
+            return ""
+
+    def extract_video_src(self, doc: ParsedDocument) -> str:
+        """Best download link of the page ("" if there is none)."""
+        best = select_candidate(self.get_download_candidates(doc))
+        return best.url if best else ""
+
+    def get_download_candidates(self, doc: ParsedDocument) -> List[QualityCandidate]:
+        """Download links of a parsed page as structured candidates (same order as the regex engine)."""
+        return parse_candidates(self.get_download_links(doc))
+
+    def get_download_links(self, doc: ParsedDocument) -> List[Dict[str, str]]:
+        """Download links from anchors, .mp4 hrefs, player JSON and <source> tags."""
+        try:
+            download_links = []
+
+            for query, quality_pattern in ((DOWNLOAD_ATTR_XPATH, LINK_QUALITY_RE), (MP4_HREF_XPATH, FILE_QUALITY_RE)):
+                for url in query(doc.root):
+                    if not url.startswith('http'):
+                        continue
+                    quality = quality_pattern.search(STRING_XPATH(url.getparent()))
+                    download_links.append({'url': _raw_url(str(url)), 'quality': quality.group(1) if quality else ''})
+
+            for script in MP4_SCRIPT_XPATH(doc.root):
+                for url, quality in SCRIPT_LINK_RE.findall(script):
+                    if url.startswith('http'):
+                        download_links.append({'url': url, 'quality': quality})
+
+            for src in SOURCE_SRC_XPATH(doc.root):
+                if src.startswith('http') and any(extension in src for extension in MEDIA_EXTENSIONS):
+                    download_links.append({'url': _raw_url(str(src)), 'quality': 'Unknown'})
+
+            return download_links
+        except Exception as e:
+            self.logger.error("Error getting download links from DOM", extra={"error": str(e)})
+            return []
+
+    @staticmethod
+    def _first_match(pattern: re.Pattern, texts: List[str]) -> Optional[str]:
+        """First capture of pattern across texts in order (None if it never matches)."""
+        for text in texts:
+            match = pattern.search(text)
+            if match:
+                return match.group(1)
+        return None
+
+    @staticmethod
+    def _all_matches(pattern: re.Pattern, texts: List[str]) -> List[str]:
+        """Every capture of pattern across texts in order."""
+        matches = []
+        for text in texts:
+            matches.extend(pattern.findall(text))
+        return matches
+
+    @staticmethod
+    def _first_nonempty(texts: List[str]) -> Optional[str]:
+        """First text with at least one character (None if there is none)."""
+        for text in texts:
+            if text:
+                return text
+        return None
+
+    @staticmethod
+    def _first_leading_number(texts: List[str]) -> Optional[str]:
+        """Leading digits/commas of the first text that starts with one."""
+        for text in texts:
+            match = LEADING_NUMBER_RE.match(text)
+            if match:
+                return match.group(0)
+        return None
+
+    @staticmethod
+    def _unique(values: List[str]) -> List[str]:
+        """Drop duplicates, keeping first occurrences in order."""
+        seen = set()
+        unique_values = []
+        for value in values:
+            if value not in seen:
+                seen.add(value)
+                unique_values.append(value)
+        return unique_values
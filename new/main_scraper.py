@@ -16,6 +16,8 @@ from pathlib import Path
 from typing import Optional, Dict, List, Any
 from playwright.async_api import async_playwright
 
+from readiness import PAGINATION_READY_SELECTORS, ReadinessWaiter
+
 # Original components...
 try:
     from scrape_orchestrator import ScrapeOrchestrator
@@ -35,6 +37,8 @@ except ImportError as e:
 
 try:
     from media_downloader import MediaDownloader
+    from quality_resolver import QualityResolver
+    from segmented_downloader import SegmentedDownloader
     DOWNLOADER_MODE_AVAILABLE = True
 except ImportError as e:
     print(f"Downloader-only mode not available: {e}")
@@ -54,8 +58,10 @@ class FreshRestartPageDetector:
     Handles the fresh restart logic when last_page is 0 in progress.json.
     """
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, browser_pool=None, readiness_waiter=None):
         self.base_url = base_url
+        self.browser_pool = browser_pool
+        self.waiter = readiness_waiter or ReadinessWaiter()
         self.logger = logging.getLogger(__name__)
     
     async def detect_last_page(self) -> Optional[int]:
@@ -69,33 +75,16 @@ class FreshRestartPageDetector:
             self.logger.info("Detecting last page number from base URL", 
                            extra={"base_url": self.base_url})
             
+            if self.browser_pool is not None:
+                async with self.browser_pool.page(mode="detect") as page:
+                    return await self._detect_on_page(page)
+            
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
                 page = await browser.new_page()
                 
                 try:
-                    # Navigate to base URL
-                    await page.goto(self.base_url, wait_until='domcontentloaded')
-                    await page.wait_for_timeout(2000)  # Wait for page to fully load
-                    
-                    # Get the HTML content
-                    html_content = await page.content()
-                    
-                    # Extract page number from "Last" link
-                    last_page_num = self._extract_last_page_from_html(html_content)
-                    
-                    if last_page_num:
-                        self.logger.info("Successfully detected last page", 
-                                       extra={"page_number": last_page_num})
-                    else:
-                        self.logger.warning("Could not detect last page from HTML")
-                    
-                    return last_page_num
-                    
-                except Exception as e:
-                    self.logger.error("Error navigating to base URL", 
-                                    extra={"error": str(e), "url": self.base_url})
-                    return None
+                    return await self._detect_on_page(page)
                 finally:
                     await browser.close()
                     
@@ -104,6 +93,41 @@ class FreshRestartPageDetector:
                             extra={"error": str(e)})
             return None
     
+    async def _detect_on_page(self, page) -> Optional[int]:
+        """
+        Load the base URL on the given page and extract the last page number.
+        
+        Args:
+            page: Playwright page (pooled or throwaway)
+            
+        Returns:
+            Page number from "Last" link, or None if not found
+        """
+        try:
+            # Navigate to base URL
+            await page.goto(self.base_url, wait_until='domcontentloaded')
+            # Wait for pagination links instead of a fixed sleep
+            await self.waiter.wait_for_any(page, PAGINATION_READY_SELECTORS, "pagination_ready")
+            
+            # Get the HTML content
+            html_content = await page.content()
+            
+            # Extract page number from "Last" link
+            last_page_num = self._extract_last_page_from_html(html_content)
+            
+            if last_page_num:
+                self.logger.info("Successfully detected last page", 
+                               extra={"page_number": last_page_num})
+            else:
+                self.logger.warning("Could not detect last page from HTML")
+            
+            return last_page_num
+            
+        except Exception as e:
+            self.logger.error("Error navigating to base URL", 
+                            extra={"error": str(e), "url": self.base_url})
+            return None
+    
     def _extract_last_page_from_html(self, html_content: str) -> Optional[int]:
         """
         Extract the page number from the "Last" link in HTML.
@@ -176,8 +200,11 @@ class EnhancedParserOnlyMode:
         self.progress_manager = ProgressManager("progress.json")
         
         base_url = self.config.get("general", {}).get("base_url", "https://rule34video.com")
-        self.page_parser = PageParser(base_url=base_url, downloads_dir=self.downloads_dir)
-        self.page_detector = FreshRestartPageDetector(base_url)
+        # One browser pool owned for the whole run, shared by parser and page detector
+        self.page_parser = PageParser(base_url=base_url, downloads_dir=self.downloads_dir,
+                                      config=self.config)
+        self.page_detector = FreshRestartPageDetector(base_url, browser_pool=self.page_parser.browser_pool,
+                                                      readiness_waiter=self.page_parser.parser.waiter)
         
         self.logger = logging.getLogger(__name__)
     
@@ -235,6 +262,14 @@ class EnhancedParserOnlyMode:
         """
         Run the parsing workflow for multiple batches with enhanced start page logic.
         """
+        await self.page_parser.start()
+        try:
+            return await self._run_parsing(start_page, batch_count, batch_size)
+        finally:
+            await self.page_parser.close()
+    
+    async def _run_parsing(self, start_page: Optional[int], batch_count: int, batch_size: int) -> Dict:
+        """Parsing workflow body; runs while the shared browser pool is open."""
         start_time = time.time()
         
         # Determine actual start page
@@ -326,18 +361,24 @@ class EnhancedParserOnlyMode:
         successful_pages = []
         failed_pages = []
         
+        # Fetch every listing page of the batch in parallel before the per-page work
+        listings = await self.page_parser.prefetch_listings(page_numbers)
+        
         for page_number in page_numbers:
             try:
                 self.logger.info(f"Parsing page {page_number}", 
                                extra={"event": "page_parse_start", "batch_id": batch_id, "page": page_number})
                 
                 # Parse the page (save_metadata=True writes JSON files...)
+                downloaded = self.progress_manager.load_progress().get("downloaded_videos", [])
                 parse_result = await self.page_parser.parse_page(
                     page_number, 
-                    save_metadata=True
+                    save_metadata=True,
+                    video_filter=PageParser.downloaded_video_filter(downloaded),
+                    prefetched_listing=listings.get(page_number)
                 )
                 
-                if parse_result.success and parse_result.videos:
+                if parse_result.success:
                     successful_pages.append(page_number)
                     total_videos += parse_result.video_count
                     
@@ -348,7 +389,8 @@ class EnhancedParserOnlyMode:
                             video_id=video.video_id,
                             mp4_url=video.video_url,
                             jpg_url=video.thumbnail_url,
-                            target_folder=video.folder_path
+                            target_folder=video.folder_path,
+                            mp4_candidates=video.download_candidates
                         )
                     
                     self.logger.info("Page parsing completed", 
@@ -428,9 +470,20 @@ class EnhancedParserOnlyMode:
 class DownloaderOnlyMode:
     """Handler for downloader-only mode operations."""
     
-    def __init__(self, max_workers: int = 4, max_retries: int = 3):
+    def __init__(self, max_workers: int = 4, max_retries: int = 3, config: Optional[Dict] = None):
         """Initialize downloader-only mode."""
-        self.downloader = MediaDownloader(max_retries=max_retries, workers=max_workers)
+        download_config = (config or {}).get("download", {})
+        # "idm" and other legacy methods have no MediaDownloader equivalent; stream those directly
+        download_method = "segmented" if download_config.get("download_method") == "segmented" else "direct"
+        segmented_downloader = SegmentedDownloader.from_config(config) if download_method == "segmented" else None
+        self.downloader = MediaDownloader(max_retries=max_retries, workers=max_workers,
+                                          quality_resolver=QualityResolver.from_config(config),
+                                          engine=download_config.get("engine", "async"),
+                                          concurrency=download_config.get("max_concurrent_transfers", 8),
+                                          download_method=download_method,
+                                          segmented_downloader=segmented_downloader,
+                                          io_workers=download_config.get("io_workers", 4),
+                                          segmented_workers=download_config.get("max_concurrent_segmented", 2))
         self.logger = logging.getLogger(__name__)
     
     def run_downloading(self, manifest_path: Optional[str] = None, manifest_dir: str = "manifests") -> Dict:
@@ -839,7 +892,8 @@ def main() -> int:
             
             downloader_mode = DownloaderOnlyMode(
                 max_workers=args.max_workers,
-                max_retries=args.download_retries
+                max_retries=args.download_retries,
+                config=config
             )
             results = downloader_mode.run_downloading(
                 manifest_path=args.manifest,
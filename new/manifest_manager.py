@@ -40,9 +40,13 @@ class ManifestManager:
             "created_ts": datetime.now(timezone.utc).isoformat(),
         }
 
-    def add_video_entry(self, page: int, video_id: str, mp4_url: str, jpg_url: str, target_folder: str) -> None:
+    def add_video_entry(self, page: int, video_id: str, mp4_url: str, jpg_url: str, target_folder: str,
+                        mp4_candidates: Optional[List[Dict]] = None) -> None:
         """
         Add a single video's urls to manifest.
+
+        mp4_candidates lists every download rendition so the downloader can
+        pick by size/reachability; mp4_url stays the parser's choice.
         """
         if self._manifest is None:
             raise RuntimeError("Manifest not initialized. Call new_manifest() first.")
@@ -54,6 +58,8 @@ class ManifestManager:
             "jpg_url": jpg_url,
             "target_folder": target_folder,
         }
+        if mp4_candidates:
+            entry["mp4_candidates"] = mp4_candidates
         self._manifest["videos"].append(entry)
         
         # Structured logging
@@ -9,19 +9,46 @@ what files are missing and why downloads fail.
 
 Usage:
     python media_downloader.py --manifest manifests/batch_001_manifest.json --max-retries 3 --workers 4
+    python media_downloader.py --manifest manifests/batch_001_manifest.json --engine async --concurrency 16
 """
 
 import argparse
+import asyncio
 import json
 import logging
 import os
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import requests
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from quality_resolver import POLICIES, QualityResolver
+from segmented_downloader import SegmentedDownloader
+
+# Download engines: asyncio + aiohttp, or the original requests thread pool
+ENGINE_ASYNC = "async"
+ENGINE_THREADS = "threads"
+ENGINES = (ENGINE_ASYNC, ENGINE_THREADS)
+
+# How MP4s are fetched: one stream, or concurrent byte ranges (see segmented_downloader)
+DOWNLOAD_METHODS = ("direct", "segmented")
+
+# Sidecar of a .part file holding the validator (ETag/Last-Modified) it was started with
+RESUME_META_SUFFIX = ".resume"
+
+# Async engine: received chunks are collected up to this size and written in one call on
+# the I/O threads, so the event loop never blocks on the disk
+WRITE_BUFFER_BYTES = 1024 * 1024
+
 # Enhanced structured logging
 class StructuredFormatter(logging.Formatter):
     def format(self, record):
@@ -34,7 +61,8 @@ class StructuredFormatter(logging.Formatter):
         
         # Add extra structured fields
         extra_fields = ['video_id', 'event', 'url', 'dest', 'error', 'missing', 'attempt', 
-                       'size_bytes', 'file_path', 'validation_details', 'error_type', 'status_code']
+                       'size_bytes', 'file_path', 'validation_details', 'error_type', 'status_code',
+                       'resumed_bytes', 'transfer_stats']
         
         for field in extra_fields:
             if hasattr(record, field):
@@ -248,10 +276,216 @@ def validate_video_folder(target_folder: Path, video_id: str) -> Dict[str, any]:
 
 
 class MediaDownloader:
-    def __init__(self, session: requests.Session = None, max_retries: int = 3, workers: int = 4):
+    def __init__(self, session: requests.Session = None, max_retries: int = 3, workers: int = 4,
+                 quality_resolver: Optional[QualityResolver] = None, engine: str = ENGINE_ASYNC,
+                 concurrency: int = 8, download_method: str = "direct",
+                 segmented_downloader: Optional[SegmentedDownloader] = None,
+                 io_workers: int = 4, segmented_workers: int = 2):
         self.session = session or setup_requests_session()
         self.max_retries = max_retries
         self.workers = workers
+        # Re-picks the MP4 among an entry's mp4_candidates (dead/oversized links dropped)
+        self.quality_resolver = quality_resolver
+        if self.quality_resolver is not None and self.quality_resolver.session is None:
+            self.quality_resolver.session = self.session
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown download engine: {engine}")
+        if engine == ENGINE_ASYNC and not AIOHTTP_AVAILABLE:
+            logger.warning("aiohttp not installed - falling back to the thread download engine")
+            engine = ENGINE_THREADS
+        # "async": one event loop and pooled aiohttp client; "threads": requests on `workers` threads
+        self.engine = engine
+        self.concurrency = max(1, concurrency)
+        # Async engine: file writes, .part moves and folder checks run here, off the event loop
+        self.io_executor = ThreadPoolExecutor(max_workers=max(1, io_workers),
+                                              thread_name_prefix="download-io")
+        self.transfer_stats = {"resumed": 0, "resumed_bytes": 0, "restarted": 0, "bytes_downloaded": 0}
+        self._stats_lock = threading.Lock()
+        if download_method not in DOWNLOAD_METHODS:
+            raise ValueError(f"Unknown download method: {download_method}")
+        self.download_method = download_method
+        self.segmented_downloader = None
+        self.segment_executor = None
+        if download_method == "segmented":
+            # Its own pool: every MP4 opens several connections
+            self.segmented_downloader = segmented_downloader or SegmentedDownloader()
+            # Async engine: segmented MP4s in flight; each one runs segment_count more threads
+            self.segment_executor = ThreadPoolExecutor(max_workers=max(1, segmented_workers),
+                                                       thread_name_prefix="download-segmented")
+            # Browser headers of our session, unless the segmented downloader sets its own
+            for key, value in self.session.headers.items():
+                if key not in ("Connection", "Accept-Encoding"):
+                    self.segmented_downloader.headers.setdefault(key, value)
+
+    # Resume support shared by both engines. A download's .part file is
+    # continued only when the server proves (If-Range) that the resource
+    # still matches the validator saved when the .part was started.
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.transfer_stats[key] += value
+
+    def get_transfer_stats(self) -> Dict[str, int]:
+        """Resume/restart counters and bytes moved over the network."""
+        with self._stats_lock:
+            return dict(self.transfer_stats)
+
+    def close(self) -> None:
+        """Stop the async engine's I/O and segmented-download threads."""
+        self.io_executor.shutdown(wait=False)
+        if self.segment_executor is not None:
+            self.segment_executor.shutdown(wait=False)
+
+    async def _run_io(self, func, *args):
+        """Run blocking file work on the I/O threads and wait for it."""
+        return await asyncio.get_running_loop().run_in_executor(self.io_executor, func, *args)
+
+    def _discard_part(self, tmp_path: Path) -> None:
+        for path in (tmp_path, tmp_path.with_suffix(RESUME_META_SUFFIX)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _prepare_resume(self, url: str, tmp_path: Path, video_id: str, file_type: str):
+        """
+        Decide whether an existing .part can be continued.
+        Returns (bytes already on disk, extra request headers).
+        """
+        try:
+            existing = tmp_path.stat().st_size
+        except FileNotFoundError:
+            return 0, {}
+
+        validator = None
+        try:
+            with tmp_path.with_suffix(RESUME_META_SUFFIX).open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("url") == url:
+                validator = meta.get("etag") or meta.get("last_modified")
+        except (OSError, ValueError):
+            pass
+
+        if not existing or not validator:
+            # Nothing to prove the bytes belong to the current file
+            self._discard_part(tmp_path)
+            return 0, {}
+
+        logger.info(f"⏯️  Resuming {file_type} for {video_id} from {existing} bytes", extra={
+            "event": "download_resume_attempt",
+            "video_id": video_id,
+            "file_type": file_type,
+            "url": url,
+            "resumed_bytes": existing
+        })
+        # Ranges count encoded bytes, so the transfer must not be compressed
+        return existing, {"Range": f"bytes={existing}-", "If-Range": validator, "Accept-Encoding": "identity"}
+
+    def _resume_offset(self, status_code: int, headers, existing: int, tmp_path: Path,
+                       video_id: str, file_type: str) -> Optional[int]:
+        """
+        Where the response body starts in the file: `existing` for a valid
+        206, 0 for a full 200 (range ignored or file changed), None if the
+        response cannot be used and the download must start over.
+        """
+        if not existing:
+            return 0
+
+        if status_code == 206:
+            content_range = headers.get("Content-Range", "")
+            if content_range.startswith(f"bytes {existing}-"):
+                self._count(resumed=1, resumed_bytes=existing)
+                return existing
+            reason = f"unexpected Content-Range {content_range!r}"
+        elif status_code == 200:
+            reason = "server sent the full file (range ignored or file changed)"
+        elif status_code == 416:
+            reason = "range not satisfiable"
+        else:
+            # Errors are reported by the caller; the .part stays for the next attempt
+            return existing
+
+        self._count(restarted=1)
+        logger.warning(f"🔁 Restarting {file_type} for {video_id}: {reason}", extra={
+            "event": "download_resume_restart",
+            "video_id": video_id,
+            "file_type": file_type,
+            "status_code": status_code,
+            "resumed_bytes": 0,
+            "error": reason
+        })
+        if status_code == 200:
+            # The body is the whole file; it overwrites the .part
+            tmp_path.with_suffix(RESUME_META_SUFFIX).unlink(missing_ok=True)
+            return 0
+        self._discard_part(tmp_path)
+        return None
+
+    def _save_resume_validator(self, url: str, tmp_path: Path, headers) -> None:
+        """Remember the validator of a fresh download so a later attempt can resume it."""
+        etag = headers.get("ETag")
+        if etag and etag.startswith("W/"):
+            etag = None  # weak validators are not allowed in If-Range
+        last_modified = headers.get("Last-Modified")
+        encoding = headers.get("Content-Encoding", "identity")
+        if not (etag or last_modified) or encoding != "identity":
+            return
+        try:
+            with tmp_path.with_suffix(RESUME_META_SUFFIX).open("w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": etag, "last_modified": last_modified}, f)
+        except OSError as e:
+            logger.debug(f"Could not save resume validator for {tmp_path}: {e}")
+
+    def _log_expected_size(self, headers, offset: int, video_id: str, file_type: str) -> None:
+        content_length = headers.get('content-length')
+        if content_length:
+            # A 206 body is only the remainder
+            expected_size = offset + int(content_length)
+            logger.debug(f"Expected {file_type} size: {expected_size} bytes", extra={
+                "event": "download_size_info",
+                "video_id": video_id,
+                "file_type": file_type,
+                "expected_size": expected_size
+            })
+
+    def _complete_part(self, tmp_path: Path, dest_path: Path, downloaded_size: int,
+                       video_id: str, file_type: str) -> int:
+        """Verify the .part size and move it into place; returns the final size."""
+        actual_size = tmp_path.stat().st_size
+        if actual_size != downloaded_size:
+            logger.warning(f"Size mismatch: expected {downloaded_size}, got {actual_size}", extra={
+                "event": "download_size_mismatch",
+                "video_id": video_id,
+                "file_type": file_type,
+                "expected": downloaded_size,
+                "actual": actual_size
+            })
+        
+        # Atomic move to final location
+        os.replace(tmp_path, dest_path)
+        tmp_path.with_suffix(RESUME_META_SUFFIX).unlink(missing_ok=True)
+        return actual_size
+
+    def _record_success(self, result: Dict, status_code: int, actual_size: int, resumed_bytes: int,
+                        url: str, dest_path: Path, video_id: str, file_type: str) -> None:
+        result["success"] = True
+        # size_bytes is the whole file, resumed bytes included
+        result["size_bytes"] = actual_size
+        result["resumed_bytes"] = resumed_bytes
+        self._count(bytes_downloaded=max(0, actual_size - resumed_bytes))
+        
+        resumed = f", {resumed_bytes} resumed" if resumed_bytes else ""
+        logger.info(f"✅ {file_type} download completed for {video_id} ({actual_size} bytes{resumed})", extra={
+            "event": "download_complete",
+            "video_id": video_id,
+            "file_type": file_type,
+            "url": url,
+            "dest": str(dest_path),
+            "size_bytes": actual_size,
+            "resumed_bytes": resumed_bytes,
+            "status_code": status_code
+        })
 
     def download_file(self, url: str, dest_path: Path, video_id: str, file_type: str, timeout: int = 60) -> Dict[str, any]:
         """
@@ -267,6 +501,7 @@ class MediaDownloader:
             "error": None,
             "status_code": None,
             "size_bytes": 0,
+            "resumed_bytes": 0,
             "response_headers": {}
         }
         
@@ -279,66 +514,40 @@ class MediaDownloader:
         })
         
         dest_path.parent.mkdir(parents=True, exist_ok=True)
+        # Download to temp file first; bytes left by an earlier attempt are resumed
+        tmp_path = dest_path.with_suffix(dest_path.suffix + ".part")
+        existing, resume_headers = self._prepare_resume(url, tmp_path, video_id, file_type)
+        restart = False
         
         try:
-            with self.session.get(url, stream=True, timeout=timeout) as r:
+            with self.session.get(url, stream=True, timeout=timeout, headers=resume_headers) as r:
                 result["status_code"] = r.status_code
                 result["response_headers"] = dict(r.headers)
                 
-                # Check response status
-                r.raise_for_status()
-                
-                # Check content length
-                content_length = r.headers.get('content-length')
-                if content_length:
-                    expected_size = int(content_length)
-                    logger.debug(f"Expected {file_type} size: {expected_size} bytes", extra={
-                        "event": "download_size_info",
-                        "video_id": video_id,
-                        "file_type": file_type,
-                        "expected_size": expected_size
-                    })
-                
-                # Download to temp file first
-                tmp_path = dest_path.with_suffix(dest_path.suffix + ".part")
-                downloaded_size = 0
-                
-                with open(tmp_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=1024 * 64):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-                
-                # Verify download size
-                actual_size = tmp_path.stat().st_size
-                if actual_size != downloaded_size:
-                    logger.warning(f"Size mismatch: expected {downloaded_size}, got {actual_size}", extra={
-                        "event": "download_size_mismatch",
-                        "video_id": video_id,
-                        "file_type": file_type,
-                        "expected": downloaded_size,
-                        "actual": actual_size
-                    })
-                
-                # Atomic move to final location
-                os.replace(tmp_path, dest_path)
-                
-                result["success"] = True
-                result["size_bytes"] = actual_size
-                
-                logger.info(f"✅ {file_type} download completed for {video_id} ({actual_size} bytes)", extra={
-                    "event": "download_complete",
-                    "video_id": video_id,
-                    "file_type": file_type,
-                    "url": url,
-                    "dest": str(dest_path),
-                    "size_bytes": actual_size,
-                    "status_code": r.status_code
-                })
+                offset = self._resume_offset(r.status_code, r.headers, existing, tmp_path, video_id, file_type)
+                if offset is None:
+                    restart = True
+                else:
+                    # Check response status
+                    r.raise_for_status()
+                    self._log_expected_size(r.headers, offset, video_id, file_type)
+                    if offset == 0:
+                        self._save_resume_validator(url, tmp_path, r.headers)
+                    
+                    downloaded_size = offset
+                    
+                    with open(tmp_path, "ab" if offset else "wb") as f:
+                        for chunk in r.iter_content(chunk_size=1024 * 64):
+                            if chunk:
+                                f.write(chunk)
+                                downloaded_size += len(chunk)
+                    
+                    actual_size = self._complete_part(tmp_path, dest_path, downloaded_size, video_id, file_type)
+                    self._record_success(result, r.status_code, actual_size, offset, url, dest_path, video_id, file_type)
                 
         except requests.exceptions.HTTPError as e:
             result["error"] = f"HTTP {e.response.status_code}: {e.response.reason}"
-            result["status_code"] = e.response.status_code if e.response else None
+            result["status_code"] = e.response.status_code if e.response is not None else None
             logger.error(f"❌ HTTP error downloading {file_type} for {video_id}: {result['error']}", extra={
                 "event": "download_http_error",
                 "video_id": video_id,
@@ -378,19 +587,225 @@ class MediaDownloader:
                 "error": str(e)
             })
         
+        if restart:
+            # The partial response did not continue our bytes; fetch the whole file
+            return self.download_file(url, dest_path, video_id, file_type, timeout)
         return result
 
-    def process_video_entry(self, entry: Dict) -> Dict:
+
+    async def download_file_async(self, client: "aiohttp.ClientSession", url: str, dest_path: Path,
+                                  video_id: str, file_type: str, timeout: int = 60) -> Dict[str, any]:
         """
-        Process a single video entry with enhanced error reporting.
+        Async counterpart of download_file on the shared aiohttp client.
+        Returns the same result dict.
+        """
+        result = {
+            "success": False,
+            "url": url,
+            "dest_path": str(dest_path),
+            "file_type": file_type,
+            "video_id": video_id,
+            "error": None,
+            "status_code": None,
+            "size_bytes": 0,
+            "resumed_bytes": 0,
+            "response_headers": {}
+        }
+        
+        logger.info(f"🔄 Starting {file_type} download for {video_id}", extra={
+            "event": "download_start",
+            "video_id": video_id,
+            "file_type": file_type,
+            "url": url,
+            "dest": str(dest_path)
+        })
+        
+        tmp_path = dest_path.with_suffix(dest_path.suffix + ".part")
+        existing, resume_headers = await self._run_io(self._prepare_part, url, dest_path, tmp_path,
+                                                      video_id, file_type)
+        restart = False
+        # Like requests' timeout: limits connecting and each read, not the whole transfer
+        request_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+        
+        try:
+            async with client.get(url, timeout=request_timeout, headers=resume_headers) as r:
+                result["status_code"] = r.status
+                result["response_headers"] = dict(r.headers)
+                
+                offset = await self._run_io(self._resume_offset, r.status, r.headers, existing, tmp_path,
+                                            video_id, file_type)
+                if offset is None:
+                    restart = True
+                else:
+                    r.raise_for_status()
+                    self._log_expected_size(r.headers, offset, video_id, file_type)
+                    if offset == 0:
+                        await self._run_io(self._save_resume_validator, url, tmp_path, r.headers)
+                    
+                    downloaded_size = await self._write_body(r, tmp_path, offset)
+                    
+                    actual_size = await self._run_io(self._complete_part, tmp_path, dest_path, downloaded_size,
+                                                     video_id, file_type)
+                    self._record_success(result, r.status, actual_size, offset, url, dest_path, video_id, file_type)
+                
+        except aiohttp.ClientResponseError as e:
+            result["error"] = f"HTTP {e.status}: {e.message}"
+            result["status_code"] = e.status
+            logger.error(f"❌ HTTP error downloading {file_type} for {video_id}: {result['error']}", extra={
+                "event": "download_http_error",
+                "video_id": video_id,
+                "file_type": file_type,
+                "url": url,
+                "error": result["error"],
+                "status_code": result["status_code"]
+            })
+            
+        except asyncio.TimeoutError:
+            result["error"] = f"Download timeout after {timeout}s"
+            logger.error(f"❌ Timeout downloading {file_type} for {video_id}", extra={
+                "event": "download_timeout",
+                "video_id": video_id,
+                "file_type": file_type,
+                "url": url,
+                "timeout": timeout
+            })
+            
+        except aiohttp.ClientConnectionError as e:
+            result["error"] = f"Connection error: {str(e)}"
+            logger.error(f"❌ Connection error downloading {file_type} for {video_id}: {str(e)}", extra={
+                "event": "download_connection_error",
+                "video_id": video_id,
+                "file_type": file_type,
+                "url": url,
+                "error": str(e)
+            })
+            
+        except Exception as e:
+            result["error"] = f"Unexpected error: {str(e)}"
+            logger.error(f"❌ Unexpected error downloading {file_type} for {video_id}: {str(e)}", extra={
+                "event": "download_unexpected_error",
+                "video_id": video_id,
+                "file_type": file_type,
+                "url": url,
+                "error": str(e)
+            })
+        
+        if restart:
+            return await self.download_file_async(client, url, dest_path, video_id, file_type, timeout)
+        return result
+
+    def _prepare_part(self, url: str, dest_path: Path, tmp_path: Path, video_id: str, file_type: str):
+        """Create the target folder and read any resumable .part (blocking; async engine runs it on the I/O threads)."""
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._prepare_resume(url, tmp_path, video_id, file_type)
+
+    async def _write_body(self, response, tmp_path: Path, offset: int) -> int:
+        """
+        Stream a response body into the .part file from offset.
+
+        Chunks are batched up to WRITE_BUFFER_BYTES and written on the I/O
+        threads. Returns the .part size the body should have produced.
         """
+        downloaded_size = offset
+        f = await self._run_io(open, tmp_path, "ab" if offset else "wb")
+        try:
+            pending, pending_size = [], 0
+            async for chunk in response.content.iter_chunked(1024 * 64):
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= WRITE_BUFFER_BYTES:
+                    await self._run_io(f.writelines, pending)
+                    downloaded_size += pending_size
+                    pending, pending_size = [], 0
+            if pending:
+                await self._run_io(f.writelines, pending)
+                downloaded_size += pending_size
+        finally:
+            await self._run_io(f.close)
+        return downloaded_size
+
+    def _download_segmented(self, url: str, dest_path: Path, video_id: str) -> Optional[Dict[str, any]]:
+        """
+        Fetch an MP4 in concurrent byte ranges. Returns the usual result
+        dict, or None when the server/file is not suited to segmenting.
+        """
+        logger.info(f"🔄 Starting segmented mp4 download for {video_id}", extra={
+            "event": "download_start",
+            "video_id": video_id,
+            "file_type": "mp4",
+            "url": url,
+            "dest": str(dest_path)
+        })
+        segmented = self.segmented_downloader.download(url, dest_path)
+        if segmented.fallback:
+            return None
+
+        result = {
+            "success": False,
+            "url": url,
+            "dest_path": str(dest_path),
+            "file_type": "mp4",
+            "video_id": video_id,
+            "error": segmented.error,
+            "status_code": segmented.status_code,
+            "size_bytes": 0,
+            "resumed_bytes": 0,
+            "response_headers": {},
+            "segments": segmented.segments,
+            "segment_retries": segmented.segment_retries
+        }
+        if segmented.success:
+            if segmented.resumed_bytes:
+                self._count(resumed=1, resumed_bytes=segmented.resumed_bytes)
+            self._record_success(result, segmented.status_code, segmented.size_bytes, segmented.resumed_bytes,
+                                 url, dest_path, video_id, "mp4")
+        else:
+            logger.error(f"❌ Segmented download failed for {video_id}: {segmented.error}", extra={
+                "event": "download_segmented_error",
+                "video_id": video_id,
+                "file_type": "mp4",
+                "url": url,
+                "error": segmented.error
+            })
+        return result
+
+    def download_mp4(self, url: str, dest_path: Path, video_id: str) -> Dict[str, any]:
+        """Download an MP4 with the configured method (segmented falls back to a single stream)."""
+        if self.segmented_downloader is not None:
+            result = self._download_segmented(url, dest_path, video_id)
+            if result is not None:
+                return result
+        return self.download_file(url, dest_path, video_id, "mp4")
+
+    async def download_mp4_async(self, client: "aiohttp.ClientSession", url: str, dest_path: Path,
+                                 video_id: str) -> Dict[str, any]:
+        """
+        Async counterpart of download_mp4. Segmented transfers run on
+        segment_executor, so at most segmented_workers of them (each with
+        its segment threads) are in flight however high concurrency is.
+        """
+        if self.segmented_downloader is not None:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.segment_executor, self._download_segmented, url, dest_path, video_id)
+            if result is not None:
+                return result
+        return await self.download_file_async(client, url, dest_path, video_id, "mp4")
+
+    # Per-entry steps shared by the thread and async engines
+
+    def _start_entry(self, entry: Dict) -> Dict:
+        """Build the result dict for a manifest entry and log the start."""
         video_id = entry["video_id"]
         page = entry.get("page")
-        target_folder = Path(entry["target_folder"])
-        mp4_url = entry["mp4_url"]
-        jpg_url = entry["jpg_url"]
 
-        result = {
+        logger.info(f"🎬 Processing video {video_id} (page {page})", extra={
+            "event": "video_processing_start",
+            "video_id": video_id,
+            "page": page,
+            "target_folder": str(entry["target_folder"])
+        })
+
+        return {
             "video_id": video_id,
             "page": page,
             "attempts": 0,
@@ -401,22 +816,125 @@ class MediaDownloader:
             "final_error": None
         }
 
-        logger.info(f"🎬 Processing video {video_id} (page {page})", extra={
-            "event": "video_processing_start",
+    def _log_attempt_start(self, video_id: str, attempt: int) -> None:
+        logger.info(f"🔄 Attempt {attempt}/{self.max_retries} for video {video_id}", extra={
+            "event": "video_attempt_start",
             "video_id": video_id,
-            "page": page,
-            "target_folder": str(target_folder)
+            "attempt": attempt,
+            "max_attempts": self.max_retries
         })
 
-        for attempt in range(1, self.max_retries + 1):
-            result["attempts"] = attempt
-            
-            logger.info(f"🔄 Attempt {attempt}/{self.max_retries} for video {video_id}", extra={
-                "event": "video_attempt_start",
+    def _select_mp4_url(self, entry: Dict, mp4_url: str, result: Dict) -> Optional[str]:
+        """
+        Re-pick the MP4 among the entry's candidates (may probe over HTTP).
+        Returns None (with final_error set) when no candidate is acceptable.
+        """
+        video_id = entry["video_id"]
+        mp4_candidates = entry.get("mp4_candidates")
+        if self.quality_resolver is None or not mp4_candidates:
+            return mp4_url
+
+        chosen = self.quality_resolver.resolve(mp4_candidates)
+        if chosen is None:
+            result["final_error"] = "No MP4 candidate passed the quality policy"
+            logger.error(f"🚫 No usable MP4 candidate for {video_id}", extra={
+                "event": "quality_rejected",
+                "video_id": video_id,
+                "candidates": len(mp4_candidates),
+                "policy": self.quality_resolver.policy
+            })
+            return None
+        if chosen.url != mp4_url:
+            logger.info(f"🎚️  Using {chosen.resolution or 'unknown'}p rendition for {video_id}", extra={
+                "event": "quality_selected",
+                "video_id": video_id,
+                "resolution": chosen.resolution,
+                "size_bytes": chosen.size_bytes
+            })
+        return chosen.url
+
+    def _log_already_exists(self, video_id: str, file_type: str) -> None:
+        logger.debug(f"{file_type.upper()} already exists for {video_id}", extra={
+            "event": f"{file_type}_already_exists",
+            "video_id": video_id
+        })
+
+    def _finish_attempt(self, result: Dict, target_folder: Path, video_id: str, attempt: int) -> bool:
+        """Validate the folder after an attempt; True (status success) if complete."""
+        final_validation = validate_video_folder(target_folder, video_id)
+        result["validation_details"] = final_validation
+        result["missing_files"] = final_validation["missing_files"]
+        
+        if final_validation["valid"]:
+            result["status"] = "success"
+            logger.info(f"✅ Video {video_id} completed successfully after {attempt} attempts", extra={
+                "event": "video_success",
                 "video_id": video_id,
                 "attempt": attempt,
-                "max_attempts": self.max_retries
+                "file_details": final_validation["file_details"]
             })
+            return True
+
+        logger.warning(f"⚠️  Video {video_id} attempt {attempt} failed - still missing: {final_validation['missing_files']}", extra={
+            "event": "video_attempt_failed", 
+            "video_id": video_id,
+            "attempt": attempt,
+            "missing": final_validation["missing_files"],
+            "validation_details": final_validation["file_details"]
+        })
+        return False
+
+    def _record_attempt_exception(self, result: Dict, video_id: str, attempt: int, exc: Exception) -> None:
+        error_msg = f"Exception during attempt {attempt}: {str(exc)}"
+        result["final_error"] = error_msg
+        logger.error(f"💥 Exception processing video {video_id}: {error_msg}", extra={
+            "event": "video_attempt_exception",
+            "video_id": video_id,
+            "attempt": attempt,
+            "error": str(exc)
+        })
+
+    def _retry_wait_seconds(self, video_id: str, attempt: int) -> int:
+        """Backoff before the next attempt (logged; the engine does the waiting)."""
+        wait_seconds = 5 * attempt
+        logger.info(f"⏳ Waiting {wait_seconds}s before retry for video {video_id}", extra={
+            "event": "retry_wait",
+            "video_id": video_id,
+            "wait_seconds": wait_seconds
+        })
+        return wait_seconds
+
+    def _fail_entry(self, result: Dict, target_folder: Path, video_id: str) -> Dict:
+        """Record the final state of a video whose attempts are exhausted."""
+        result["status"] = "failed"
+        final_validation = validate_video_folder(target_folder, video_id)
+        result["validation_details"] = final_validation
+        result["missing_files"] = final_validation["missing_files"]
+        
+        logger.error(f"💀 Video {video_id} PERMANENTLY FAILED after {self.max_retries} attempts", extra={
+            "event": "video_failed_permanently",
+            "video_id": video_id,
+            "missing": result["missing_files"],
+            "total_attempts": self.max_retries,
+            "validation_details": final_validation["file_details"],
+            "download_results": result["download_results"]
+        })
+        
+        return result
+
+    def process_video_entry(self, entry: Dict) -> Dict:
+        """
+        Process a single video entry with enhanced error reporting.
+        """
+        video_id = entry["video_id"]
+        target_folder = Path(entry["target_folder"])
+        mp4_url = entry["mp4_url"]
+        jpg_url = entry["jpg_url"]
+        result = self._start_entry(entry)
+
+        for attempt in range(1, self.max_retries + 1):
+            result["attempts"] = attempt
+            self._log_attempt_start(video_id, attempt)
             
             try:
                 # Check what files need downloading
@@ -424,160 +942,228 @@ class MediaDownloader:
                 
                 # Download MP4 if missing
                 if "mp4" in current_validation["missing_files"]:
+                    mp4_url = self._select_mp4_url(entry, mp4_url, result)
+                    if mp4_url is None:
+                        # Every rendition is dead or over the size limit; retrying will not help
+                        break
+
                     logger.info(f"📹 Downloading MP4 for {video_id}")
-                    dest_mp4 = target_folder / f"{video_id}.mp4"
-                    mp4_result = self.download_file(mp4_url, dest_mp4, video_id, "mp4")
+                    mp4_result = self.download_mp4(mp4_url, target_folder / f"{video_id}.mp4", video_id)
                     result["download_results"]["mp4"] = mp4_result
                     
                     if not mp4_result["success"]:
                         logger.error(f"MP4 download failed: {mp4_result['error']}")
                 else:
-                    logger.debug(f"MP4 already exists for {video_id}", extra={
-                        "event": "mp4_already_exists",
-                        "video_id": video_id
-                    })
+                    self._log_already_exists(video_id, "mp4")
 
                 # Download JPG if missing
                 if "jpg" in current_validation["missing_files"]:
                     logger.info(f"🖼️  Downloading JPG for {video_id}")
-                    dest_jpg = target_folder / f"{video_id}.jpg"
-                    jpg_result = self.download_file(jpg_url, dest_jpg, video_id, "jpg")
+                    jpg_result = self.download_file(jpg_url, target_folder / f"{video_id}.jpg", video_id, "jpg")
                     result["download_results"]["jpg"] = jpg_result
                     
                     if not jpg_result["success"]:
                         logger.error(f"JPG download failed: {jpg_result['error']}")
                 else:
-                    logger.debug(f"JPG already exists for {video_id}", extra={
-                        "event": "jpg_already_exists",
-                        "video_id": video_id
-                    })
+                    self._log_already_exists(video_id, "jpg")
 
-                # Final validation
-                final_validation = validate_video_folder(target_folder, video_id)
-                result["validation_details"] = final_validation
-                result["missing_files"] = final_validation["missing_files"]
-                
-                if final_validation["valid"]:
-                    result["status"] = "success"
-                    logger.info(f"✅ Video {video_id} completed successfully after {attempt} attempts", extra={
-                        "event": "video_success",
-                        "video_id": video_id,
-                        "attempt": attempt,
-                        "file_details": final_validation["file_details"]
-                    })
+                if self._finish_attempt(result, target_folder, video_id, attempt):
                     return result
-                else:
-                    logger.warning(f"⚠️  Video {video_id} attempt {attempt} failed - still missing: {final_validation['missing_files']}", extra={
-                        "event": "video_attempt_failed", 
-                        "video_id": video_id,
-                        "attempt": attempt,
-                        "missing": final_validation["missing_files"],
-                        "validation_details": final_validation["file_details"]
-                    })
                     
             except Exception as exc:
-                error_msg = f"Exception during attempt {attempt}: {str(exc)}"
-                result["final_error"] = error_msg
-                logger.error(f"💥 Exception processing video {video_id}: {error_msg}", extra={
-                    "event": "video_attempt_exception",
-                    "video_id": video_id,
-                    "attempt": attempt,
-                    "error": str(exc)
-                })
+                self._record_attempt_exception(result, video_id, attempt, exc)
 
             # Wait before retry (except on last attempt)
             if attempt < self.max_retries:
-                wait_seconds = 5 * attempt
-                logger.info(f"⏳ Waiting {wait_seconds}s before retry for video {video_id}", extra={
-                    "event": "retry_wait",
-                    "video_id": video_id,
-                    "wait_seconds": wait_seconds
-                })
-                time.sleep(wait_seconds)
+                time.sleep(self._retry_wait_seconds(video_id, attempt))
 
-        # All attempts failed
-        result["status"] = "failed"
-        final_validation = validate_video_folder(target_folder, video_id)
-        result["validation_details"] = final_validation
-        result["missing_files"] = final_validation["missing_files"]
-        
-        logger.error(f"💀 Video {video_id} PERMANENTLY FAILED after {self.max_retries} attempts", extra={
-            "event": "video_failed_permanently",
-            "video_id": video_id,
-            "missing": result["missing_files"],
-            "total_attempts": self.max_retries,
-            "validation_details": final_validation["file_details"],
-            "download_results": result["download_results"]
-        })
-        
-        return result
+        return self._fail_entry(result, target_folder, video_id)
 
-    def download_from_manifest(self, manifest_path: str, update_progress_cb=None) -> List[Dict]:
+    async def process_video_entry_async(self, client: "aiohttp.ClientSession", entry: Dict) -> Dict:
         """
-        Process manifest with enhanced progress reporting.
+        Async counterpart of process_video_entry: the MP4 and JPG of an
+        attempt download concurrently and retry waits do not hold a worker.
         """
+        video_id = entry["video_id"]
+        target_folder = Path(entry["target_folder"])
+        mp4_url = entry["mp4_url"]
+        jpg_url = entry["jpg_url"]
+        result = self._start_entry(entry)
+
+        for attempt in range(1, self.max_retries + 1):
+            result["attempts"] = attempt
+            self._log_attempt_start(video_id, attempt)
+            
+            try:
+                current_validation = await self._run_io(validate_video_folder, target_folder, video_id)
+                downloads = {}
+                
+                if "mp4" in current_validation["missing_files"]:
+                    if self.quality_resolver is not None and entry.get("mp4_candidates"):
+                        # Probing uses blocking requests; keep it off the event loop
+                        mp4_url = await asyncio.to_thread(self._select_mp4_url, entry, mp4_url, result)
+                    if mp4_url is None:
+                        break
+                    logger.info(f"📹 Downloading MP4 for {video_id}")
+                    downloads["mp4"] = self.download_mp4_async(
+                        client, mp4_url, target_folder / f"{video_id}.mp4", video_id)
+                else:
+                    self._log_already_exists(video_id, "mp4")
+
+                if "jpg" in current_validation["missing_files"]:
+                    logger.info(f"🖼️  Downloading JPG for {video_id}")
+                    downloads["jpg"] = self.download_file_async(
+                        client, jpg_url, target_folder / f"{video_id}.jpg", video_id, "jpg")
+                else:
+                    self._log_already_exists(video_id, "jpg")
+
+                for file_type, file_result in zip(downloads, await asyncio.gather(*downloads.values())):
+                    result["download_results"][file_type] = file_result
+                    if not file_result["success"]:
+                        logger.error(f"{file_type.upper()} download failed: {file_result['error']}")
+
+                if await self._run_io(self._finish_attempt, result, target_folder, video_id, attempt):
+                    return result
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._record_attempt_exception(result, video_id, attempt, exc)
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._retry_wait_seconds(video_id, attempt))
+
+        return await self._run_io(self._fail_entry, result, target_folder, video_id)
+
+    def _load_manifest(self, manifest_path: str) -> Dict:
         p = Path(manifest_path)
-        
         logger.info(f"📋 Loading manifest: {p}")
         
         with p.open("r", encoding="utf-8") as f:
             manifest = json.load(f)
 
-        videos = manifest.get("videos", [])
-        batch_id = manifest.get("batch_id", "unknown")
-        
-        logger.info(f"🚀 Starting batch {batch_id} processing: {len(videos)} videos", extra={
+        logger.info(f"🚀 Starting batch {manifest.get('batch_id', 'unknown')} processing: {len(manifest.get('videos', []))} videos", extra={
             "event": "manifest_processing_start",
             "manifest": str(p),
-            "video_count": len(videos),
-            "batch_id": batch_id
+            "video_count": len(manifest.get("videos", [])),
+            "batch_id": manifest.get("batch_id", "unknown"),
+            "engine": self.engine
         })
+        return manifest
 
-        results = []
+    def _entry_exception_result(self, entry: Dict, exc: BaseException) -> Dict:
+        logger.error(f"💥 Unhandled exception processing video {entry.get('video_id', 'unknown')}: {str(exc)}", extra={
+            "event": "video_unhandled_exception",
+            "video_id": entry.get("video_id"),
+            "error": str(exc)
+        })
+        return {"video_id": entry.get("video_id"), "status": "failed", "error": str(exc)}
 
-        with ThreadPoolExecutor(max_workers=self.workers) as ex:
-            futures = {ex.submit(self.process_video_entry, v): v for v in videos}
-            
-            for i, fut in enumerate(as_completed(futures)):
-                try:
-                    res = fut.result()
-                    progress_pct = ((i + 1) / len(videos)) * 100
-                    
-                    status_emoji = "✅" if res["status"] == "success" else "❌"
-                    logger.info(f"{status_emoji} Progress: {i+1}/{len(videos)} ({progress_pct:.1f}%) - Video {res['video_id']}: {res['status'].upper()}")
-                    
-                except Exception as exc:
-                    v = futures[fut]
-                    logger.error(f"💥 Unhandled exception processing video {v.get('video_id', 'unknown')}: {str(exc)}", extra={
-                        "event": "video_unhandled_exception",
-                        "video_id": v.get("video_id"),
-                        "error": str(exc)
-                    })
-                    res = {"video_id": v.get("video_id"), "status": "failed", "error": str(exc)}
-                
-                results.append(res)
-                
-                if update_progress_cb:
-                    try:
-                        update_progress_cb(res)
-                    except Exception:
-                        logger.debug("Progress callback failed", exc_info=True)
+    def _report_progress(self, res: Dict, done: int, total: int, update_progress_cb) -> None:
+        progress_pct = (done / total) * 100
+        status_emoji = "✅" if res["status"] == "success" else "❌"
+        logger.info(f"{status_emoji} Progress: {done}/{total} ({progress_pct:.1f}%) - Video {res['video_id']}: {res['status'].upper()}")
+        
+        if update_progress_cb:
+            try:
+                update_progress_cb(res)
+            except Exception:
+                logger.debug("Progress callback failed", exc_info=True)
 
-        # Final statistics
+    def _log_batch_summary(self, manifest_path: str, batch_id, results: List[Dict]) -> None:
         success_count = len([r for r in results if r["status"] == "success"])
         failed_count = len([r for r in results if r["status"] == "failed"])
         success_rate = (success_count / len(results) * 100) if results else 0
         
         logger.info(f"🏁 Batch {batch_id} completed: {success_count}/{len(results)} successful ({success_rate:.1f}%)", extra={
             "event": "manifest_processing_complete",
-            "manifest": str(p),
+            "manifest": str(manifest_path),
             "batch_id": batch_id,
             "total_videos": len(results),
             "successful": success_count,
             "failed": failed_count,
-            "success_rate": success_rate
+            "success_rate": success_rate,
+            "transfer_stats": self.get_transfer_stats()
         })
-        
+
+    def download_from_manifest(self, manifest_path: str, update_progress_cb=None) -> List[Dict]:
+        """
+        Process manifest with enhanced progress reporting.
+        Runs the configured engine; blocks until the batch is done.
+        """
+        if self.engine == ENGINE_ASYNC:
+            return asyncio.run(self.download_from_manifest_async(manifest_path, update_progress_cb))
+
+        manifest = self._load_manifest(manifest_path)
+        videos = manifest.get("videos", [])
+        results = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            futures = {ex.submit(self.process_video_entry, v): v for v in videos}
+            
+            for fut in as_completed(futures):
+                try:
+                    res = fut.result()
+                except Exception as exc:
+                    res = self._entry_exception_result(futures[fut], exc)
+                
+                results.append(res)
+                self._report_progress(res, len(results), len(videos), update_progress_cb)
+
+        self._log_batch_summary(manifest_path, manifest.get("batch_id", "unknown"), results)
+        return results
+
+    async def download_from_manifest_async(self, manifest_path: str, update_progress_cb=None) -> List[Dict]:
+        """
+        Process a manifest on the event loop: up to `concurrency` videos in
+        flight over one pooled aiohttp client. Cancelling the call cancels
+        every transfer (partial files stay as .part and are redone next run).
+        Disk work goes to io_executor (io_workers threads), which bounds how
+        fast transfers can write: raise io_workers with concurrency on slow disks.
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for the async download engine")
+
+        manifest = self._load_manifest(manifest_path)
+        videos = manifest.get("videos", [])
+        results = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_entry(entry: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    return await self.process_video_entry_async(client, entry)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    return self._entry_exception_result(entry, exc)
+
+        # Each video can have its MP4 and JPG in flight at once
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 2, ttl_dns_cache=300)
+        # aiohttp manages keep-alive and content encodings itself
+        headers = {key: value for key, value in self.session.headers.items()
+                   if key not in ("Connection", "Accept-Encoding")}
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as client:
+            tasks = [asyncio.create_task(run_entry(v)) for v in videos]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    res = await next_done
+                    results.append(res)
+                    self._report_progress(res, len(results), len(videos), update_progress_cb)
+            finally:
+                # Reached with tasks pending only on cancellation or a failing callback
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    logger.warning(f"🛑 Cancelled {len(pending)} unfinished downloads", extra={
+                        "event": "manifest_processing_cancelled",
+                        "manifest": str(manifest_path),
+                        "pending": len(pending)
+                    })
+
+        self._log_batch_summary(manifest_path, manifest.get("batch_id", "unknown"), results)
         return results
 
 
@@ -585,17 +1171,32 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Enhanced Media Downloader with detailed error reporting")
     parser.add_argument("--manifest", required=True, help="Path to batch manifest JSON")
     parser.add_argument("--max-retries", type=int, default=3, help="Retries per video")
-    parser.add_argument("--workers", type=int, default=4, help="Parallel downloads")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel downloads (threads engine)")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE_ASYNC, help="Download engine")
+    parser.add_argument("--concurrency", type=int, default=8, help="Videos in flight (async engine)")
+    parser.add_argument("--download-method", choices=DOWNLOAD_METHODS, default="direct",
+                        help="Fetch MP4s in one stream or in concurrent byte ranges")
+    parser.add_argument("--quality-policy", choices=POLICIES, default="max_quality",
+                        help="How to pick among an entry's mp4_candidates")
+    parser.add_argument("--max-size-mb", type=float, default=0, help="Size limit for the size policies")
+    parser.add_argument("--probe", action="store_true", help="HEAD-probe candidates before downloading")
     args = parser.parse_args()
 
     print(f"🎬 Enhanced Media Downloader Starting...")
     print(f"📋 Manifest: {args.manifest}")
     print(f"🔄 Max retries: {args.max_retries}")
-    print(f"🧵 Workers: {args.workers}")
+    print(f"⚙️  Engine: {args.engine}")
+    print(f"🧵 Workers: {args.workers if args.engine == ENGINE_THREADS else args.concurrency}")
     print("=" * 60)
 
-    md = MediaDownloader(max_retries=args.max_retries, workers=args.workers)
-    results = md.download_from_manifest(args.manifest)
+    resolver = QualityResolver(policy=args.quality_policy, max_size_mb=args.max_size_mb, probe=args.probe)
+    md = MediaDownloader(max_retries=args.max_retries, workers=args.workers, quality_resolver=resolver,
+                         engine=args.engine, concurrency=args.concurrency,
+                         download_method=args.download_method)
+    try:
+        results = md.download_from_manifest(args.manifest)
+    finally:
+        md.close()
 
     # Save detailed results
     summary_path = Path(args.manifest).with_name(Path(args.manifest).stem + "_detailed_results.json")
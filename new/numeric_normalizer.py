@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Numeric Normalizer Module
+
+Batch conversion of the raw view/like counters ("9.4K (9,425)", "3M",
+"1,204") and durations ("15:17", "1:02:03", "PT0H15M17S") of a whole
+listing page, manifest or catalog into NumPy arrays. Scraped values
+repeat heavily, so each batch is coded by its distinct values first,
+those are parsed once, and the results are scattered back to the whole
+batch with one vectorised take. Plain numbers (JSON-LD counts,
+already-normalised records) pass through unparsed.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import math
+import re
+from typing import Any, Dict, Iterable, Optional, Sequence
+import logging
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Same precedence as VideoInfoExtractor.parse_views_number: the exact
+# number in parentheses wins over the abbreviated one in front of it
+_PAREN_COUNT = re.compile(r'\((\d+(?:,\d{3})*)\)')
+_SHORT_COUNT = re.compile(r'([\d,.]+)\s*([KkMmBb]?)')
+_NON_DIGITS = re.compile(r'\D')
+_SUFFIX_MULTIPLIERS = {'': 1, 'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+
+_CLOCK_DURATION = re.compile(r'^(?:(\d+):)?(\d+):(\d+)$')
+_ISO_DURATION = re.compile(r'^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?$', re.IGNORECASE)
+
+# Record keys normalize_records() reads by default
+COUNT_FIELDS = ("views", "likes")
+DURATION_FIELDS = ("duration",)
+
+
+def parse_count(value: Any) -> int:
+    """
+    Convert one counter to an integer ("2.4K (24,875)" -> 24875, "3M" -> 3000000).
+
+    Args:
+        value: Raw counter text or a number
+
+    Returns:
+        Count (0 when nothing numeric is found)
+    """
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, float)):
+        return 0 if isinstance(value, float) and math.isnan(value) else int(value)
+
+    text = str(value)
+    paren_match = _PAREN_COUNT.search(text)
+    if paren_match:
+        return int(paren_match.group(1).replace(',', ''))
+
+    short_match = _SHORT_COUNT.search(text)
+    if short_match:
+        try:
+            number = float(short_match.group(1).replace(',', ''))
+        except ValueError:
+            digits = _NON_DIGITS.sub('', text)
+            return int(digits) if digits else 0
+        return int(number * _SUFFIX_MULTIPLIERS[short_match.group(2).upper()])
+
+    digits = _NON_DIGITS.sub('', text)
+    return int(digits) if digits else 0
+
+
+def parse_duration_seconds(value: Any) -> float:
+    """
+    Convert one duration to seconds ("15:17" -> 917, "PT1H2M3S" -> 3723, "917" -> 917).
+
+    Args:
+        value: Raw duration text or a number of seconds
+
+    Returns:
+        Seconds, or NaN when the value is not a duration ("Unknown", "")
+    """
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip()
+    clock_match = _CLOCK_DURATION.match(text)
+    if clock_match:
+        hours, minutes, seconds = clock_match.groups()
+        return float(int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds))
+
+    iso_match = _ISO_DURATION.match(text)
+    if iso_match and text.upper() != "PT":
+        hours, minutes, seconds = iso_match.groups()
+        # Whole seconds, like convert_iso_duration_to_readable
+        return float(int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(float(seconds or 0)))
+
+    if text.isdigit():
+        return float(text)
+    return math.nan
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for batch numeric normalisation")
+
+
+def _normalize(values: Sequence[Any], parse, dtype):
+    """Parse the distinct values of a batch once and scatter the results back."""
+    # Code each value by first occurrence; scraped batches hold few distinct strings
+    distinct: Dict[Any, int] = {}
+    codes = np.fromiter((distinct.setdefault(value, len(distinct)) for value in values),
+                        dtype=np.intp, count=len(values))
+    parsed = np.fromiter((parse(value) for value in distinct), dtype=dtype, count=len(distinct))
+    return parsed[codes]
+
+
+def normalize_counts(values: Iterable[Any]) -> "np.ndarray":
+    """
+    Convert a batch of view/like counters to an int64 array.
+
+    Args:
+        values: Raw counter texts and/or numbers
+
+    Returns:
+        int64 array in input order (0 where nothing numeric was found)
+    """
+    _require_numpy()
+    return _normalize(list(values), parse_count, np.int64)
+
+
+def normalize_durations(values: Iterable[Any]) -> "np.ndarray":
+    """
+    Convert a batch of durations to a float64 array of seconds.
+
+    Args:
+        values: "MM:SS", "HH:MM:SS", ISO-8601 or plain-seconds values
+
+    Returns:
+        float64 array in input order (NaN where the value is not a duration)
+    """
+    _require_numpy()
+    return _normalize(list(values), parse_duration_seconds, np.float64)
+
+
+def normalize_records(records: Iterable[Dict[str, Any]],
+                      count_fields: Sequence[str] = COUNT_FIELDS,
+                      duration_fields: Sequence[str] = DURATION_FIELDS) -> Dict[str, "np.ndarray"]:
+    """
+    Normalise the numeric fields of many video records in one pass per field.
+
+    Args:
+        records: Video data dicts (parser output, manifest entries, catalog rows)
+        count_fields: Keys holding view/like counters
+        duration_fields: Keys holding durations
+
+    Returns:
+        Field name -> array in record order (durations in seconds)
+    """
+    _require_numpy()
+    records = records if isinstance(records, list) else list(records)
+    arrays = {}
+    for field in count_fields:
+        arrays[field] = normalize_counts([record.get(field) for record in records])
+    for field in duration_fields:
+        arrays[field] = normalize_durations([record.get(field) for record in records])
+    return arrays
+
+
+def summarize(arrays: Dict[str, "np.ndarray"]) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Catalog statistics of normalised arrays.
+
+    Args:
+        arrays: Output of normalize_records
+
+    Returns:
+        Field name -> count/total/mean/median/max (NaN durations are skipped)
+    """
+    _require_numpy()
+    summary = {}
+    for field, values in arrays.items():
+        known = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+        if known.size == 0:
+            summary[field] = {"count": 0, "total": None, "mean": None, "median": None, "max": None}
+            continue
+        summary[field] = {
+            "count": int(known.size),
+            "total": float(known.sum()),
+            "mean": float(known.mean()),
+            "median": float(np.median(known)),
+            "max": float(known.max()),
+        }
+    return summary
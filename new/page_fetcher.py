@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Page Fetcher Module
+
+Pluggable HTML fetch engines for the video data parser.
+The HTTP engine serves server-rendered pages from one pooled keep-alive
+session; the browser engine renders through Playwright and is used as
+the fallback when required fields are missing from the plain HTML.
+Detail pages can be streamed through an incremental parser so reading
+stops as soon as the sections holding the video fields have arrived;
+the parser's tree goes straight to the DOM extractor while the rest of
+the body is drained in the background to keep the connection pooled.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import logging
+
+from readiness import DETAIL_READY_SELECTORS, ReadinessWaiter
+from session_state import SessionStateStore
+from stream_parser import LXML_AVAILABLE, VideoPageStreamParser
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+@dataclass
+class FetchResult:
+    """Container for a fetched page."""
+    url: str
+    html: str
+    status: int
+    engine: str
+    elapsed_seconds: float
+    # Undecoded response body (HTTP engine only) for the process parse stage
+    body: Optional[bytes] = None
+    encoding: str = "utf-8"
+    # True when the download stopped early and html/body hold only a prefix
+    truncated: bool = False
+    # lxml root built while streaming (same document as html, parsed once)
+    tree: Optional[Any] = None
+
+    def raw_bytes(self) -> Tuple[bytes, str]:
+        """The page as (bytes, encoding), encoding the rendered HTML if no raw body was kept."""
+        if self.body is not None:
+            return self.body, self.encoding
+        return self.html.encode("utf-8"), "utf-8"
+
+
+class PageFetcher:
+    """Base class for fetch engines."""
+
+    name = "base"
+
+    async def start(self) -> None:
+        """Open any long-lived resources."""
+
+    async def close(self) -> None:
+        """Release any long-lived resources."""
+
+    async def fetch(self, url: str) -> Optional[FetchResult]:
+        """
+        Fetch a page.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            FetchResult, or None if the page could not be fetched
+        """
+        raise NotImplementedError
+
+
+class HttpPageFetcher(PageFetcher):
+    """Plain HTTP fetcher backed by one pooled aiohttp session."""
+
+    name = "http"
+
+    def __init__(self, user_agent: Optional[str] = None, max_connections: int = 20,
+                 max_connections_per_host: int = 10, keepalive_timeout: float = 30.0,
+                 timeout_seconds: float = 30.0, headers: Optional[Dict[str, str]] = None,
+                 session_store: Optional[SessionStateStore] = None,
+                 stream_sections: Optional[List[str]] = None, stream_chunk_bytes: int = 16384,
+                 stream_drain_max_bytes: int = 262144):
+        """
+        Initialize HTTP fetcher.
+
+        Args:
+            user_agent: User agent header
+            max_connections: Total connection pool size
+            max_connections_per_host: Connection pool size per host
+            keepalive_timeout: Seconds to keep idle connections alive
+            timeout_seconds: Total timeout per request
+            headers: Extra default headers
+            session_store: Saved age-gate session whose cookies seed the cookie jar
+            stream_sections: Page sections after which a streamed fetch may stop
+                (see stream_parser.KNOWN_SECTIONS; empty disables early stop)
+            stream_chunk_bytes: Read size while streaming
+            stream_drain_max_bytes: Largest remainder read and discarded after
+                an early stop to keep the connection alive; bigger remainders
+                close the connection instead
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for HttpPageFetcher")
+
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout_seconds = timeout_seconds
+        self.headers = {
+            "User-Agent": user_agent or DEFAULT_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Connection": "keep-alive",
+        }
+        if headers:
+            self.headers.update(headers)
+
+        self.session_store = session_store
+        self.stream_sections = list(stream_sections) if stream_sections is not None else []
+        self.stream_chunk_bytes = max(1024, stream_chunk_bytes)
+        self.stream_drain_max_bytes = max(0, stream_drain_max_bytes)
+        self._session = None
+        self._drain_tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "failures": 0, "bytes": 0, "early_stops": 0,
+                      "bytes_skipped": 0, "bytes_drained": 0, "connections_closed": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]],
+                    session_store: Optional[SessionStateStore] = None) -> "HttpPageFetcher":
+        """
+        Build an HTTP fetcher from the ``fetcher`` section of config.json.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+            session_store: Optional shared session state store
+
+        Returns:
+            Configured HttpPageFetcher
+        """
+        config = config or {}
+        fetch_config = config.get("fetcher", {})
+        return cls(
+            user_agent=config.get("general", {}).get("user_agent"),
+            max_connections=fetch_config.get("max_connections", 20),
+            max_connections_per_host=fetch_config.get("max_connections_per_host", 10),
+            keepalive_timeout=fetch_config.get("keepalive_timeout_seconds", 30),
+            timeout_seconds=fetch_config.get("timeout_seconds", 30),
+            session_store=session_store,
+            stream_sections=fetch_config.get("stream_stop_sections", ["json_ld", "video_info"]),
+            stream_chunk_bytes=fetch_config.get("stream_chunk_bytes", 16384),
+            stream_drain_max_bytes=fetch_config.get("stream_drain_max_bytes", 262144)
+        )
+
+    @property
+    def session(self):
+        """The underlying aiohttp session (None until started)."""
+        return self._session
+
+    async def start(self) -> None:
+        """Create the pooled session (must run inside the event loop)."""
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=aiohttp.CookieJar(),
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds)
+        )
+        self.apply_session_cookies()
+        logger.info(f"HTTP fetcher session opened (pool {self.max_connections}, "
+                    f"per host {self.max_connections_per_host})")
+
+    def apply_session_cookies(self) -> None:
+        """Load the saved age-gate cookies into the session's cookie jar."""
+        if self.session_store is None or self._session is None or self._session.closed:
+            return
+
+        cookies = self.session_store.get_http_cookies()
+        if cookies:
+            self._session.cookie_jar.update_cookies(cookies)
+            logger.debug(f"Applied {len(cookies)} saved session cookies to HTTP session")
+
+    async def close(self) -> None:
+        """Close the pooled session (pending drains are cancelled)."""
+        for task in list(self._drain_tasks):
+            task.cancel()
+        if self._drain_tasks:
+            await asyncio.gather(*self._drain_tasks, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"HTTP fetcher session closed (stats: {self.stats})")
+        self._session = None
+
+    async def fetch(self, url: str, stream: bool = False) -> Optional[FetchResult]:
+        """
+        Fetch a page over plain HTTP.
+
+        Args:
+            url: Page URL
+            stream: Stop reading once the configured stream sections have
+                arrived (detail pages only; listings are always read whole)
+
+        Returns:
+            FetchResult, or None if the page could not be fetched
+        """
+        await self.start()
+
+        start_time = time.monotonic()
+        self.stats["requests"] += 1
+        response = None
+        truncated = False
+        try:
+            response = await self._session.get(url)
+            if response.status >= 400:
+                await response.read()
+                self.stats["failures"] += 1
+                logger.warning(f"HTTP {response.status} fetching {url}")
+                return None
+
+            tree = None
+            if stream and self.stream_sections and LXML_AVAILABLE:
+                encoding = response.charset or "utf-8"
+                body, tree, truncated = await self._read_streamed(response, url)
+            else:
+                body = await response.read()
+                encoding = response.get_encoding() or "utf-8"
+
+            self.stats["bytes"] += len(body)
+            html = body.decode(encoding, errors="replace")
+            return FetchResult(
+                url=str(response.url),
+                html=html,
+                status=response.status,
+                engine=self.name,
+                elapsed_seconds=time.monotonic() - start_time,
+                body=body,
+                encoding=encoding,
+                truncated=truncated,
+                tree=tree
+            )
+
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        finally:
+            # A truncated response belongs to its drain task
+            if response is not None and not truncated:
+                response.release()
+
+    async def _read_streamed(self, response, url: str) -> Tuple[bytes, Optional[Any], bool]:
+        """
+        Read a response body until the stream sections are complete.
+
+        When reading stops early the response is handed to a background
+        drain so its keep-alive connection returns to the pool.
+
+        Returns:
+            (body bytes received, tree parsed from them or None,
+             True if the rest of the body was skipped)
+        """
+        parser = VideoPageStreamParser(self.stream_sections, encoding=response.charset)
+        chunks = []
+        complete = False
+        try:
+            async for chunk in response.content.iter_chunked(self.stream_chunk_bytes):
+                chunks.append(chunk)
+                if parser.feed(chunk):
+                    complete = True
+                    break
+        finally:
+            tree = parser.close()
+
+        body = b"".join(chunks)
+        if not complete or response.content.at_eof():
+            return body, tree, False
+
+        self.stats["early_stops"] += 1
+        logger.debug(f"Stopped reading {url} after {parser.bytes_fed} bytes "
+                     f"(sections {parser.sections_closed})")
+        task = asyncio.ensure_future(self._drain(response, url, parser.bytes_fed))
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
+        return body, tree, True
+
+    async def _drain(self, response, url: str, received: int) -> None:
+        """
+        Read and discard the rest of an early-stopped body.
+
+        A fully read response releases its connection back to the pool; a
+        remainder over stream_drain_max_bytes closes the connection instead.
+        """
+        remaining = response.content_length - received if response.content_length else None
+        drained = 0
+        try:
+            if remaining is None or remaining <= self.stream_drain_max_bytes:
+                async for chunk in response.content.iter_chunked(self.stream_chunk_bytes):
+                    drained += len(chunk)
+                    if drained > self.stream_drain_max_bytes:
+                        break
+                else:
+                    self.stats["bytes_drained"] += drained
+                    return
+
+            # Too much left to read: dropping the connection is cheaper
+            self.stats["connections_closed"] += 1
+            if remaining is not None:
+                self.stats["bytes_skipped"] += max(0, remaining - drained)
+            logger.debug(f"Closed connection for {url} instead of draining")
+            response.close()
+        except Exception as e:
+            logger.debug(f"Drain failed for {url}: {e}")
+            response.close()
+        finally:
+            response.release()
+
+
+class BrowserPageFetcher(PageFetcher):
+    """Playwright fetcher that renders the page before reading its HTML."""
+
+    name = "browser"
+
+    def __init__(self, open_page: Callable[[], Any], waiter: Optional[ReadinessWaiter] = None,
+                 ready_selectors: Optional[List[str]] = None):
+        """
+        Initialize browser fetcher.
+
+        Args:
+            open_page: Callable returning an async context manager that yields a page
+            waiter: Readiness waiter used after DOMContentLoaded
+            ready_selectors: Selectors that mark the page as ready
+        """
+        self.open_page = open_page
+        self.waiter = waiter or ReadinessWaiter()
+        self.ready_selectors = ready_selectors or DETAIL_READY_SELECTORS
+
+    async def fetch(self, url: str) -> Optional[FetchResult]:
+        """Render a page in Chromium and return its HTML once it is ready."""
+        start_time = time.monotonic()
+        async with self.open_page() as page:
+            deadline = self.waiter.new_deadline()
+            response = await page.goto(url, wait_until='domcontentloaded')
+            await self.waiter.wait_for_any(page, self.ready_selectors, "detail_ready", deadline=deadline)
+            html = await page.content()
+
+        return FetchResult(
+            url=url,
+            html=html,
+            status=response.status if response else 200,
+            engine=self.name,
+            elapsed_seconds=time.monotonic() - start_time
+        )
+
+
+def create_http_fetcher(config: Optional[Dict[str, Any]],
+                        session_store: Optional[SessionStateStore] = None) -> Optional[HttpPageFetcher]:
+    """
+    Create the configured primary fetcher.
+
+    Args:
+        config: Full configuration dictionary (may be None)
+        session_store: Optional shared session state store
+
+    Returns:
+        HttpPageFetcher, or None when the browser engine is configured
+        or aiohttp is not installed
+    """
+    engine = (config or {}).get("fetcher", {}).get("engine", "http")
+    if engine != "http":
+        return None
+
+    if not AIOHTTP_AVAILABLE:
+        logger.warning("aiohttp not installed, falling back to browser fetch engine")
+        return None
+
+    return HttpPageFetcher.from_config(config, session_store=session_store)
@@ -12,12 +12,19 @@ Version: 1.0
 import asyncio
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from video_data_parser import OptimizedVideoDataParser
+from browser_pool import BrowserPool
+from page_fetcher import create_http_fetcher
+from parse_pool import ParsePool
+from readiness import ReadinessWaiter
+from selector_schema import load_schema
+from session_state import SessionStateStore
 from utils import SafeFileOperations, TimestampHelper
+from vocabulary import get_vocabulary
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +41,13 @@ class VideoMetadata:
     tags: List[str]
     page_url: str
     folder_path: str
+    # Every download rendition (see quality_resolver) for re-selection at download time
+    download_candidates: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        # Batches hold many of these; share one copy of each tag string
+        if isinstance(self.tags, list):
+            self.tags = get_vocabulary().intern_list(self.tags)
 
 
 @dataclass
@@ -46,23 +60,96 @@ class PageParseResult:
     errors: List[str]
     parse_time_seconds: float
     page_url: str
+    skipped_video_ids: List[str] = field(default_factory=list)
 
 
 class PageParser:
     """Handles parsing of individual pages for video metadata."""
 
     def __init__(self, base_url: str = "https://rule34video.com", 
-                 downloads_dir: str = "downloads"):
+                 downloads_dir: str = "downloads",
+                 config: Optional[Dict[str, Any]] = None,
+                 browser_pool: Optional[BrowserPool] = None):
         """
         Initialize page parser.
 
         Args:
             base_url: Base URL for the site
             downloads_dir: Base directory for downloads
+            config: Optional configuration dictionary (browser_pool section)
+            browser_pool: Optional pre-built browser pool to share
         """
         self.base_url = base_url
         self.downloads_dir = Path(downloads_dir)
-        self.parser = OptimizedVideoDataParser(base_url)
+        self.config = config or {}
+        self.browser_pool = browser_pool or BrowserPool.from_config(self.config)
+        if self.browser_pool.session_store is None:
+            self.browser_pool.session_store = SessionStateStore.from_config(self.config)
+        session_store = self.browser_pool.session_store
+        fetcher = create_http_fetcher(self.config, session_store=session_store)
+        self.parser = OptimizedVideoDataParser(
+            base_url,
+            browser_pool=self.browser_pool,
+            fetcher=fetcher,
+            use_http=fetcher is not None,
+            required_fields=self.config.get("fetcher", {}).get("required_fields"),
+            resource_policy=self.browser_pool.resource_policy,
+            session_store=session_store,
+            readiness_waiter=ReadinessWaiter.from_config(self.config),
+            extraction_engine=self.config.get("extraction", {}).get("engine", "dom"),
+            parse_pool=ParsePool.from_config(base_url, self.config, schema=load_schema())
+        )
+
+        # Concurrent detail-page fetching
+        processing_config = self.config.get("processing", {})
+        self.max_concurrent_videos = max(1, processing_config.get("max_concurrent_videos", 3))
+        self.use_concurrent_parsing = processing_config.get("use_parallel_video_processing", True)
+        self.max_concurrent_listings = max(1, processing_config.get("max_concurrent_listings", 3))
+
+        # Listing-only mode: metadata from the listing page, detail pages only for missing fields
+        self.listing_only = processing_config.get("listing_only_mode", False)
+        self.listing_detail_fields = processing_config.get("listing_detail_fields", ["video_url", "tags"])
+        self.listing_stats = {"listing_fetches": 0, "videos_from_listing": 0,
+                              "detail_fetches": 0, "videos_filtered": 0}
+
+    async def start(self) -> None:
+        """Start the shared browser pool for the whole run."""
+        await self.browser_pool.start()
+
+    async def close(self) -> None:
+        """Close the shared browser pool and HTTP session."""
+        wait_metrics = self.parser.waiter.get_metrics()
+        if wait_metrics:
+            logger.info(f"Readiness wait metrics: {wait_metrics}")
+        if self.listing_stats["listing_fetches"]:
+            logger.info(f"Listing-only mode stats: {self.listing_stats}")
+        if self.parser.field_source_stats:
+            logger.info(f"Video field sources: {self.parser.field_source_stats}")
+        self._report_selector_stats()
+        await self.parser.close()
+        await self.browser_pool.close()
+
+    def _report_selector_stats(self) -> None:
+        """Log which selector fallbacks won per field and accumulate the counts on disk."""
+        schema = self.parser.extractor.schema
+        report = schema.get_hit_report()
+        if not report:
+            return
+
+        for key, entry in sorted(report.items()):
+            logger.info(f"Selector hits for {key}: {entry['hits']} "
+                        f"(misses {entry['misses']}, never hit: {entry.get('never_hit', [])})")
+
+        stats_path = self.config.get("extraction", {}).get("selector_stats_path")
+        if stats_path:
+            schema.save_stats(stats_path)
+
+    async def __aenter__(self) -> "PageParser":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
 
     def _get_page_url(self, page_number: int) -> str:
         """
@@ -101,20 +188,85 @@ class PageParser:
         """
         return self._get_page_folder(page_number) / video_id
 
+    @staticmethod
+    def downloaded_video_filter(downloaded_video_ids: List[str]) -> Callable[[str], bool]:
+        """
+        Build a listing-mode video filter that skips already downloaded videos.
+
+        Args:
+            downloaded_video_ids: Video IDs recorded as downloaded in progress.json
+
+        Returns:
+            Callable returning True for videos that still need processing
+        """
+        downloaded = set(downloaded_video_ids)
+        return lambda video_id: video_id not in downloaded
+
+    async def prefetch_listings(self, page_numbers: List[int],
+                                listing_only: Optional[bool] = None) -> Dict[int, List[Any]]:
+        """
+        Fetch several listing pages concurrently ahead of parse_page.
+
+        Args:
+            page_numbers: Page numbers to fetch
+            listing_only: Fetch listing entries instead of video URLs
+                (defaults to processing.listing_only_mode)
+
+        Returns:
+            Dict of page number -> video URLs (or listing entries); failed pages map to []
+        """
+        if listing_only is None:
+            listing_only = self.listing_only
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_listings)
+        logger.info(f"Prefetching {len(page_numbers)} listing pages "
+                    f"(max {self.max_concurrent_listings} at a time)")
+
+        async def fetch_listing(page_number: int) -> List[Any]:
+            async with semaphore:
+                page_url = self._get_page_url(page_number)
+                try:
+                    if listing_only:
+                        self.listing_stats["listing_fetches"] += 1
+                        return await self.parser.extract_listing_items(page_url)
+                    return await self.parser.extract_video_urls(page_url)
+                except Exception as e:
+                    logger.error(f"Error prefetching listing page {page_number}: {e}")
+                    return []
+
+        listings = await asyncio.gather(*(fetch_listing(n) for n in page_numbers))
+        return dict(zip(page_numbers, listings))
+
     async def parse_page(self, page_number: int, 
-                        save_metadata: bool = True) -> PageParseResult:
+                        save_metadata: bool = True,
+                        concurrent: Optional[bool] = None,
+                        listing_only: Optional[bool] = None,
+                        video_filter: Optional[Callable[[str], bool]] = None,
+                        prefetched_listing: Optional[List[Any]] = None) -> PageParseResult:
         """
         Parse a single page and extract video metadata.
 
         Args:
             page_number: Page number to parse
             save_metadata: Whether to save metadata files to disk
+            concurrent: Fan out over video URLs (defaults to
+                processing.use_parallel_video_processing)
+            listing_only: Build metadata from the listing page and fetch detail
+                pages only for missing fields (defaults to processing.listing_only_mode)
+            video_filter: Listing mode only; videos whose ID it rejects are
+                skipped before any detail fetch
+            prefetched_listing: Result of prefetch_listings for this page; an
+                empty or missing listing is fetched again here
 
         Returns:
             PageParseResult with parsing results
         """
         start_time = asyncio.get_event_loop().time()
         page_url = self._get_page_url(page_number)
+        if concurrent is None:
+            concurrent = self.use_concurrent_parsing
+        if listing_only is None:
+            listing_only = self.listing_only
 
         logger.info(f"Starting parse of page {page_number}: {page_url}")
 
@@ -129,60 +281,62 @@ class PageParser:
         )
 
         try:
-            # Extract video URLs from the page
-            video_urls = await self.parser.extract_video_urls()
-            logger.info(f"Found {len(video_urls)} video URLs on page {page_number}")
-
-            if not video_urls:
-                result.errors.append("No video URLs found on page")
-                logger.warning(f"No videos found on page {page_number}")
-                return result
-
-            # Parse each video
-            videos = []
-            for i, video_url in enumerate(video_urls):
-                try:
-                    logger.debug(f"Parsing video {i+1}/{len(video_urls)}: {video_url}")
-
-                    # Parse video metadata
-                    video_data = await self.parser.parse_single_video(video_url)
-
-                    if video_data and video_data.get("video_id"):
-                        # Create video metadata object
-                        video_metadata = VideoMetadata(
-                            video_id=video_data["video_id"],
-                            title=video_data.get("title", "Unknown Title"),
-                            duration=video_data.get("duration", "00:00"),
-                            thumbnail_url=video_data.get("thumbnail_src", ""),
-                            video_url=video_data.get("video_src", ""),
-                            upload_date=video_data.get("upload_date", ""),
-                            tags=video_data.get("tags", []),
-                            page_url=video_url,
-                            folder_path=str(self._get_video_folder(page_number, video_data["video_id"]))
-                        )
-
-                        videos.append(video_metadata)
+            if listing_only:
+                items = prefetched_listing
+                if not items:
+                    items = await self.parser.extract_listing_items(page_url)
+                    self.listing_stats["listing_fetches"] += 1
+                logger.info(f"Found {len(items)} listing entries on page {page_number}")
+
+                if not items:
+                    result.errors.append("No video entries found on listing page")
+                    logger.warning(f"No videos found on page {page_number}")
+                    return result
+
+                if video_filter is not None:
+                    result.skipped_video_ids = [item["video_id"] for item in items
+                                                if not video_filter(item["video_id"])]
+                    if result.skipped_video_ids:
+                        skipped = set(result.skipped_video_ids)
+                        items = [item for item in items if item["video_id"] not in skipped]
+                        self.listing_stats["videos_filtered"] += len(skipped)
+                        logger.info(f"Skipping {len(skipped)} already downloaded videos on page {page_number}")
+
+                entries = [
+                    (lambda i=i, item=item: self._parse_listing_entry(page_number, i, len(items),
+                                                                      item, save_metadata))
+                    for i, item in enumerate(items)
+                ]
+            else:
+                # Extract video URLs from the page
+                video_urls = prefetched_listing or await self.parser.extract_video_urls(page_url)
+                logger.info(f"Found {len(video_urls)} video URLs on page {page_number}")
 
-                        # Save metadata to disk if requested
-                        if save_metadata:
-                            await self._save_video_metadata(page_number, video_metadata, video_data)
+                if not video_urls:
+                    result.errors.append("No video URLs found on page")
+                    logger.warning(f"No videos found on page {page_number}")
+                    return result
 
-                        logger.debug(f"Successfully parsed video: {video_data['video_id']}")
+                entries = [
+                    (lambda i=i, url=url: self._parse_video_entry(page_number, i, len(video_urls),
+                                                                  url, save_metadata))
+                    for i, url in enumerate(video_urls)
+                ]
 
-                    else:
-                        error_msg = f"Failed to parse video metadata from {video_url}"
-                        result.errors.append(error_msg)
-                        logger.warning(error_msg)
+            outcomes = await self._run_entries(entries, concurrent)
 
-                except Exception as e:
-                    error_msg = f"Error parsing video {video_url}: {e}"
+            videos = []
+            for video_metadata, error_msg in outcomes:
+                if video_metadata is not None:
+                    videos.append(video_metadata)
+                if error_msg:
                     result.errors.append(error_msg)
-                    logger.error(error_msg)
 
             # Update result
             result.videos = videos
             result.video_count = len(videos)
-            result.success = len(videos) > 0
+            # A listing page whose videos were all filtered out still parsed fine
+            result.success = len(videos) > 0 or (bool(result.skipped_video_ids) and not result.errors)
 
             if result.success:
                 logger.info(f"Successfully parsed page {page_number}: {len(videos)} videos")
@@ -201,6 +355,146 @@ class PageParser:
 
         return result
 
+    async def _run_entries(self, entries: List[Callable[[], Awaitable[Tuple[Optional[VideoMetadata], Optional[str]]]]],
+                           concurrent: bool) -> List[Tuple[Optional[VideoMetadata], Optional[str]]]:
+        """
+        Run per-video parse coroutines, bounded by max_concurrent_videos.
+
+        Args:
+            entries: Zero-argument callables creating one parse coroutine each
+            concurrent: Fan out instead of running one at a time
+
+        Returns:
+            Outcomes in the original order
+        """
+        if concurrent and len(entries) > 1:
+            logger.info(f"Parsing {len(entries)} videos concurrently "
+                        f"(max {self.max_concurrent_videos} at a time)")
+            semaphore = asyncio.Semaphore(self.max_concurrent_videos)
+
+            async def bounded_parse(entry):
+                async with semaphore:
+                    return await entry()
+
+            # gather() keeps results in the original URL order
+            return list(await asyncio.gather(*(bounded_parse(entry) for entry in entries)))
+
+        outcomes = []
+        for entry in entries:
+            outcomes.append(await entry())
+        return outcomes
+
+    async def _parse_listing_entry(self, page_number: int, index: int, total: int,
+                                   item: Dict[str, Any], save_metadata: bool) -> Tuple[Optional[VideoMetadata], Optional[str]]:
+        """
+        Build metadata for one listing entry, fetching its detail page only if needed.
+
+        Args:
+            page_number: Page number the video belongs to
+            index: Position of the video on the page
+            total: Number of videos being parsed on the page
+            item: Listing entry from OptimizedVideoDataParser.extract_listing_items
+            save_metadata: Whether to save metadata files to disk
+
+        Returns:
+            Tuple of (VideoMetadata or None, error message or None)
+        """
+        video_url = item.get("source_url", "")
+        try:
+            video_data = dict(item)
+            download_candidates = []
+            missing = [name for name in self.listing_detail_fields if not video_data.get(name)]
+
+            if missing:
+                logger.debug(f"Fetching detail page for video {index+1}/{total} "
+                             f"(missing {missing}): {video_url}")
+                self.listing_stats["detail_fetches"] += 1
+                detail = await self.parser.parse_video_result(video_url)
+                if detail is not None:
+                    # Listing values win; the detail page only fills the gaps
+                    for key, value in detail.data.items():
+                        if value and not video_data.get(key):
+                            video_data[key] = value
+                    download_candidates = detail.download_candidates
+            else:
+                self.listing_stats["videos_from_listing"] += 1
+
+            video_metadata = VideoMetadata(
+                video_id=video_data["video_id"],
+                title=video_data.get("title") or "Unknown Title",
+                duration=video_data.get("duration") or "00:00",
+                thumbnail_url=video_data.get("thumbnail_url", ""),
+                video_url=video_data.get("video_url", ""),
+                upload_date=video_data.get("upload_date", ""),
+                tags=video_data.get("tags", []),
+                page_url=video_url,
+                folder_path=str(self._get_video_folder(page_number, video_data["video_id"])),
+                download_candidates=download_candidates
+            )
+
+            if save_metadata:
+                await self._save_video_metadata(page_number, video_metadata, video_data)
+
+            return video_metadata, None
+
+        except Exception as e:
+            error_msg = f"Error parsing listing entry {video_url}: {e}"
+            logger.error(error_msg)
+            return None, error_msg
+
+    async def _parse_video_entry(self, page_number: int, index: int, total: int,
+                                 video_url: str, save_metadata: bool) -> Tuple[Optional[VideoMetadata], Optional[str]]:
+        """
+        Parse one video detail page.
+
+        Args:
+            page_number: Page number the video belongs to
+            index: Position of the video on the page
+            total: Number of videos on the page
+            video_url: Video detail page URL
+            save_metadata: Whether to save metadata files to disk
+
+        Returns:
+            Tuple of (VideoMetadata or None, error message or None)
+        """
+        try:
+            logger.debug(f"Parsing video {index+1}/{total}: {video_url}")
+
+            # Parse video metadata
+            result = await self.parser.parse_video_result(video_url)
+            video_data = result.data if result is not None else {}
+
+            if video_data and video_data.get("video_id"):
+                # Create video metadata object
+                video_metadata = VideoMetadata(
+                    video_id=video_data["video_id"],
+                    title=video_data.get("title", "Unknown Title"),
+                    duration=video_data.get("duration", "00:00"),
+                    thumbnail_url=video_data.get("thumbnail_src", ""),
+                    video_url=video_data.get("video_src", ""),
+                    upload_date=video_data.get("upload_date", ""),
+                    tags=video_data.get("tags", []),
+                    page_url=video_url,
+                    folder_path=str(self._get_video_folder(page_number, video_data["video_id"])),
+                    download_candidates=result.download_candidates
+                )
+
+                # Save metadata to disk if requested
+                if save_metadata:
+                    await self._save_video_metadata(page_number, video_metadata, video_data)
+
+                logger.debug(f"Successfully parsed video: {video_data['video_id']}")
+                return video_metadata, None
+
+            error_msg = f"Failed to parse video metadata from {video_url}"
+            logger.warning(error_msg)
+            return None, error_msg
+
+        except Exception as e:
+            error_msg = f"Error parsing video {video_url}: {e}"
+            logger.error(error_msg)
+            return None, error_msg
+
     async def _save_video_metadata(self, page_number: int, video_metadata: VideoMetadata,
                                  raw_data: Dict[str, Any]) -> bool:
         """
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Parse Pool Module
+
+Runs the CPU-bound HTML extraction (VideoExtractor regexes / lxml DOM
+engine) in a ProcessPoolExecutor so the asyncio loop that drives the
+browsers and downloads keeps fetching while pages are parsed on every
+core. Raw page bytes are shipped to the workers; requests that arrive
+close together are grouped into one submission per chunk to amortise
+the pickling and IPC round trip.
+
+The pool is off by default (``parsing.process_pool``): the DOM engine
+parses a page in about 2-15 ms (parser_benchmark.py, 20-225 KB pages),
+which rarely outweighs the IPC cost and the memory of one full parser
+per worker. Enable it when parsing shows up as event-loop lag on large
+pages or fast connections.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-worker parser, created once by the pool initializer
+_worker_parser = None
+
+
+def _init_worker(base_url: str, extraction_engine: str) -> None:
+    """Build the worker's parser once (imports happen in the child process)."""
+    global _worker_parser
+    from video_data_parser import OptimizedVideoDataParser
+
+    _worker_parser = OptimizedVideoDataParser(base_url, use_http=False,
+                                              extraction_engine=extraction_engine)
+    # Keep worker output to warnings; the parent logs the per-video summary
+    _worker_parser.logger.setLevel(logging.WARNING)
+
+
+def _parse_chunk(items: List[Tuple[str, bytes, str]]) -> Tuple[List[Optional[Any]], Dict[str, Any]]:
+    """
+    Parse a chunk of pages in a worker process.
+
+    Args:
+        items: (video_url, raw body, encoding) per page
+
+    Returns:
+        (VideoParseResult or None per page in input order, selector hit statistics of this chunk)
+    """
+    results = []
+    for video_url, body, encoding in items:
+        try:
+            html_content = body.decode(encoding or "utf-8", errors="replace")
+            results.append(_worker_parser.build_video_result(video_url, html_content))
+        except Exception as e:
+            logger.error(f"Worker failed to parse {video_url}: {e}")
+            results.append(None)
+
+    schema = _worker_parser.extractor.schema
+    report = schema.stats.get_report()
+    schema.stats.reset()
+    return results, report
+
+
+class ParsePool:
+    """Process-pool parse stage with chunked submission."""
+
+    def __init__(self, base_url: str, workers: int = 0, chunk_size: int = 4,
+                 chunk_linger_ms: int = 10, extraction_engine: str = "dom", schema=None):
+        """
+        Initialize parse pool.
+
+        Args:
+            base_url: Base URL handed to the worker parsers
+            workers: Worker processes (0 = one per CPU minus one)
+            chunk_size: Pages sent to a worker in one submission
+            chunk_linger_ms: How long a partial chunk waits for more pages
+            extraction_engine: "dom" or "regex"
+            schema: Selector schema that receives the workers' hit statistics
+        """
+        self.base_url = base_url
+        self.workers = workers if workers > 0 else max(1, (os.cpu_count() or 2) - 1)
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_linger = max(0, chunk_linger_ms) / 1000
+        self.extraction_engine = extraction_engine
+        self.schema = schema
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: List[Tuple[str, bytes, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._chunk_tasks = set()
+        self.stats = {"pages": 0, "chunks": 0, "worker_seconds": 0.0, "failures": 0}
+
+    @classmethod
+    def from_config(cls, base_url: str, config: Optional[Dict[str, Any]],
+                    schema=None) -> Optional["ParsePool"]:
+        """
+        Build a pool from the ``parsing`` section of config.json.
+
+        Args:
+            base_url: Base URL handed to the worker parsers
+            config: Full configuration dictionary (may be None)
+            schema: Selector schema that receives the workers' hit statistics
+
+        Returns:
+            Configured ParsePool, or None when process parsing is disabled
+        """
+        config = config or {}
+        parsing_config = config.get("parsing", {})
+        if not parsing_config.get("process_pool", False):
+            return None
+
+        return cls(
+            base_url,
+            workers=parsing_config.get("workers", 0),
+            chunk_size=parsing_config.get("chunk_size", 4),
+            chunk_linger_ms=parsing_config.get("chunk_linger_ms", 10),
+            extraction_engine=config.get("extraction", {}).get("engine", "dom"),
+            schema=schema
+        )
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use (and after close or a crash)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.base_url, self.extraction_engine)
+            )
+            logger.info(f"Parse pool started with {self.workers} worker processes "
+                        f"(chunk size {self.chunk_size})")
+        return self._executor
+
+    async def parse(self, video_url: str, body: bytes, encoding: str = "utf-8") -> Optional[Any]:
+        """
+        Parse one page in the pool.
+
+        Args:
+            video_url: Video page URL
+            body: Raw page bytes
+            encoding: Encoding of body
+
+        Returns:
+            VideoParseResult (None if the worker failed)
+
+        Raises:
+            BrokenProcessPool if the workers died (callers parse inline instead)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((video_url, body, encoding, future))
+
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.chunk_linger, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Submit everything pending as chunks of at most chunk_size pages."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            task = asyncio.ensure_future(self._run_chunk(chunk))
+            self._chunk_tasks.add(task)
+            task.add_done_callback(self._chunk_tasks.discard)
+
+    async def _run_chunk(self, chunk: List[Tuple[str, bytes, str, asyncio.Future]]) -> None:
+        """Run one chunk in a worker and resolve its futures."""
+        items = [(video_url, body, encoding) for video_url, body, encoding, _ in chunk]
+        futures = [future for _, _, _, future in chunk]
+        start = time.monotonic()
+
+        try:
+            executor = self._ensure_executor()
+            results, report = await asyncio.get_running_loop().run_in_executor(executor, _parse_chunk, items)
+        except BrokenProcessPool as e:
+            self.stats["failures"] += 1
+            logger.error(f"Parse pool workers died, restarting pool: {e}")
+            self._executor = None
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"Parse pool chunk failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+            return
+
+        self.stats["chunks"] += 1
+        self.stats["pages"] += len(items)
+        self.stats["worker_seconds"] += time.monotonic() - start
+        if self.schema is not None and report:
+            self.schema.stats.merge(report)
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """
+        Stop the worker processes (they are restarted lazily on next use).
+
+        The executor shutdown joins the workers, so it runs on a thread to
+        keep the event loop responsive while they exit.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, _, _, future in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending = []
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info(f"Parse pool closed (stats: {self.stats})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get parse pool statistics."""
+        return {**self.stats, "workers": self.workers, "chunk_size": self.chunk_size}
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark Module
+
+Microbenchmarks for the video page extractors. Every VideoExtractor method
+and the full extraction block of parse_individual_video
+(OptimizedVideoDataParser.build_video_data, both engines) are timed
+against the captured fragments in ``html/`` and synthetic full pages of
+growing size built from them. Each case reports ops/sec, p50/p99 latency
+and the peak bytes allocated per call, and the run is compared with a
+stored baseline so a parser change that slows extraction down fails
+loudly.
+
+Usage:
+    python parser_benchmark.py                    # run and compare with the baseline
+    python parser_benchmark.py --save-baseline    # record a new baseline
+    python parser_benchmark.py --filter tags      # only cases whose name contains "tags"
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import argparse
+import json
+import logging
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / "html"
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmarks" / "parser_baseline.json"
+
+BASE_URL = "https://rule34video.com"
+VIDEO_URL = "https://rule34video.com/video/4022809/overwatch-juno-nsfw-edit/"
+
+# Synthetic full pages: name -> number of related-video cards around the info block
+SYNTHETIC_PAGES = {"page_small": 0, "page_medium": 60, "page_large": 400}
+
+# How each extractor method is called: "html", "json_ld", "json_ld_html", "url" or "listing"
+EXTRACTOR_METHODS = {
+    "extract_video_id": "url",
+    "extract_video_id_from_url": "url",
+    "extract_listing_items": "listing",
+    "json_ld_title": "json_ld",
+    "json_ld_description": "json_ld",
+    "json_ld_duration": "json_ld",
+    "json_ld_views": "json_ld",
+    "json_ld_upload_date": "json_ld",
+    "json_ld_thumbnail_url": "json_ld",
+    "extract_title": "json_ld_html",
+    "extract_description": "json_ld_html",
+    "extract_tags": "html",
+    "extract_tags_from_html": "html",
+    "extract_categories": "html",
+    "extract_categories_from_html": "html",
+    "extract_uploaded_by": "html",
+    "extract_artists": "html",
+    "extract_artist_and_uploader": "html",
+    "extract_duration": "json_ld_html",
+    "extract_views": "json_ld_html",
+    "extract_likes": "html",
+    "extract_upload_date": "json_ld_html",
+    "extract_thumbnail_src": "json_ld_html",
+    "extract_thumbnail_url": "json_ld_html",
+    "extract_video_src": "html",
+    "get_download_links_from_html": "html",
+    "find_highest_quality_download_url": "html",
+    "get_download_candidates": "html",
+}
+
+# Fragments only hold one part of a page, so they run the methods that read that part
+FRAGMENT_METHODS = {
+    "tags": ["extract_tags", "extract_tags_from_html"],
+    "categories": ["extract_categories", "extract_categories_from_html"],
+    "artists": ["extract_artists", "extract_artist_and_uploader"],
+    "uploaded_by": ["extract_uploaded_by", "extract_artist_and_uploader"],
+    "downloads": ["extract_video_src", "get_download_links_from_html", "find_highest_quality_download_url",
+                  "get_download_candidates"],
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Overwatch Juno NSFW Edit</title>
+<meta name="description" content="Juno from Overwatch in a short edit with sound.">
+<meta property="og:title" content="Overwatch Juno NSFW Edit">
+<meta property="og:image" content="https://rule34video.com/contents/videos_screenshots/4022000/4022809/preview.jpg">
+<meta property="video:duration" content="917">
+<link rel="stylesheet" href="/static/styles/all-responsive-metal.css">
+<script type="application/ld+json">{json_ld}</script>
+</head>
+<body>
+<div class="header"><a class="logo" href="/">Rule34Video</a><nav><a href="/latest-updates/">Latest</a></nav></div>
+<div class="content">
+<div class="video_player"><video poster="https://rule34video.com/contents/videos_screenshots/4022000/4022809/preview.jpg"></video></div>
+<h1 class="title_video">Overwatch Juno NSFW Edit</h1>
+<div class="video_tools"><span class="voters">1,204 likes</span></div>
+{info}
+<div class="video_tabs">{downloads}</div>
+<div id="custom_list_videos_related_videos_items" class="thumbs clearfix">
+{cards}
+</div>
+</div>
+<div class="footer"><p>Copyright</p></div>
+</body>
+</html>
+"""
+
+CARD_TEMPLATE = """<div class="item thumb video_{n}">
+<a class="th js-open-popup" href="https://rule34video.com/video/{n}/related-video-{n}/" title="Related video {n}">
+<div class="img wrap_image"><img class="thumb lazy-load" data-src="https://rule34video.com/contents/videos_screenshots/{n}/320x180/1.jpg" alt="Related video {n}"><div class="time">{m}:{s:02d}</div></div>
+<div class="thumb_title">Related video {n}</div>
+<div class="thumb_info"><div class="added">{m} days ago</div><div class="views">{n} views</div></div>
+</a>
+</div>"""
+
+JSON_LD = {
+    "@context": "https://schema.org",
+    "@type": "VideoObject",
+    "name": "Overwatch Juno NSFW Edit",
+    "description": "Juno from Overwatch in a short edit with sound.",
+    "thumbnailUrl": "https://rule34video.com/contents/videos_screenshots/4022000/4022809/preview.jpg",
+    "uploadDate": "2024-11-02T10:31:00+00:00",
+    "duration": "PT0H15M17S",
+    "interactionCount": "9425",
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and allocation figures of one benchmark case."""
+    name: str
+    iterations: int
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+    alloc_peak_bytes: int
+    # Calibration workload timed next to this case (machine speed at the time)
+    calibration_us: float = 0.0
+    # Range of the per-round p50s: how much this case moved between rounds
+    p50_spread_us: float = 0.0
+
+
+def load_fixtures(fixture_dir: Path = FIXTURE_DIR) -> Dict[str, str]:
+    """
+    Load the captured HTML fragments.
+
+    Args:
+        fixture_dir: Directory holding the ``*.txt`` fragments
+
+    Returns:
+        Fragment name (file stem) -> HTML
+    """
+    fixtures = {}
+    for path in sorted(fixture_dir.glob("*.txt")):
+        fixtures[path.stem] = path.read_text(encoding="utf-8")
+    if not fixtures:
+        raise FileNotFoundError(f"No HTML fixtures found in {fixture_dir}")
+    return fixtures
+
+
+def build_synthetic_page(fixtures: Dict[str, str], cards: int) -> str:
+    """
+    Build a full video page around the captured info block.
+
+    Args:
+        fixtures: Loaded fragments (needs ``entire_element`` and ``downloads``)
+        cards: Related-video cards appended after the info block
+
+    Returns:
+        Page HTML
+    """
+    card_html = "\n".join(
+        CARD_TEMPLATE.format(n=4000000 + n, m=n % 60, s=(n * 7) % 60) for n in range(cards)
+    )
+    return PAGE_TEMPLATE.format(
+        json_ld=json.dumps(JSON_LD),
+        info=fixtures.get("entire_element", ""),
+        downloads=fixtures.get("downloads", ""),
+        cards=card_html
+    )
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 3) -> Tuple[List[int], int]:
+    """
+    Time a callable and measure its peak allocation.
+
+    Args:
+        func: Zero-argument callable to benchmark
+        iterations: Timed calls
+        warmup: Untimed calls first (caches, compiled patterns)
+
+    Returns:
+        (per-call durations in ns, peak bytes allocated by one call)
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+
+    # Allocation pass runs separately so tracemalloc does not skew the timings
+    tracemalloc.start()
+    try:
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+    finally:
+        tracemalloc.stop()
+
+    return samples, max(0, peak_bytes)
+
+
+def calibrate(rounds: int = 3) -> float:
+    """
+    Time a fixed regex/JSON workload so timings can be compared across machines
+    (and across the speed swings of shared or throttled CPUs).
+
+    Returns:
+        Fastest round in microseconds
+    """
+    text = json.dumps(JSON_LD) * 50
+    pattern = re.compile(r'"([a-zA-Z@]+)":\s*"([^"]*)"')
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for _ in range(20):
+            pairs = pattern.findall(text)
+            json.loads(json.dumps(dict(pairs)))
+        elapsed = (time.perf_counter_ns() - start) / 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 2)
+
+
+def percentile(sorted_samples: List[int], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples))) - 1))
+    return float(sorted_samples[index])
+
+
+class ParserBenchmark:
+    """Builds and runs the extractor benchmark cases."""
+
+    def __init__(self, iterations: int = 200, rounds: int = 5, fixture_dir: Path = FIXTURE_DIR):
+        """
+        Initialize benchmark.
+
+        Args:
+            iterations: Timed calls per case (large pages scale this down)
+            rounds: Measurements per case; the median round is reported and
+                the range of the round medians is kept as the noise estimate
+            fixture_dir: Directory holding the captured fragments
+        """
+        # Imported here so --help works without the scraper's dependencies
+        from video_data_parser import OptimizedVideoDataParser
+
+        self.iterations = max(5, iterations)
+        self.rounds = max(1, rounds)
+        self.fixtures = load_fixtures(fixture_dir)
+        self.pages = {name: build_synthetic_page(self.fixtures, cards)
+                      for name, cards in SYNTHETIC_PAGES.items()}
+
+        self.parser = OptimizedVideoDataParser(BASE_URL, use_http=False)
+        # Extractors log every hit and miss; keep that out of the timings
+        self.parser.logger.setLevel(logging.ERROR)
+        self.extractor = self.parser.extractor
+
+    def _call(self, method_name: str, html_content: str,
+              json_ld_data: Optional[Dict[str, Any]]) -> Callable[[], Any]:
+        """Bind one extractor method to its inputs."""
+        method = getattr(self.extractor, method_name)
+        kind = EXTRACTOR_METHODS[method_name]
+        if kind == "url":
+            return lambda: method(VIDEO_URL)
+        if kind == "listing":
+            return lambda: method(html_content, BASE_URL)
+        if kind == "json_ld":
+            return lambda: method(json_ld_data)
+        if kind == "json_ld_html":
+            return lambda: method(json_ld_data, html_content)
+        return lambda: method(html_content)
+
+    def _build_block(self, engine: str, html_content: str) -> Callable[[], Any]:
+        """The extraction block of parse_individual_video with the given engine."""
+        def run():
+            self.parser.extraction_engine = engine
+            return self.parser.build_video_data(VIDEO_URL, html_content)
+        return run
+
+    def cases(self) -> List[Tuple[str, Callable[[], Any], int]]:
+        """
+        All benchmark cases.
+
+        Returns:
+            (case name, callable, iterations) per case
+        """
+        cases = []
+
+        for fixture, methods in FRAGMENT_METHODS.items():
+            html_content = self.fixtures.get(fixture)
+            if html_content is None:
+                continue
+            for method_name in methods:
+                cases.append((f"{method_name}[{fixture}]", self._call(method_name, html_content, None),
+                              self.iterations))
+
+        documents = {"entire_element": self.fixtures.get("entire_element", "")}
+        documents.update(self.pages)
+        for document, html_content in documents.items():
+            json_ld_data = self.parser.extract_json_ld_data(html_content)
+            # Keep the large pages to a similar wall time as the fragments
+            iterations = max(5, self.iterations * 2000 // max(2000, len(html_content)))
+
+            cases.append((f"extract_json_ld_data[{document}]",
+                          lambda h=html_content: self.parser.extract_json_ld_data(h), iterations))
+            for method_name in EXTRACTOR_METHODS:
+                cases.append((f"{method_name}[{document}]",
+                              self._call(method_name, html_content, json_ld_data), iterations))
+            for engine in ("dom", "regex"):
+                cases.append((f"build_video_data.{engine}[{document}]",
+                              self._build_block(engine, html_content), iterations))
+
+        return cases
+
+    def run(self, name_filter: Optional[str] = None) -> List[BenchmarkResult]:
+        """
+        Run the benchmark cases.
+
+        Args:
+            name_filter: Only run cases whose name contains this text
+
+        Returns:
+            One BenchmarkResult per case
+        """
+        results = []
+        for name, func, iterations in self.cases():
+            if name_filter and name_filter not in name:
+                continue
+
+            # One calibration per round, so a machine slowdown during the case is seen
+            samples, round_p50s, calibrations, peak_bytes = [], [], [], 0
+            for _ in range(self.rounds):
+                calibrations.append(calibrate())
+                round_samples, round_peak = measure(func, iterations)
+                samples.extend(round_samples)
+                round_p50s.append(statistics.median(round_samples))
+                peak_bytes = max(peak_bytes, round_peak)
+            samples.sort()
+            total_seconds = sum(samples) / 1e9
+            results.append(BenchmarkResult(
+                name=name,
+                iterations=iterations,
+                ops_per_sec=round(len(samples) / total_seconds, 1) if total_seconds else 0.0,
+                p50_us=round(statistics.median(round_p50s) / 1000, 2),
+                p99_us=round(percentile(samples, 0.99) / 1000, 2),
+                alloc_peak_bytes=peak_bytes,
+                calibration_us=round(statistics.median(calibrations), 2),
+                p50_spread_us=round((max(round_p50s) - min(round_p50s)) / 1000, 2)
+            ))
+        return results
+
+
+def save_baseline(results: List[BenchmarkResult], path: Path = BASELINE_PATH) -> None:
+    """
+    Store results as the new baseline.
+
+    Args:
+        results: Benchmark results to store
+        path: Baseline file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": 1,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {result.name: asdict(result) for result in results}
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    logger.info(f"Saved baseline with {len(results)} cases to {path}")
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    """Load a stored baseline (None if there is none)."""
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_with_baseline(results: List[BenchmarkResult], baseline: Dict[str, Any],
+                          tolerance: float = 0.3, alloc_tolerance: float = 0.25) -> List[str]:
+    """
+    Find cases that regressed against the baseline.
+
+    Args:
+        results: Results of this run
+        baseline: Loaded baseline file
+        tolerance: Allowed growth of the p50 latency (0.3 = 30% slower); the
+            median is compared because ops/sec follows every outlier. The
+            round-to-round spread of both runs is added on top, so a case
+            only fails when it is slower by more than its own noise
+        alloc_tolerance: Allowed growth of the peak allocation
+
+    Returns:
+        One message per regression (empty when nothing regressed)
+    """
+    regressions = []
+    stored = baseline.get("results", {})
+    for result in results:
+        before = stored.get(result.name)
+        if not before:
+            continue
+
+        factor = machine_factor(result, before)
+        expected = before["p50_us"] * factor
+        noise = before.get("p50_spread_us", 0.0) * factor + result.p50_spread_us
+        if expected and result.p50_us > expected * (1 + tolerance) + noise:
+            regressions.append(f"{result.name}: p50 {result.p50_us:.2f} us, "
+                               f"baseline {expected:.2f} us ± {noise:.2f} us "
+                               f"(+{(result.p50_us / expected - 1) * 100:.0f}%)")
+
+        # Small allocations jitter by a few hundred bytes; ignore those
+        ceiling = before["alloc_peak_bytes"] * (1 + alloc_tolerance) + 1024
+        if result.alloc_peak_bytes > ceiling:
+            regressions.append(f"{result.name}: peak allocation {result.alloc_peak_bytes} bytes, "
+                               f"baseline {before['alloc_peak_bytes']} bytes")
+    return regressions
+
+
+def machine_factor(result: BenchmarkResult, before: Dict[str, Any]) -> float:
+    """How much slower the machine ran this case than when the baseline was recorded (1.0 if unknown)."""
+    recorded = before.get("calibration_us")
+    if not recorded or not result.calibration_us:
+        return 1.0
+    return result.calibration_us / recorded
+
+
+def print_results(results: List[BenchmarkResult], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """Print the results table (with the change against the baseline if given)."""
+    stored = (baseline or {}).get("results", {})
+    print(f"{'case':<58} {'ops/s':>11} {'p50 us':>10} {'± us':>9} {'p99 us':>10} {'peak KB':>9} {'p50 vs':>8}")
+    print("-" * 121)
+    for result in results:
+        change = ""
+        before = stored.get(result.name)
+        if before and before.get("p50_us"):
+            change = f"{(result.p50_us / (before['p50_us'] * machine_factor(result, before)) - 1) * 100:+.0f}%"
+        print(f"{result.name:<58} {result.ops_per_sec:>11.1f} {result.p50_us:>10.2f} "
+              f"{result.p50_spread_us:>9.2f} {result.p99_us:>10.2f} {result.alloc_peak_bytes / 1024:>9.1f} {change:>8}")
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the video page extractors")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per fragment case")
+    parser.add_argument("--rounds", type=int, default=5, help="Measurements per case (median is kept)")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed p50 slowdown (fraction)")
+    parser.add_argument("--json", help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    benchmark = ParserBenchmark(iterations=args.iterations, rounds=args.rounds)
+    results = benchmark.run(args.filter)
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+    if args.save_baseline:
+        if args.filter and baseline:
+            # Partial run: update only the cases that ran
+            merged = {name: BenchmarkResult(**data) for name, data in baseline.get("results", {}).items()}
+            merged.update((result.name, result) for result in results)
+            results = list(merged.values())
+        save_baseline(results, baseline_path)
+        return 0
+
+    if baseline is None:
+        logger.warning(f"No baseline at {baseline_path}; run with --save-baseline to record one")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+    if regressions:
+        print("\n" + "=" * 60)
+        print(f"❌ {len(regressions)} PARSER PERFORMANCE REGRESSION(S)")
+        print("=" * 60)
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+
+    print(f"\n✅ No regressions against baseline from {baseline.get('created', 'unknown date')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
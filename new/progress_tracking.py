@@ -22,13 +22,14 @@ Version: 1.0 - Progress tracking with download monitoring
 """
 
 import json
-import os
 import time
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set
 from datetime import datetime
 import hashlib
 
+from storage_ledger import get_storage_ledger
+
 
 class DownloadFolderMonitor:
     """
@@ -44,6 +45,8 @@ class DownloadFolderMonitor:
         """
         self.downloads_dir = Path(downloads_dir)
         self.required_files = [".json", ".mp4", ".jpg"]  # Required files for completion
+        # Folder size comes from the shared ledger instead of a walk per query
+        self.ledger = get_storage_ledger(self.downloads_dir)
 
         print(f"🔍 Download Folder Monitor Initialized")
         print(f"   📁 Monitoring directory: {self.downloads_dir}")
@@ -51,24 +54,13 @@ class DownloadFolderMonitor:
 
     def get_folder_size_mb(self) -> float:
         """
-        Calculate total size of downloads folder in MB.
+        Get total size of downloads folder in MB from the storage ledger.
 
         Returns:
             Total folder size in megabytes
         """
         try:
-            if not self.downloads_dir.exists():
-                return 0.0
-
-            total_size = 0
-            for root, dirs, files in os.walk(self.downloads_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    try:
-                        total_size += os.path.getsize(file_path)
-                    except (OSError, FileNotFoundError):
-                        continue
-
+            total_size = self.ledger.usage_bytes()
             size_mb = total_size / (1024 * 1024)
             print(f"📊 Calculated folder size: {size_mb:.2f} MB ({total_size:,} bytes)")
             return size_mb
@@ -376,6 +368,8 @@ class ProgressUpdater:
         if video_id not in current_progress["downloaded_videos"]:
             current_progress["downloaded_videos"].append(video_id)
             current_progress["total_downloaded"] = len(current_progress["downloaded_videos"])
+            # IDM wrote this folder behind the ledger's back; re-measure just this folder
+            self.monitor.ledger.refresh(self.monitor.downloads_dir / video_id)
             current_progress["total_size_mb"] = self.monitor.get_folder_size_mb()
             current_progress["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Quality Resolver Module
+
+Turns the download links of a video page into structured candidates
+(resolution, label, url), optionally probes them with concurrent HEAD
+requests for their exact size and reachability, and picks one by policy:
+
+- ``max_quality``: highest resolution
+- ``size_cap``: highest resolution not known to exceed ``max_size_mb``
+- ``best_under_mb``: highest resolution whose probed size is at most
+  ``max_size_mb`` (the smallest reachable one if none fits)
+
+Dead links are dropped whenever probing ran, so the downloader never
+spends bytes on a candidate that cannot be fetched or is too large. If
+no probe got an answer at all (network down, HEAD blocked), the listed
+candidates are selected from as they came instead of dropping them all.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+POLICY_MAX_QUALITY = "max_quality"
+POLICY_SIZE_CAP = "size_cap"
+POLICY_BEST_UNDER_MB = "best_under_mb"
+POLICIES = (POLICY_MAX_QUALITY, POLICY_SIZE_CAP, POLICY_BEST_UNDER_MB)
+
+# Named qualities, best first; plain substring checks keep long URLs cheap
+_NAMED_RESOLUTIONS = [('4k', 2160), ('2160p', 2160), ('1440p', 1440), ('2k', 1440), ('1080p', 1080)]
+_FULL_HD = re.compile(r'full\s*hd')
+_HD = re.compile(r'\bhd\b')
+_HEIGHT_WITH_P = re.compile(r'(\d{3,4})p')
+# "4022809_360.mp4": the height suffix of a media file name
+_FILE_HEIGHT = re.compile(r'[_\-](\d{3,4})p?\.(?:mp4|webm|mkv|mov)\b')
+_BARE_HEIGHT = re.compile(r'\b(\d{3,4})\b')
+
+_CONTENT_RANGE_TOTAL = re.compile(r'/(\d+)\s*$')
+
+
+@dataclass
+class QualityCandidate:
+    """One downloadable rendition of a video."""
+    url: str
+    label: str = ""
+    resolution: int = 0
+    size_bytes: Optional[int] = None
+    reachable: Optional[bool] = None
+    status_code: Optional[int] = None
+
+    @property
+    def size_mb(self) -> Optional[float]:
+        return self.size_bytes / (1024 * 1024) if self.size_bytes is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def parse_resolution(text: str, allow_bare_number: bool = False) -> int:
+    """
+    Read a vertical resolution from a link label or URL.
+
+    Args:
+        text: Label ("MP4 1080p", "Full HD", "4K") or URL (".../4022809_720p.mp4")
+        allow_bare_number: Also accept "720" without "p" (labels only; URLs
+            carry numeric ids)
+
+    Returns:
+        Height in pixels, 0 if unknown
+    """
+    if not text:
+        return 0
+    text = text.lower()
+    for name, height in _NAMED_RESOLUTIONS:
+        if name in text:
+            return height
+    has_hd = 'hd' in text
+    if has_hd and _FULL_HD.search(text):
+        return 1080
+    if '720p' in text or (has_hd and _HD.search(text)):
+        return 720
+
+    match = _FILE_HEIGHT.search(text) or _HEIGHT_WITH_P.search(text)
+    if not match and allow_bare_number:
+        match = _BARE_HEIGHT.search(text)
+    return int(match.group(1)) if match else 0
+
+
+def parse_candidates(links: Iterable[Any]) -> List[QualityCandidate]:
+    """
+    Build candidates from raw download links.
+
+    Args:
+        links: Dicts with ``url`` and a label under ``quality``, ``text`` or
+            ``label`` (extractor and Selenium output), earlier candidate
+            dicts, QualityCandidate objects, or plain URLs
+
+    Returns:
+        Candidates in input order, one per distinct URL
+    """
+    candidates = []
+    seen = set()
+    for link in links or []:
+        if isinstance(link, QualityCandidate):
+            candidate = link
+        elif isinstance(link, str):
+            candidate = QualityCandidate(url=link, resolution=parse_resolution(link))
+        elif isinstance(link, dict) and link.get("url"):
+            label = str(link.get("label") or link.get("text") or link.get("quality") or "")
+            resolution = link.get("resolution")
+            if not isinstance(resolution, int) or resolution <= 0:
+                resolution = parse_resolution(label, allow_bare_number=True) or parse_resolution(link["url"])
+            candidate = QualityCandidate(
+                url=link["url"],
+                label=label,
+                resolution=resolution,
+                size_bytes=link.get("size_bytes"),
+                reachable=link.get("reachable"),
+                status_code=link.get("status_code")
+            )
+        else:
+            continue
+
+        if candidate.url in seen:
+            continue
+        seen.add(candidate.url)
+        candidates.append(candidate)
+    return candidates
+
+
+def select_candidate(candidates: List[QualityCandidate], policy: str = POLICY_MAX_QUALITY,
+                     max_size_mb: Optional[float] = None) -> Optional[QualityCandidate]:
+    """
+    Pick a candidate by policy.
+
+    Args:
+        candidates: Parsed (and possibly probed) candidates
+        policy: One of POLICIES
+        max_size_mb: Size limit for ``size_cap`` and ``best_under_mb``
+
+    Returns:
+        Chosen candidate, or None if none is acceptable
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown quality policy: {policy}")
+
+    usable = [candidate for candidate in candidates if candidate.reachable is not False]
+    if max_size_mb and policy == POLICY_SIZE_CAP:
+        usable = [candidate for candidate in usable
+                  if candidate.size_mb is None or candidate.size_mb <= max_size_mb]
+    elif max_size_mb and policy == POLICY_BEST_UNDER_MB:
+        sized = [candidate for candidate in usable if candidate.size_mb is not None]
+        fitting = [candidate for candidate in sized if candidate.size_mb <= max_size_mb]
+        if not fitting and sized:
+            # Nothing fits: the smallest known rendition is the closest match
+            return min(sized, key=lambda candidate: candidate.size_bytes)
+        usable = fitting
+
+    best = None
+    for candidate in usable:
+        # Strictly greater keeps the first of equal qualities (page order)
+        if best is None or candidate.resolution > best.resolution:
+            best = candidate
+    return best
+
+
+class QualityResolver:
+    """Probes download candidates and selects one by policy."""
+
+    def __init__(self, policy: str = POLICY_MAX_QUALITY, max_size_mb: Optional[float] = None,
+                 probe: bool = False, session: Optional[requests.Session] = None,
+                 timeout_seconds: float = 10.0, workers: int = 8):
+        """
+        Initialize quality resolver.
+
+        Args:
+            policy: Selection policy (see POLICIES)
+            max_size_mb: Size limit for the size policies (None/0 = no limit)
+            probe: Issue HEAD requests for size and reachability before selecting
+            session: requests session to probe with (shares the downloader's pool)
+            timeout_seconds: Timeout per probe request
+            workers: Concurrent probe requests
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown quality policy: {policy}")
+
+        self.policy = policy
+        self.max_size_mb = max_size_mb or None
+        self.probe_enabled = probe
+        # None until first probe, unless the downloader shares its session
+        self.session = session
+        self.timeout_seconds = timeout_seconds
+        self.workers = max(1, workers)
+        self.stats = {"resolved": 0, "probes": 0, "dead_links": 0, "probe_fallbacks": 0,
+                      "rejected_by_policy": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]],
+                    session: Optional[requests.Session] = None) -> "QualityResolver":
+        """
+        Build a resolver from the ``quality`` section of config.json.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+            session: Optional shared requests session
+
+        Returns:
+            Configured QualityResolver
+        """
+        quality_config = (config or {}).get("quality", {})
+        return cls(
+            policy=quality_config.get("policy", POLICY_MAX_QUALITY),
+            max_size_mb=quality_config.get("max_size_mb", 0),
+            probe=quality_config.get("probe", False),
+            session=session,
+            timeout_seconds=quality_config.get("probe_timeout_seconds", 10),
+            workers=quality_config.get("probe_workers", 8)
+        )
+
+    def probe_candidate(self, candidate: QualityCandidate) -> QualityCandidate:
+        """
+        Fill in a candidate's size and reachability (call through probe()).
+
+        HEAD is tried first; servers that refuse it get a one-byte ranged GET,
+        whose Content-Range carries the full size.
+        """
+        self.stats["probes"] += 1
+        try:
+            response = self.session.head(candidate.url, allow_redirects=True, timeout=self.timeout_seconds)
+            size = response.headers.get("Content-Length")
+            if response.status_code in (403, 405, 501) or (response.ok and not size):
+                response = self.session.get(candidate.url, headers={"Range": "bytes=0-0"},
+                                            stream=True, timeout=self.timeout_seconds)
+                response.close()
+                total = _CONTENT_RANGE_TOTAL.search(response.headers.get("Content-Range", ""))
+                size = total.group(1) if total else (
+                    response.headers.get("Content-Length") if response.status_code == 200 else None)
+
+            candidate.status_code = response.status_code
+            candidate.reachable = response.status_code < 400
+            if candidate.reachable and size and str(size).isdigit():
+                candidate.size_bytes = int(size)
+        except requests.RequestException as e:
+            logger.debug(f"Probe failed for {candidate.url}: {e}")
+            candidate.status_code = None
+            candidate.reachable = False
+
+        if candidate.reachable is False:
+            self.stats["dead_links"] += 1
+        return candidate
+
+    def probe(self, candidates: List[QualityCandidate]) -> List[QualityCandidate]:
+        """Probe candidates concurrently (in place; returns the same list)."""
+        if self.session is None:
+            self.session = requests.Session()
+        if len(candidates) <= 1:
+            for candidate in candidates:
+                self.probe_candidate(candidate)
+            return candidates
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(candidates))) as executor:
+            list(executor.map(self.probe_candidate, candidates))
+        return candidates
+
+    def resolve(self, links: Iterable[Any], probe: Optional[bool] = None) -> Optional[QualityCandidate]:
+        """
+        Parse, optionally probe, and select a download candidate.
+
+        Args:
+            links: Raw links or candidate dicts (see parse_candidates)
+            probe: Override the configured probing for this call
+
+        Returns:
+            Chosen candidate, or None if every candidate is dead or rejected
+        """
+        candidates = parse_candidates(links)
+        if not candidates:
+            return None
+
+        should_probe = self.probe_enabled if probe is None else probe
+        # Size policies need sizes; probing is what provides them
+        if should_probe or (self.max_size_mb and self.policy != POLICY_MAX_QUALITY):
+            listed = [replace(candidate) for candidate in candidates]
+            self.probe(candidates)
+            if all(candidate.status_code is None for candidate in candidates):
+                # Not one probe was answered: that says nothing about the links themselves
+                self.stats["probe_fallbacks"] += 1
+                logger.warning(f"Probing failed for all {len(candidates)} candidates; "
+                               "selecting from the listed candidates")
+                return self._select(listed, POLICY_SIZE_CAP if self.max_size_mb else self.policy)
+
+        return self._select(candidates, self.policy)
+
+    def _select(self, candidates: List[QualityCandidate], policy: str) -> Optional[QualityCandidate]:
+        chosen = select_candidate(candidates, policy, self.max_size_mb)
+        if chosen is None:
+            self.stats["rejected_by_policy"] += 1
+            logger.warning(f"No download candidate passed policy {policy} "
+                           f"({len(candidates)} candidates, max {self.max_size_mb} MB)")
+            return None
+
+        self.stats["resolved"] += 1
+        size = f", {chosen.size_mb:.1f} MB" if chosen.size_mb is not None else ""
+        logger.debug(f"Selected {chosen.resolution or 'unknown'}p{size} of {len(candidates)} candidates: {chosen.url}")
+        return chosen
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get resolver statistics."""
+        return {**self.stats, "policy": self.policy, "max_size_mb": self.max_size_mb}
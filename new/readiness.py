@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Readiness Module
+
+Readiness-driven waits for Playwright pages. Replaces fixed
+wait_for_timeout sleeps with waits on specific selectors or JSON-LD
+presence, bounded by a per-page deadline, and records how long each
+wait actually took.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Readiness selectors per page kind (CSS selector lists; the first match wins)
+LISTING_READY_SELECTORS = ['#custom_list_videos_most_recent_videos_items > div',
+                           '#custom_list_videos_latest_videos_list_items > div',
+                           'a.th.js-open-popup']
+DETAIL_READY_SELECTORS = ['script[type="application/ld+json"]', '#tab_video_info', 'video']
+PAGINATION_READY_SELECTORS = ['a[href*="latest-updates/"]']
+AGE_GATE_SELECTOR = '.popup.popup_access'
+
+
+class PageDeadline:
+    """Time budget shared by every wait on one page navigation."""
+
+    def __init__(self, total_ms: int):
+        """
+        Initialize deadline.
+
+        Args:
+            total_ms: Total milliseconds allowed for all waits on the page
+        """
+        self.total_ms = total_ms
+        self._expires_at = time.monotonic() + total_ms / 1000
+
+    def remaining_ms(self) -> int:
+        """Milliseconds left before the deadline (never negative)."""
+        return max(0, int((self._expires_at - time.monotonic()) * 1000))
+
+    @property
+    def expired(self) -> bool:
+        """True once the budget is used up."""
+        return self.remaining_ms() == 0
+
+
+class ReadinessWaiter:
+    """Waits for page readiness signals and records wait metrics."""
+
+    def __init__(self, page_deadline_ms: int = 15000, default_timeout_ms: int = 10000):
+        """
+        Initialize readiness waiter.
+
+        Args:
+            page_deadline_ms: Default total wait budget per page
+            default_timeout_ms: Default timeout for a single wait
+        """
+        self.page_deadline_ms = page_deadline_ms
+        self.default_timeout_ms = default_timeout_ms
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ReadinessWaiter":
+        """
+        Build a waiter from the ``readiness`` section of config.json.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            Configured ReadinessWaiter
+        """
+        readiness_config = (config or {}).get("readiness", {})
+        return cls(
+            page_deadline_ms=readiness_config.get("page_deadline_ms", 15000),
+            default_timeout_ms=readiness_config.get("default_timeout_ms", 10000)
+        )
+
+    def new_deadline(self, total_ms: Optional[int] = None) -> PageDeadline:
+        """Start a new per-page deadline."""
+        return PageDeadline(total_ms if total_ms is not None else self.page_deadline_ms)
+
+    def _timeout_for(self, timeout_ms: Optional[int], deadline: Optional[PageDeadline]) -> int:
+        """Clamp a single wait's timeout to the page deadline."""
+        timeout = timeout_ms if timeout_ms is not None else self.default_timeout_ms
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining_ms())
+        return timeout
+
+    async def wait_for_any(self, page, selectors: List[str], label: str,
+                           timeout_ms: Optional[int] = None,
+                           deadline: Optional[PageDeadline] = None,
+                           state: str = "attached") -> bool:
+        """
+        Wait until any of the CSS selectors reaches the given state.
+
+        Args:
+            page: Playwright page
+            selectors: CSS selectors; the wait ends on the first match
+            label: Metric name for this wait
+            timeout_ms: Timeout for this wait (clamped to the deadline)
+            deadline: Optional per-page deadline
+            state: Playwright selector state (attached, visible, hidden, detached)
+
+        Returns:
+            True if the page became ready, False on timeout
+        """
+        timeout = self._timeout_for(timeout_ms, deadline)
+        start = time.monotonic()
+        ready = False
+
+        if timeout > 0:
+            try:
+                await page.wait_for_selector(", ".join(selectors), state=state, timeout=timeout)
+                ready = True
+            except Exception as e:
+                logger.debug(f"Readiness wait '{label}' ended without match after {timeout}ms: {e}")
+
+        self._record(label, (time.monotonic() - start) * 1000, ready)
+        return ready
+
+    async def wait_for_json_ld(self, page, label: str = "json_ld",
+                               timeout_ms: Optional[int] = None,
+                               deadline: Optional[PageDeadline] = None) -> bool:
+        """Wait until a JSON-LD script block is present in the DOM."""
+        return await self.wait_for_any(page, ['script[type="application/ld+json"]'], label,
+                                       timeout_ms=timeout_ms, deadline=deadline)
+
+    def _record(self, label: str, elapsed_ms: float, ready: bool) -> None:
+        """Record one wait in the metrics table."""
+        metric = self._metrics.setdefault(label, {
+            "count": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0
+        })
+        metric["count"] += 1
+        metric["total_ms"] += elapsed_ms
+        metric["max_ms"] = max(metric["max_ms"], elapsed_ms)
+        if not ready:
+            metric["timeouts"] += 1
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get wait metrics per label.
+
+        Returns:
+            Dict of label -> count, timeouts, total_ms, max_ms, avg_ms
+        """
+        metrics = {}
+        for label, metric in self._metrics.items():
+            metrics[label] = {
+                **metric,
+                "avg_ms": metric["total_ms"] / metric["count"] if metric["count"] else 0.0
+            }
+        return metrics
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Resource Blocker Module
+
+Request interception policy for Playwright pages. Aborts heavy resources
+(preview videos, images, fonts, ad scripts) by resource type and URL
+pattern, with per-mode allowlists so selector-based extraction keeps
+working where it needs a resource.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceBlockPolicy:
+    """Decides which requests a page may load and installs the route handler."""
+
+    DEFAULT_BLOCKED_TYPES = ["image", "media", "font", "stylesheet"]
+    DEFAULT_BLOCKED_PATTERNS = [
+        r"googlesyndication", r"doubleclick", r"google-analytics", r"googletagmanager",
+        r"adsystem", r"exoclick", r"juicyads", r"trafficjunky", r"\.(mp4|webm)(\?|$)"
+    ]
+    DEFAULT_MODES = {
+        # Age-gate visibility check relies on computed styles
+        "listing": {"allow_resource_types": ["stylesheet"]},
+        "detail": {},
+        "detect": {}
+    }
+
+    def __init__(self, enabled: bool = True,
+                 blocked_resource_types: Optional[Iterable[str]] = None,
+                 blocked_url_patterns: Optional[Iterable[str]] = None,
+                 modes: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        """
+        Initialize resource block policy.
+
+        Args:
+            enabled: Master switch; when False every request is allowed
+            blocked_resource_types: Playwright resource types to abort
+            blocked_url_patterns: Regex patterns of URLs to abort
+            modes: Per-mode allowlists ({"allow_resource_types": [...],
+                "allow_url_patterns": [...]}) keyed by mode name
+        """
+        self.enabled = enabled
+        self.blocked_resource_types = set(
+            self.DEFAULT_BLOCKED_TYPES if blocked_resource_types is None else blocked_resource_types
+        )
+        self.blocked_url_patterns = self._compile(
+            self.DEFAULT_BLOCKED_PATTERNS if blocked_url_patterns is None else blocked_url_patterns
+        )
+
+        self.modes: Dict[str, Dict[str, Any]] = {}
+        for mode, allow in (self.DEFAULT_MODES if modes is None else modes).items():
+            self.modes[mode] = {
+                "allow_resource_types": set(allow.get("allow_resource_types", [])),
+                "allow_url_patterns": self._compile(allow.get("allow_url_patterns", []))
+            }
+
+        self.stats = {"allowed": 0, "blocked": 0, "blocked_by_type": {}}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ResourceBlockPolicy":
+        """
+        Build a policy from the ``resource_blocking`` section of config.json.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            Configured ResourceBlockPolicy
+        """
+        block_config = (config or {}).get("resource_blocking", {})
+        return cls(
+            enabled=block_config.get("enabled", True),
+            blocked_resource_types=block_config.get("blocked_resource_types"),
+            blocked_url_patterns=block_config.get("blocked_url_patterns"),
+            modes=block_config.get("modes")
+        )
+
+    @staticmethod
+    def _compile(patterns: Iterable[str]) -> List[re.Pattern]:
+        """Compile URL patterns once."""
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                logger.warning(f"Ignoring invalid URL pattern {pattern!r}: {e}")
+        return compiled
+
+    def should_block(self, resource_type: str, url: str, mode: Optional[str] = None) -> bool:
+        """
+        Decide whether a request should be aborted.
+
+        Args:
+            resource_type: Playwright resource type (image, media, script, ...)
+            url: Request URL
+            mode: Optional page mode whose allowlist applies
+
+        Returns:
+            True if the request should be blocked
+        """
+        if not self.enabled:
+            return False
+
+        allow = self.modes.get(mode) if mode else None
+        if allow:
+            if resource_type in allow["allow_resource_types"]:
+                return False
+            if any(p.search(url) for p in allow["allow_url_patterns"]):
+                return False
+
+        if resource_type in self.blocked_resource_types:
+            return True
+
+        return any(p.search(url) for p in self.blocked_url_patterns)
+
+    async def handle_route(self, route, mode: Optional[str] = None) -> None:
+        """
+        Playwright route handler: abort or continue a request.
+
+        Args:
+            route: Playwright Route object
+            mode: Page mode whose allowlist applies
+        """
+        request = route.request
+        try:
+            if self.should_block(request.resource_type, request.url, mode):
+                self.stats["blocked"] += 1
+                by_type = self.stats["blocked_by_type"]
+                by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+                await route.abort()
+            else:
+                self.stats["allowed"] += 1
+                await route.continue_()
+        except Exception as e:
+            # Page closed or request already handled
+            logger.debug(f"Route handling error for {request.url}: {e}")
+
+    async def install(self, page, get_mode: Optional[Callable[[], Optional[str]]] = None) -> None:
+        """
+        Install the policy on a page.
+
+        Args:
+            page: Playwright page (or context)
+            get_mode: Callable returning the page's current mode; evaluated per request
+                so a pooled page can change mode between leases
+        """
+        if not self.enabled:
+            return
+
+        async def handler(route):
+            await self.handle_route(route, get_mode() if get_mode else None)
+
+        await page.route("**/*", handler)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get interception statistics."""
+        return {
+            "enabled": self.enabled,
+            "allowed": self.stats["allowed"],
+            "blocked": self.stats["blocked"],
+            "blocked_by_type": dict(self.stats["blocked_by_type"])
+        }
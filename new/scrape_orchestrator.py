@@ -22,9 +22,17 @@ from page_parser import PageParser, VideoMetadata
 from idm_manager import IDMManager, DownloadItem
 from validator import FileValidator
 from utils import SafeFileOperations, TimestampHelper, wait_with_progress
+from storage_ledger import get_storage_ledger
 
 logger = logging.getLogger(__name__)
 
+# Usage (% of the limit) above which a storage check rescans the tree before deciding
+RECONCILE_NEAR_LIMIT_PERCENT = 85.0
+# Such rescans are spaced at least this share of the ledger's reconcile interval apart,
+# and never closer than the floor (also when background reconciling is off)
+NEAR_LIMIT_RECONCILE_FRACTION = 0.1
+NEAR_LIMIT_RECONCILE_MIN_SECONDS = 30.0
+
 
 @dataclass
 class BatchResults:
@@ -67,18 +75,22 @@ class ScrapeOrchestrator:
         """
         self.config_manager = ConfigManager(config_file)
         self.progress_manager = ProgressManager(progress_file)
-        self.page_parser = PageParser(base_url, downloads_dir)
+
+        # Load configuration
+        self.config = self.config_manager.load_config()
+        self.batch_config = self.config.get("batch", {})
+
+        self.page_parser = PageParser(base_url, downloads_dir, config=self.config)
         self.idm_manager = IDMManager(base_download_dir=downloads_dir)
         self.validator = FileValidator()
+        # Download tree usage, scanned once here and kept current in the background
+        self.storage_ledger = get_storage_ledger(downloads_dir, self.config)
+        self._last_near_limit_reconcile: Optional[float] = None
 
         self.dry_run = dry_run
         self.should_stop = False
         self._batch_states: List[PageRetryState] = []
 
-        # Load configuration
-        self.config = self.config_manager.load_config()
-        self.batch_config = self.config.get("batch", {})
-
         logger.info(f"Scrape orchestrator initialized (dry_run={dry_run})")
         logger.info(f"Batch config: {self.batch_config}")
 
@@ -185,7 +197,11 @@ class ScrapeOrchestrator:
                         'success': True, 'videos': [], 'video_count': 0
                     })()
                 else:
-                    parse_result = await self.page_parser.parse_page(page_num, save_metadata=True)
+                    downloaded = self.progress_manager.load_progress().get("downloaded_videos", [])
+                    parse_result = await self.page_parser.parse_page(
+                        page_num, save_metadata=True,
+                        video_filter=PageParser.downloaded_video_filter(downloaded)
+                    )
 
                 if parse_result.success:
                     batch_result.pages_processed.append(page_num)
@@ -203,6 +219,9 @@ class ScrapeOrchestrator:
                 logger.error(f"Error parsing page {page_num}: {e}")
                 batch_result.failed_pages.append(page_num)
 
+        # Each batch runs in its own event loop, so release the browser pool here
+        await self.page_parser.close()
+
         # Phase 2: Enqueue all videos to IDM
         if all_videos and not self.dry_run:
             logger.info(f"Enqueuing {len(all_videos)} videos to IDM")
@@ -373,6 +392,9 @@ class ScrapeOrchestrator:
                 logger.debug(f"Video {video.video_id} failed validation: "
                            f"missing {validation_result['missing_files']}")
 
+        # IDM wrote this page's folders behind the ledger's back; re-measure just this page
+        self.storage_ledger.refresh(self.page_parser._get_page_folder(page_number))
+
         return failed_video_ids
 
     def _get_next_batch_pages(self, current_page: int) -> List[int]:
@@ -436,15 +458,20 @@ class ScrapeOrchestrator:
             True if storage limit reached
         """
         try:
-            from utils import calculate_folder_size
-
-            downloads_dir = self.page_parser.downloads_dir
-            current_size_mb = calculate_folder_size(str(downloads_dir))
+            current_size_mb = self.storage_ledger.usage_mb()
             max_size_gb = self.config_manager.get_max_storage_gb()
             max_size_mb = max_size_gb * 1024
 
             usage_percent = (current_size_mb / max_size_mb) * 100 if max_size_mb > 0 else 0
 
+            # Validated pages are refreshed and the ledger reconciles periodically;
+            # only a figure close to the limit is worth a full rescan to confirm,
+            # and between rescans the O(1) figure stands
+            if usage_percent >= RECONCILE_NEAR_LIMIT_PERCENT and self._near_limit_reconcile_due():
+                self.storage_ledger.reconcile()
+                current_size_mb = self.storage_ledger.usage_mb()
+                usage_percent = (current_size_mb / max_size_mb) * 100
+
             if usage_percent >= 95.0:
                 logger.warning(f"Storage limit reached: {usage_percent:.1f}% "
                              f"({current_size_mb:.1f}MB / {max_size_gb}GB)")
@@ -458,6 +485,21 @@ class ScrapeOrchestrator:
             logger.error(f"Error checking storage limits: {e}")
             return False
 
+    def _near_limit_reconcile_due(self) -> bool:
+        """
+        Whether a near-limit storage check may rescan now (claims the slot if so).
+
+        Returns:
+            True at most once per NEAR_LIMIT_RECONCILE_FRACTION of the ledger's interval
+        """
+        spacing = max(self.storage_ledger.reconcile_interval_seconds * NEAR_LIMIT_RECONCILE_FRACTION,
+                      NEAR_LIMIT_RECONCILE_MIN_SECONDS)
+        now = time.monotonic()
+        if self._last_near_limit_reconcile is not None and now - self._last_near_limit_reconcile < spacing:
+            return False
+        self._last_near_limit_reconcile = now
+        return True
+
     def _compile_final_results(self, batch_results: List[BatchResults], 
                              total_time: float, start_page: int, 
                              end_page: int) -> Dict[str, Any]:
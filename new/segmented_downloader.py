@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Segmented Downloader Module
+
+Native multi-connection downloads (download_method "segmented"), the
+portable replacement for handing large MP4s to IDM. The file's size and
+range support are probed first; the file is then preallocated and split
+into byte ranges that are fetched concurrently, each written at its own
+offset. A failed segment is retried on its own, and a small sidecar
+state file (``<name>.segments``) records how far every segment got, so
+an interrupted download resumes where each segment stopped, as long as
+the server still reports the same validator (ETag/Last-Modified). Only
+bytes that were flushed and fsynced are recorded, so a crash never
+leaves the sidecar ahead of the data file.
+
+Servers without range support, files of unknown size and files below
+the size threshold are not segmented; the result is marked ``fallback``
+and the caller downloads them its usual way.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Temp data file and state sidecar, next to the destination
+PART_SUFFIX = ".seg"
+STATE_SUFFIX = ".segments"
+
+_CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+# Save segment progress to the sidecar at most this often per segment
+_STATE_SAVE_INTERVAL_BYTES = 4 * 1024 * 1024
+
+
+class ResourceChangedError(Exception):
+    """The server no longer serves the file the saved segments belong to."""
+
+
+@dataclass
+class RangeProbe:
+    """What the server told us about a URL."""
+    size: Optional[int]
+    accepts_ranges: bool
+    validator: Optional[str] = None
+    status_code: Optional[int] = None
+
+
+@dataclass
+class SegmentedResult:
+    """Outcome of SegmentedDownloader.download."""
+    success: bool
+    size_bytes: int = 0
+    resumed_bytes: int = 0
+    segments: int = 0
+    segment_retries: int = 0
+    fallback: bool = False
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SegmentedDownloader:
+    """Downloads one file over several concurrent ranged connections."""
+
+    def __init__(self, session: Optional[requests.Session] = None, segments: int = 8,
+                 min_size_bytes: int = 16 * 1024 * 1024, min_segment_bytes: int = 2 * 1024 * 1024,
+                 segment_retries: int = 3, connect_timeout: float = 30, read_timeout: float = 300,
+                 chunk_size: int = 64 * 1024, headers: Optional[Dict[str, str]] = None,
+                 session_lease: Optional[Callable[[str], ContextManager[requests.Session]]] = None):
+        """
+        Initialize segmented downloader.
+
+        Args:
+            session: requests session to use (one with a pool sized for the segments is created otherwise)
+            segments: Concurrent connections per file
+            min_size_bytes: Smaller files are left to the single-stream path
+            min_segment_bytes: Lower bound on a segment's length
+            segment_retries: Retries per segment before the download fails
+            connect_timeout: Connect timeout per request
+            read_timeout: Read timeout per request
+            chunk_size: Bytes per read/write
+            headers: Extra request headers (user agent, referer)
+            session_lease: Leases the session for a URL for one request
+                (e.g. SessionRegistry.lease); takes precedence over ``session``
+        """
+        self.segments = max(1, segments)
+        self.min_size_bytes = min_size_bytes
+        self.min_segment_bytes = max(1, min_segment_bytes)
+        self.segment_retries = max(0, segment_retries)
+        self.timeout = (connect_timeout, read_timeout)
+        self.chunk_size = chunk_size
+        self.headers = dict(headers or {})
+        # Ranges count encoded bytes; the file must arrive as stored
+        self.headers["Accept-Encoding"] = "identity"
+        self.session_lease = session_lease
+        if session is None and session_lease is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.segments * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self._stats_lock = threading.Lock()
+        self.stats = {"segmented": 0, "fallbacks": 0, "segment_retries": 0, "resumed_bytes": 0, "failed": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], session: Optional[requests.Session] = None,
+                    headers: Optional[Dict[str, str]] = None,
+                    session_lease: Optional[Callable[[str], ContextManager[requests.Session]]] = None) -> "SegmentedDownloader":
+        """
+        Build a downloader from the ``download`` section of the config.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+            session: Optional shared requests session
+            headers: Extra request headers
+            session_lease: Optional per-URL session lease
+
+        Returns:
+            Configured SegmentedDownloader
+        """
+        download_config = (config or {}).get("download", {})
+        return cls(
+            session=session,
+            segments=int(download_config.get("segment_count", 8)),
+            min_size_bytes=int(float(download_config.get("segment_min_file_mb", 16)) * 1024 * 1024),
+            min_segment_bytes=int(float(download_config.get("segment_min_mb", 2)) * 1024 * 1024),
+            segment_retries=int(download_config.get("segment_retries", 3)),
+            connect_timeout=download_config.get("connect_timeout_seconds", 30) or 30,
+            read_timeout=download_config.get("read_timeout_seconds", 300) or 300,
+            chunk_size=int(download_config.get("chunk_size", 64 * 1024) or 64 * 1024),
+            headers=headers,
+            session_lease=session_lease
+        )
+
+    @contextmanager
+    def _session(self, url: str) -> Iterator[requests.Session]:
+        """The session for one request, leased for as long as the request runs."""
+        if self.session_lease is None:
+            yield self.session
+            return
+        with self.session_lease(url) as session:
+            yield session
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get downloader statistics."""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    # ------------------------
+    # Probing and planning
+    # ------------------------
+
+    def probe(self, url: str) -> RangeProbe:
+        """
+        Find the file size, range support and validator of a URL.
+
+        HEAD is tried first; when it does not advertise ranges, a one-byte
+        ranged GET settles it (a 206 with a total size means ranges work).
+        """
+        size, validator, status_code = None, None, None
+        try:
+            with self._session(url) as session:
+                response = session.head(url, headers=self.headers, allow_redirects=True, timeout=self.timeout)
+            status_code = response.status_code
+            if response.ok:
+                length = response.headers.get("Content-Length", "")
+                size = int(length) if length.isdigit() else None
+                validator = _strong_validator(response.headers)
+                if size and response.headers.get("Accept-Ranges", "").lower() == "bytes":
+                    return RangeProbe(size, True, validator, status_code)
+
+            headers = dict(self.headers, Range="bytes=0-0")
+            with self._session(url) as session, \
+                    session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                status_code = response.status_code
+                match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if response.status_code == 206 and match and match.group(3) != "*":
+                    return RangeProbe(int(match.group(3)), True,
+                                      _strong_validator(response.headers) or validator, status_code)
+        except requests.RequestException as e:
+            logger.debug(f"Range probe failed for {url}: {e}")
+        return RangeProbe(size, False, validator, status_code)
+
+    def plan(self, size: int) -> List[List[int]]:
+        """
+        Split a file into [start, end, done, durable] segments (end inclusive).
+
+        ``done`` counts bytes written, ``durable`` the part of them known
+        to be on disk; only ``durable`` goes to the state sidecar.
+        """
+        count = max(1, min(self.segments, size // self.min_segment_bytes))
+        length = -(-size // count)
+        return [[start, min(start + length, size) - 1, 0, 0] for start in range(0, size, length)]
+
+    # ------------------------
+    # State sidecar
+    # ------------------------
+
+    def _load_state(self, state_path: Path, part_path: Path, url: str,
+                    probe: RangeProbe) -> Optional[List[List[int]]]:
+        """Saved segments, if they belong to this URL/file and the data file is intact."""
+        try:
+            with state_path.open("r", encoding="utf-8") as f:
+                state = json.load(f)
+            if (state.get("url") != url or state.get("size") != probe.size
+                    or not probe.validator or state.get("validator") != probe.validator
+                    or part_path.stat().st_size != probe.size):
+                return None
+            return [[start, end, done, done] for start, end, done in state["segments"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_state(self, state_path: Path, url: str, probe: RangeProbe,
+                    segments: List[List[int]], lock: threading.Lock) -> None:
+        with lock:
+            # Durable offsets only: bytes still in a writer's buffer are not on disk yet
+            state = {"url": url, "size": probe.size, "validator": probe.validator,
+                     "segments": [[segment[0], segment[1], segment[3]] for segment in segments]}
+            tmp_path = state_path.with_name(state_path.name + ".tmp")
+            try:
+                with tmp_path.open("w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, state_path)
+            except OSError as e:
+                logger.debug(f"Could not save segment state {state_path}: {e}")
+
+    # ------------------------
+    # Download
+    # ------------------------
+
+    def download(self, url: str, dest_path: Path,
+                 progress_callback: Optional[Callable[[int, int], None]] = None) -> SegmentedResult:
+        """
+        Download a file in concurrent segments.
+
+        Args:
+            url: File URL
+            dest_path: Final file path (written atomically when complete)
+            progress_callback: Called with (bytes done, total bytes) as segments progress
+
+        Returns:
+            SegmentedResult; ``fallback`` is set (and nothing written) when
+            the file should be downloaded without segmentation
+        """
+        dest_path = Path(dest_path)
+        probe = self.probe(url)
+        if not probe.accepts_ranges or not probe.size or probe.size < self.min_size_bytes:
+            self._count(fallbacks=1)
+            reason = "no range support" if not probe.accepts_ranges else f"size {probe.size}"
+            logger.debug(f"Not segmenting {dest_path.name} ({reason})")
+            return SegmentedResult(success=False, fallback=True, status_code=probe.status_code)
+
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest_path.with_name(dest_path.name + PART_SUFFIX)
+        state_path = dest_path.with_name(dest_path.name + STATE_SUFFIX)
+
+        segments = self._load_state(state_path, part_path, url, probe)
+        resumed_bytes = sum(segment[2] for segment in segments) if segments else 0
+        if segments is None:
+            segments = self.plan(probe.size)
+            # Preallocate so every segment can write at its own offset
+            with open(part_path, "wb") as f:
+                f.truncate(probe.size)
+        elif resumed_bytes:
+            self._count(resumed_bytes=resumed_bytes)
+            logger.info(f"Resuming {dest_path.name}: {resumed_bytes}/{probe.size} bytes already on disk")
+
+        state_lock = threading.Lock()
+        self._save_state(state_path, url, probe, segments, state_lock)
+        progress = _Progress(probe.size, sum(segment[2] for segment in segments), progress_callback)
+
+        pending = [segment for segment in segments if segment[0] + segment[2] <= segment[1]]
+        retries = 0
+        error = None
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="segment") as executor:
+                outcomes = list(executor.map(
+                    lambda segment: self._fetch_segment(url, part_path, state_path, probe, segments,
+                                                        segment, state_lock, progress),
+                    pending))
+            retries = sum(outcome[0] for outcome in outcomes)
+            errors = [outcome[1] for outcome in outcomes if outcome[1]]
+            error = errors[0] if errors else None
+        self._count(segment_retries=retries)
+
+        if error is None and any(segment[0] + segment[2] <= segment[1] for segment in segments):
+            error = "Segments incomplete"
+        if error is not None:
+            self._count(failed=1)
+            logger.warning(f"Segmented download of {dest_path.name} failed: {error}")
+            return SegmentedResult(success=False, size_bytes=progress.done, resumed_bytes=resumed_bytes,
+                                   segments=len(segments), segment_retries=retries, error=error)
+
+        os.replace(part_path, dest_path)
+        state_path.unlink(missing_ok=True)
+        self._count(segmented=1)
+        logger.info(f"Segmented download complete: {dest_path.name} ({probe.size} bytes, "
+                    f"{len(segments)} segments, {retries} retries, {resumed_bytes} resumed)")
+        return SegmentedResult(success=True, size_bytes=probe.size, resumed_bytes=resumed_bytes,
+                               segments=len(segments), segment_retries=retries, status_code=206)
+
+    def _fetch_segment(self, url: str, part_path: Path, state_path: Path, probe: RangeProbe,
+                       segments: List[List[int]], segment: List[int], state_lock: threading.Lock,
+                       progress: "_Progress") -> Tuple[int, Optional[str]]:
+        """Fetch one segment with its own retries. Returns (retries used, error or None)."""
+        start, end = segment[0], segment[1]
+        for attempt in range(self.segment_retries + 1):
+            try:
+                self._stream_range(url, part_path, state_path, probe, segments, segment, state_lock, progress)
+                self._save_state(state_path, url, probe, segments, state_lock)
+                return attempt, None
+            except ResourceChangedError as e:
+                # Saved bytes belong to another version of the file; start over next time
+                state_path.unlink(missing_ok=True)
+                return attempt, str(e)
+            except (requests.RequestException, OSError) as e:
+                # Resume from the last durable offset; later bytes may not have reached the file
+                progress.add(segment[3] - segment[2])
+                segment[2] = segment[3]
+                self._save_state(state_path, url, probe, segments, state_lock)
+                if attempt == self.segment_retries:
+                    return attempt, f"Segment {start}-{end} failed: {e}"
+                backoff = min(30, 2 ** attempt)
+                logger.debug(f"Segment {start}-{end} of {part_path.name} failed ({e}); retry in {backoff}s")
+                time.sleep(backoff)
+        return self.segment_retries, f"Segment {start}-{end} failed"
+
+    def _stream_range(self, url: str, part_path: Path, state_path: Path, probe: RangeProbe,
+                      segments: List[List[int]], segment: List[int], state_lock: threading.Lock,
+                      progress: "_Progress") -> None:
+        start, end = segment[0], segment[1]
+        offset = start + segment[2]
+        if offset > end:
+            return
+
+        headers = dict(self.headers, Range=f"bytes={offset}-{end}")
+        if probe.validator:
+            headers["If-Range"] = probe.validator
+        with self._session(url) as session, \
+                session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if response.status_code != 206 or not match or int(match.group(1)) != offset:
+                raise ResourceChangedError(f"Server did not honour range {offset}-{end} "
+                                           f"(status {response.status_code})")
+
+            unsaved = 0
+            with open(part_path, "r+b") as f:
+                f.seek(offset)
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if not chunk:
+                        continue
+                    # Never write past the segment, whatever the server sends
+                    chunk = chunk[:end + 1 - offset]
+                    f.write(chunk)
+                    offset += len(chunk)
+                    segment[2] = offset - start
+                    progress.add(len(chunk))
+                    unsaved += len(chunk)
+                    if unsaved >= _STATE_SAVE_INTERVAL_BYTES:
+                        _sync(f)
+                        segment[3] = segment[2]
+                        self._save_state(state_path, url, probe, segments, state_lock)
+                        unsaved = 0
+                    if offset > end:
+                        break
+                _sync(f)
+                segment[3] = segment[2]
+
+        if offset <= end:
+            raise requests.exceptions.ChunkedEncodingError(f"Segment ended at {offset}, expected {end + 1}")
+
+
+class _Progress:
+    """Thread-safe byte counter feeding the progress callback."""
+
+    def __init__(self, total: int, done: int, callback: Optional[Callable[[int, int], None]]):
+        self.total = total
+        self.done = done
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.done += count
+            done = self.done
+        if self.callback:
+            try:
+                self.callback(done, self.total)
+            except Exception:
+                logger.debug("Progress callback failed", exc_info=True)
+
+
+def _sync(f) -> None:
+    """Push a file's buffered writes to disk."""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _strong_validator(headers) -> Optional[str]:
+    """ETag usable in If-Range (weak ones are not), else Last-Modified."""
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Selector Schema Module
+
+One declarative field schema (selector_schema.json) shared by every
+extractor: each field lists its selectors in fallback order plus the
+post-processors applied to the matched value. The file is compiled once
+per process into regex and lxml XPath objects and can be run against raw
+HTML, lxml trees, Playwright pages/elements, Selenium (via the compiled
+selector strings) or Crawl4AI output.
+
+Every extraction records which selector won for each field, so fallbacks
+that never hit can be dropped and the order tuned by hit rate.
+
+This module only depends on the standard library (lxml is optional) so
+the legacy scraper can import it as ``new.selector_schema``.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import json
+import re
+import threading
+import time
+from html import unescape
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = Path(__file__).with_name("selector_schema.json")
+
+_REGEX_FLAGS = {
+    "IGNORECASE": re.IGNORECASE,
+    "DOTALL": re.DOTALL,
+    "MULTILINE": re.MULTILINE
+}
+
+
+def _digits_int(value: str) -> Optional[int]:
+    """'1,234' -> 1234 (None unless only digits remain)."""
+    digits = value.replace(',', '')
+    return int(digits) if digits.isdigit() else None
+
+
+def _build_post_processor(spec: str) -> Callable[[Any], Any]:
+    """
+    Compile one post-processor spec (``name`` or ``name:argument``).
+
+    A post-processor returns the transformed value, or None to reject the
+    match so the next selector is tried.
+    """
+    name, _, argument = spec.partition(":")
+
+    if name == "strip":
+        return lambda value: value.strip()
+    if name == "normalize_space":
+        return lambda value: " ".join(value.split())
+    if name == "unescape":
+        return unescape
+    if name == "lower":
+        return lambda value: value.lower()
+    if name == "digits_int":
+        return _digits_int
+    if name == "not":
+        return lambda value: None if value == argument else value
+    if name == "min_length":
+        min_length = int(argument)
+        return lambda value: value if len(value) >= min_length else None
+    if name == "startswith":
+        return lambda value: value if value.startswith(argument) else None
+    if name == "match":
+        pattern = re.compile(argument)
+        return lambda value: value if pattern.match(value) else None
+
+    raise ValueError(f"Unknown selector post-processor: {spec}")
+
+
+class SelectorStats:
+    """Thread-safe per-field record of which selector won and what each cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fields: Dict[str, Dict[str, Any]] = {}
+
+    def _field(self, key: str) -> Dict[str, Any]:
+        return self._fields.setdefault(key, {"attempts": 0, "misses": 0, "hits": {}, "time_ms": {}})
+
+    def record(self, key: str, winner: Optional[str], timings: List[Tuple[str, float]]) -> None:
+        """
+        Record one extraction.
+
+        Args:
+            key: "group.field"
+            winner: Label of the selector that produced the value (None on a miss)
+            timings: (label, elapsed ms) of every selector that was evaluated
+        """
+        with self._lock:
+            field = self._field(key)
+            field["attempts"] += 1
+            if winner is None:
+                field["misses"] += 1
+            else:
+                field["hits"][winner] = field["hits"].get(winner, 0) + 1
+            for label, elapsed_ms in timings:
+                field["time_ms"][label] = field["time_ms"].get(label, 0.0) + elapsed_ms
+
+    def merge(self, report: Dict[str, Dict[str, Any]]) -> None:
+        """Add counts from a previously saved report."""
+        with self._lock:
+            for key, saved in report.items():
+                field = self._field(key)
+                field["attempts"] += saved.get("attempts", 0)
+                field["misses"] += saved.get("misses", 0)
+                for label, hits in saved.get("hits", {}).items():
+                    field["hits"][label] = field["hits"].get(label, 0) + hits
+                for label, elapsed_ms in saved.get("time_ms", {}).items():
+                    field["time_ms"][label] = field["time_ms"].get(label, 0.0) + elapsed_ms
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of attempts, misses, hits and time per selector for every field."""
+        with self._lock:
+            return {
+                key: {
+                    "attempts": field["attempts"],
+                    "misses": field["misses"],
+                    "hits": dict(field["hits"]),
+                    "time_ms": {label: round(ms, 3) for label, ms in field["time_ms"].items()}
+                }
+                for key, field in self._fields.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._fields.clear()
+
+
+class CompiledSelector:
+    """One selector of a field, compiled for every engine it supports."""
+
+    def __init__(self, spec: Dict[str, Any], field_post: List[Callable[[Any], Any]],
+                 default_attribute: Optional[str]):
+        self.label = spec.get("label") or spec.get("css") or spec.get("xpath") or spec.get("regex")
+        self.css: Optional[str] = spec.get("css")
+        self.xpath: Optional[str] = spec.get("xpath")
+        self.attribute: Optional[str] = spec.get("attribute", default_attribute)
+        self.group = spec.get("group", 1)
+        self.post = field_post + [_build_post_processor(p) for p in spec.get("post", [])]
+
+        self.regex: Optional[re.Pattern] = None
+        if spec.get("regex"):
+            flags = 0
+            for flag in spec.get("flags", []):
+                flags |= _REGEX_FLAGS[flag]
+            self.regex = re.compile(spec["regex"], flags)
+
+        self.compiled_xpath = etree.XPath(self.xpath) if self.xpath and LXML_AVAILABLE else None
+
+    @property
+    def browser_selector(self) -> Optional[str]:
+        """Selector string for Playwright (CSS preferred, XPath otherwise)."""
+        if self.css:
+            return self.css
+        return f"xpath={self.xpath}" if self.xpath else None
+
+    def postprocess(self, value: Any) -> Any:
+        """Run the post-processors; None means the match was rejected."""
+        for post in self.post:
+            if value is None:
+                return None
+            value = post(value)
+        return value
+
+    def raw_from_html(self, html_content: str) -> Optional[str]:
+        match = self.regex.search(html_content)
+        return match.group(self.group) if match else None
+
+    def raw_from_tree(self, node) -> Optional[str]:
+        for result in self.compiled_xpath(node):
+            if isinstance(result, str):
+                return str(result)
+            if self.attribute:
+                value = result.get(self.attribute)
+                if value:
+                    return value
+                continue
+            return result.text_content()
+        return None
+
+    async def raw_from_page(self, page) -> Optional[str]:
+        if self.attribute:
+            for element in await page.query_selector_all(self.browser_selector):
+                value = await element.get_attribute(self.attribute)
+                if value:
+                    return value
+            return None
+
+        element = await page.query_selector(self.browser_selector)
+        return await element.text_content() if element else None
+
+
+class FieldSchema:
+    """Ordered fallback selectors for one field."""
+
+    def __init__(self, group: str, name: str, spec: Dict[str, Any], stats: SelectorStats):
+        self.group = group
+        self.name = name
+        self.key = f"{group}.{name}"
+        self.accept_empty = spec.get("accept_empty", False)
+        self.stats = stats
+
+        field_post = [_build_post_processor(p) for p in spec.get("post", [])]
+        default_attribute = spec.get("attribute") if spec.get("type") == "attribute" else None
+        self.selectors = [CompiledSelector(s, field_post, default_attribute) for s in spec["selectors"]]
+
+    def _accept(self, value: Any) -> bool:
+        return value is not None and (self.accept_empty or value != "")
+
+    def extract(self, html_content: Optional[str] = None, tree=None, default: Any = None) -> Any:
+        """
+        Return the first selector's value that survives post-processing.
+
+        Regex selectors run on html_content, XPath selectors on the lxml
+        tree (or element); selectors without input for their engine are
+        skipped.
+
+        Args:
+            html_content: Raw HTML
+            tree: lxml document or element
+            default: Value returned when no selector matches
+
+        Returns:
+            Extracted value, or default
+        """
+        timings = []
+        for selector in self.selectors:
+            if selector.regex is not None and html_content is not None:
+                get_raw, source = selector.raw_from_html, html_content
+            elif selector.compiled_xpath is not None and tree is not None:
+                get_raw, source = selector.raw_from_tree, tree
+            else:
+                continue
+
+            start = time.perf_counter()
+            raw = get_raw(source)
+            value = selector.postprocess(raw) if raw is not None else None
+            timings.append((selector.label, (time.perf_counter() - start) * 1000))
+
+            if self._accept(value):
+                self.stats.record(self.key, selector.label, timings)
+                return value
+
+        self.stats.record(self.key, None, timings)
+        return default
+
+    async def extract_from_page(self, page, default: Any = None) -> Any:
+        """Same as extract() against a Playwright page or element handle."""
+        timings = []
+        for selector in self.selectors:
+            if not selector.browser_selector:
+                continue
+
+            start = time.perf_counter()
+            raw = await selector.raw_from_page(page)
+            value = selector.postprocess(raw) if raw is not None else None
+            timings.append((selector.label, (time.perf_counter() - start) * 1000))
+
+            if self._accept(value):
+                self.stats.record(self.key, selector.label, timings)
+                return value
+
+        self.stats.record(self.key, None, timings)
+        return default
+
+    def xpaths(self) -> List[Tuple[str, str]]:
+        """(label, xpath) pairs in fallback order, for Selenium lookups."""
+        return [(s.label, s.xpath) for s in self.selectors if s.xpath]
+
+    def css_selectors(self) -> List[Tuple[str, str]]:
+        """(label, css) pairs in fallback order, for Selenium lookups."""
+        return [(s.label, s.css) for s in self.selectors if s.css]
+
+    def record_hit(self, label: Optional[str], elapsed_ms: float = 0.0) -> None:
+        """Record the winner of a lookup driven by the caller (Selenium loops); None is a miss."""
+        self.stats.record(self.key, label, [(label, elapsed_ms)] if label else [])
+
+
+class GroupSchema:
+    """Fields that share a page context and an optional item base selector."""
+
+    def __init__(self, name: str, spec: Dict[str, Any], stats: SelectorStats):
+        self.name = name
+        self.description = spec.get("description", "")
+        self.stats = stats
+        self.base = [CompiledSelector(s, [], None) for s in spec.get("base", [])]
+        self.fields = {field_name: FieldSchema(name, field_name, field_spec, stats)
+                       for field_name, field_spec in spec.get("fields", {}).items()}
+
+    def field(self, name: str) -> FieldSchema:
+        return self.fields[name]
+
+    def items_from_tree(self, tree) -> List[Any]:
+        """Item elements of the first base XPath that matches anything."""
+        start = time.perf_counter()
+        for selector in self.base:
+            if selector.compiled_xpath is None:
+                continue
+            items = selector.compiled_xpath(tree)
+            if items:
+                self.stats.record(f"{self.name}.base", selector.label,
+                                  [(selector.label, (time.perf_counter() - start) * 1000)])
+                return items
+        self.stats.record(f"{self.name}.base", None, [])
+        return []
+
+    async def items_from_page(self, page) -> Tuple[List[Any], Optional[str]]:
+        """
+        Item element handles of the first base selector that matches anything.
+
+        Returns:
+            (element handles, winning selector label or None)
+        """
+        start = time.perf_counter()
+        for selector in self.base:
+            if not selector.browser_selector:
+                continue
+            items = await page.query_selector_all(selector.browser_selector)
+            if items:
+                self.stats.record(f"{self.name}.base", selector.label,
+                                  [(selector.label, (time.perf_counter() - start) * 1000)])
+                return items, selector.label
+        self.stats.record(f"{self.name}.base", None, [])
+        return [], None
+
+    def to_crawl4ai_schema(self, schema_name: str) -> Dict[str, Any]:
+        """
+        Crawl4AI JsonCssExtractionStrategy schema for this group.
+
+        Each CSS fallback becomes its own output field (``name``,
+        ``name__1``, ...); resolve_crawl4ai() folds them back together.
+        """
+        base = next((s.css for s in self.base if s.css), None)
+        fields = []
+        for field in self.fields.values():
+            css_selectors = [s for s in field.selectors if s.css]
+            for index, selector in enumerate(css_selectors):
+                crawl4ai_field = {
+                    "name": field.name if index == 0 else f"{field.name}__{index}",
+                    "selector": selector.css,
+                    "type": "attribute" if selector.attribute else "text"
+                }
+                if selector.attribute:
+                    crawl4ai_field["attribute"] = selector.attribute
+                fields.append(crawl4ai_field)
+
+        schema = {"name": schema_name, "fields": fields}
+        if base:
+            schema["baseSelector"] = base
+        return schema
+
+    def resolve_crawl4ai(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fold one Crawl4AI output item back to one value per field.
+
+        Picks the first fallback column that survives post-processing and
+        records the winner; fields with no value are left out.
+        """
+        resolved = {key: value for key, value in item.items() if "__" not in key}
+        for field in self.fields.values():
+            css_selectors = [s for s in field.selectors if s.css]
+            winner = None
+            for index, selector in enumerate(css_selectors):
+                column = field.name if index == 0 else f"{field.name}__{index}"
+                raw = item.get(column)
+                if raw is None:
+                    continue
+                value = selector.postprocess(raw) if isinstance(raw, str) else raw
+                if field._accept(value):
+                    resolved[field.name] = value
+                    winner = selector.label
+                    break
+            if winner is None:
+                resolved.pop(field.name, None)
+            self.stats.record(field.key, winner, [])
+        return resolved
+
+
+class SelectorSchema:
+    """The compiled selector schema: groups of fields plus shared hit statistics."""
+
+    def __init__(self, spec: Dict[str, Any], source: str = "<dict>"):
+        self.source = source
+        self.version = spec.get("version", 1)
+        self.stats = SelectorStats()
+        self.groups = {name: GroupSchema(name, group_spec, self.stats)
+                       for name, group_spec in spec.get("groups", {}).items()}
+
+    @classmethod
+    def from_file(cls, path: Path) -> "SelectorSchema":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), source=str(path))
+
+    def group(self, name: str) -> GroupSchema:
+        return self.groups[name]
+
+    def field(self, group: str, name: str) -> FieldSchema:
+        return self.groups[group].fields[name]
+
+    def get_hit_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Hit statistics per field, with selectors ordered by hit count and the
+        selectors that never won listed separately.
+        """
+        report = self.stats.get_report()
+        for key, entry in report.items():
+            group_name, _, field_name = key.partition(".")
+            group = self.groups.get(group_name)
+            if group is None:
+                continue
+            if field_name == "base":
+                labels = [s.label for s in group.base]
+            elif field_name in group.fields:
+                labels = [s.label for s in group.fields[field_name].selectors]
+            else:
+                continue
+            entry["suggested_order"] = sorted(labels, key=lambda label: -entry["hits"].get(label, 0))
+            entry["never_hit"] = [label for label in labels if not entry["hits"].get(label)]
+        return report
+
+    def save_stats(self, path: str) -> None:
+        """Accumulate this process's hit statistics into a JSON file across runs."""
+        stats_path = Path(path)
+        try:
+            if stats_path.exists():
+                with open(stats_path, 'r', encoding='utf-8') as f:
+                    self.stats.merge(json.load(f))
+            with open(stats_path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats.get_report(), f, indent=2)
+            self.stats.reset()
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not save selector statistics to {stats_path}: {e}")
+
+
+_schema_cache: Dict[str, SelectorSchema] = {}
+_schema_lock = threading.Lock()
+
+
+def load_schema(path: Optional[str] = None) -> SelectorSchema:
+    """
+    Load and compile the selector schema once per process.
+
+    Args:
+        path: Schema file (defaults to selector_schema.json next to this module)
+
+    Returns:
+        Shared compiled SelectorSchema
+    """
+    schema_path = Path(path) if path else SCHEMA_PATH
+    key = str(schema_path.resolve())
+    with _schema_lock:
+        if key not in _schema_cache:
+            _schema_cache[key] = SelectorSchema.from_file(schema_path)
+            logger.debug(f"Compiled selector schema from {schema_path}")
+        return _schema_cache[key]
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Session Registry Module
+
+Process-wide, thread-safe registry of requests sessions, one per
+scheme + host, so consecutive downloads from the same CDN host (a video
+and its thumbnail, or the next video) reuse their TCP/TLS connections
+instead of opening a fresh pool per file. Pool sizes and retries come
+from the ``download`` config section. Sessions are only handed out as
+leases (``with registry.lease(url) as session``, or acquire/release),
+held for every request; a session is closed only when no lease is held
+and the last one was released more than ``pool_idle_timeout_seconds``
+ago, so a long download never loses its session mid-stream. Connection reuse is counted from the urllib3
+pools (new connections vs requests served) and exposed through
+get_stats().
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that can report how many connections its pools opened and reused."""
+
+    def connection_counts(self) -> Dict[str, int]:
+        """New connections and requests of the pools this adapter currently holds."""
+        connections = requests_sent = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+        return {"new_connections": connections, "requests": requests_sent}
+
+
+class SessionRegistry:
+    """Hands out one pooled requests.Session per host."""
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 32, pool_block: bool = True,
+                 idle_timeout_seconds: float = 120.0, max_retries: Optional[Retry] = None):
+        """
+        Initialize session registry.
+
+        Args:
+            pool_connections: urllib3 pools cached per session
+            pool_maxsize: Connections kept per pool (concurrent downloads + segments per host)
+            pool_block: Wait for a free connection instead of opening throwaway ones
+            idle_timeout_seconds: Close a host's session after this long unused (0 = never)
+            max_retries: Retry policy mounted on every session
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_retries = max_retries if max_retries is not None else Retry(
+            total=5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "HEAD"],
+            backoff_factor=2,
+            respect_retry_after_header=True
+        )
+        self._sessions: Dict[str, requests.Session] = {}
+        self._last_used: Dict[str, float] = {}
+        # Transfers currently holding each host's session (never evicted while > 0)
+        self._leases: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = time.monotonic()
+        # Counts of sessions already closed, so eviction does not lose them
+        self._closed_counts = {"new_connections": 0, "requests": 0}
+        self.stats = {"sessions_created": 0, "sessions_evicted": 0, "lookups": 0, "leases": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SessionRegistry":
+        """
+        Build a registry from the ``download`` section of the config.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            Configured SessionRegistry
+        """
+        download_config = (config or {}).get("download", {})
+        return cls(
+            pool_connections=int(download_config.get("pool_connections", 10)),
+            pool_maxsize=int(download_config.get("pool_maxsize", 32)),
+            pool_block=bool(download_config.get("pool_block", True)),
+            idle_timeout_seconds=float(download_config.get("pool_idle_timeout_seconds", 120))
+        )
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Registry key of a URL ("https://cdn.example.com:443")."""
+        parts = urlsplit(url)
+        return f"{parts.scheme or 'http'}://{(parts.netloc or parts.path).lower()}"
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = CountingHTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                                      pool_block=self.pool_block, max_retries=self.max_retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def acquire(self, url: str) -> requests.Session:
+        """
+        Lease the session for a URL's host; it stays open until release().
+
+        Args:
+            url: Any URL on the host
+
+        Returns:
+            requests.Session safe to share between download threads
+        """
+        return self._lookup(self.host_key(url))
+
+    def release(self, url: str) -> None:
+        """Return a lease taken with acquire(); the idle timeout starts from the last release."""
+        key = self.host_key(url)
+        with self._lock:
+            count = self._leases.get(key, 0) - 1
+            if count > 0:
+                self._leases[key] = count
+            else:
+                self._leases.pop(key, None)
+            if key in self._sessions:
+                self._last_used[key] = time.monotonic()
+
+    @contextmanager
+    def lease(self, url: str) -> Iterator[requests.Session]:
+        """Hold the host's session for the duration of a transfer."""
+        session = self.acquire(url)
+        try:
+            yield session
+        finally:
+            self.release(url)
+
+    def _lookup(self, key: str) -> requests.Session:
+        now = time.monotonic()
+        self._evict_idle(now)
+        with self._lock:
+            self.stats["lookups"] += 1
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._new_session()
+                self._sessions[key] = session
+                self.stats["sessions_created"] += 1
+                logger.debug(f"Created pooled session for {key}")
+            self._leases[key] = self._leases.get(key, 0) + 1
+            self.stats["leases"] += 1
+            self._last_used[key] = now
+            return session
+
+    def _evict_idle(self, now: float) -> None:
+        """Close unleased sessions idle longer than the timeout (checked at most every few seconds)."""
+        if not self.idle_timeout_seconds or now - self._last_eviction < min(10.0, self.idle_timeout_seconds):
+            return
+        with self._lock:
+            self._last_eviction = now
+            idle = [key for key, last_used in self._last_used.items()
+                    if not self._leases.get(key) and now - last_used > self.idle_timeout_seconds]
+            for key in idle:
+                self._close_session(key)
+                self.stats["sessions_evicted"] += 1
+        if idle:
+            logger.debug(f"Evicted idle sessions: {idle}")
+
+    def _close_session(self, key: str) -> None:
+        """Close one host's session, keeping its connection counts (lock held)."""
+        session = self._sessions.pop(key)
+        self._last_used.pop(key, None)
+        for name, value in _session_counts(session).items():
+            self._closed_counts[name] += value
+        session.close()
+
+    def close(self) -> None:
+        """Close every session, leased or not (counts are kept)."""
+        with self._lock:
+            for key in list(self._sessions):
+                self._close_session(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Registry and connection reuse statistics.
+
+        Returns:
+            Hosts, sessions created/evicted, new vs reused connections and
+            the share of requests that reused a connection
+        """
+        with self._lock:
+            counts = dict(self._closed_counts)
+            for session in self._sessions.values():
+                for name, value in _session_counts(session).items():
+                    counts[name] += value
+            hosts = len(self._sessions)
+            active_leases = sum(self._leases.values())
+            stats = dict(self.stats)
+
+        reused = max(0, counts["requests"] - counts["new_connections"])
+        return {
+            **stats,
+            "active_hosts": hosts,
+            "active_leases": active_leases,
+            "requests": counts["requests"],
+            "new_connections": counts["new_connections"],
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / counts["requests"], 3) if counts["requests"] else 0.0
+        }
+
+
+def _session_counts(session: requests.Session) -> Dict[str, int]:
+    counts = {"new_connections": 0, "requests": 0}
+    # Both schemes share one adapter; count each adapter once
+    for adapter in {id(adapter): adapter for adapter in session.adapters.values()}.values():
+        if isinstance(adapter, CountingHTTPAdapter):
+            for name, value in adapter.connection_counts().items():
+                counts[name] += value
+    return counts
+
+
+_registry: Optional[SessionRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry(config: Optional[Dict[str, Any]] = None) -> SessionRegistry:
+    """
+    The process-wide registry; the first call's config sets its pool sizes.
+
+    Args:
+        config: Full configuration dictionary (used only when the registry is created)
+
+    Returns:
+        Shared SessionRegistry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SessionRegistry.from_config(config)
+        return _registry
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Session State Module
+
+Persists the age-gate consent session (cookies and local storage) to disk
+so the popup is accepted once per run instead of once per browser. The
+saved Playwright storage state is loaded into every new browser context
+and its cookies into the HTTP fetcher session; it is treated as expired
+after a maximum age or once any consent cookie expires.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import json
+import os
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStateStore:
+    """Loads, validates and saves Playwright storage state on disk."""
+
+    def __init__(self, path: str = "session_state.json", max_age_hours: float = 24.0,
+                 enabled: bool = True):
+        """
+        Initialize session state store.
+
+        Args:
+            path: JSON file holding the Playwright storage state
+            max_age_hours: Refresh the state after this many hours
+            enabled: Master switch; when False nothing is loaded or saved
+        """
+        self.path = Path(path)
+        self.max_age_seconds = max_age_hours * 3600
+        self.enabled = enabled
+        self._cached_state: Optional[Dict[str, Any]] = None
+        self._cached_mtime: Optional[float] = None
+        self.stats = {"loads": 0, "saves": 0, "expired": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SessionStateStore":
+        """
+        Build a store from the ``session_state`` section of config.json.
+
+        Args:
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            Configured SessionStateStore
+        """
+        state_config = (config or {}).get("session_state", {})
+        return cls(
+            path=state_config.get("path", "session_state.json"),
+            max_age_hours=state_config.get("max_age_hours", 24),
+            enabled=state_config.get("enabled", True)
+        )
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the saved storage state if it is still valid.
+
+        Re-reads the file when another worker has rewritten it.
+
+        Returns:
+            Playwright storage state dict, or None if missing or expired
+        """
+        if not self.enabled or not self.path.exists():
+            return None
+
+        try:
+            mtime = self.path.stat().st_mtime
+            if self._cached_state is None or self._cached_mtime != mtime:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._cached_state = json.load(f)
+                self._cached_mtime = mtime
+                self.stats["loads"] += 1
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read session state {self.path}: {e}")
+            return None
+
+        if self._is_expired(self._cached_state, self._cached_mtime):
+            self.stats["expired"] += 1
+            logger.info("Saved age-gate session state expired, it will be refreshed")
+            return None
+
+        return self._cached_state
+
+    def _is_expired(self, state: Dict[str, Any], mtime: float) -> bool:
+        """True if the state is too old or any persistent cookie has expired."""
+        now = time.time()
+        if now - mtime > self.max_age_seconds:
+            return True
+
+        cookies = state.get("cookies", [])
+        if not cookies:
+            return True
+
+        # Session cookies carry expires == -1
+        return any(0 < cookie.get("expires", -1) < now for cookie in cookies)
+
+    async def save_from_context(self, context) -> Optional[Dict[str, Any]]:
+        """
+        Capture and save the storage state of a Playwright context.
+
+        Args:
+            context: Playwright BrowserContext that has passed the age gate
+
+        Returns:
+            The saved storage state, or None on failure
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            state = await context.storage_state()
+        except Exception as e:
+            logger.warning(f"Could not capture session state: {e}")
+            return None
+
+        self.save(state)
+        return state
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Write the storage state atomically so concurrent workers never read a partial file."""
+        if not self.enabled:
+            return
+
+        try:
+            if self.path.parent and not self.path.parent.exists():
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(self.path.suffix + f".{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_path, self.path)
+
+            self._cached_state = state
+            self._cached_mtime = self.path.stat().st_mtime
+            self.stats["saves"] += 1
+            logger.info(f"Saved age-gate session state to {self.path}")
+        except OSError as e:
+            logger.warning(f"Could not save session state to {self.path}: {e}")
+
+    def invalidate(self) -> None:
+        """Forget the saved state (e.g. when the popup shows up despite it)."""
+        self._cached_state = None
+        self._cached_mtime = None
+        try:
+            if self.path.exists():
+                self.path.unlink()
+        except OSError as e:
+            logger.debug(f"Could not remove session state {self.path}: {e}")
+
+    def context_options(self) -> Dict[str, Any]:
+        """Keyword arguments for ``browser.new_context`` that restore the saved state."""
+        state = self.load()
+        return {"storage_state": state} if state else {}
+
+    def get_cookies(self) -> List[Dict[str, Any]]:
+        """Cookies from the valid saved state (empty if none)."""
+        state = self.load()
+        return list(state.get("cookies", [])) if state else []
+
+    def get_http_cookies(self) -> SimpleCookie:
+        """Saved cookies as a SimpleCookie for aiohttp's cookie jar."""
+        jar = SimpleCookie()
+        for cookie in self.get_cookies():
+            name = cookie.get("name")
+            if not name:
+                continue
+            jar[name] = cookie.get("value", "")
+            morsel = jar[name]
+            morsel["domain"] = cookie.get("domain", "")
+            morsel["path"] = cookie.get("path", "/")
+            if cookie.get("secure"):
+                morsel["secure"] = True
+        return jar
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get load/save statistics."""
+        return {**self.stats, "enabled": self.enabled, "path": str(self.path)}
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Storage Ledger Module
+
+Keeps the byte usage of a download tree in memory so storage-limit checks
+no longer walk the whole tree. The tree is scanned once at startup with
+``os.scandir`` (top-level entries in parallel); after that, downloaders
+report the bytes they write and the files they delete, and usage queries
+read a running total in O(1). Subtotals are kept per top-level entry
+(page or video folder), so one finished folder can be re-measured on its
+own with refresh(). A background thread rescans the tree from time to
+time to correct drift from writers that do not report (IDM, manual
+deletes).
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Subtotal key of the files directly in the root
+ROOT_FILES = ""
+
+
+def scan_tree_bytes(path: PathLike) -> int:
+    """
+    Total size of the regular files below a directory (symlinks not followed).
+
+    Args:
+        path: Directory (or file) to measure
+
+    Returns:
+        Size in bytes; entries that vanish during the scan are skipped
+    """
+    try:
+        if not os.path.isdir(path):
+            return os.stat(path).st_size
+    except OSError:
+        return 0
+
+    total = 0
+    stack = [os.fspath(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def scan_entries(root: PathLike, workers: int = 8) -> Dict[str, int]:
+    """
+    Sizes of the top-level entries of a directory, measured in parallel.
+
+    Args:
+        root: Directory to scan
+        workers: Threads scanning top-level subdirectories concurrently
+
+    Returns:
+        Mapping of entry name to bytes (``ROOT_FILES`` for the files
+        directly in the root); empty if the root does not exist
+    """
+    sizes = {ROOT_FILES: 0}
+    directories: List[Tuple[str, str]] = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append((os.path.normcase(entry.name), entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        sizes[ROOT_FILES] += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except FileNotFoundError:
+        return {}
+
+    if len(directories) > 1 and workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(directories)),
+                                thread_name_prefix="storage-scan") as executor:
+            totals = list(executor.map(scan_tree_bytes, [path for _, path in directories]))
+    else:
+        totals = [scan_tree_bytes(path) for _, path in directories]
+    for (key, _), size in zip(directories, totals):
+        sizes[key] = size
+    return sizes
+
+
+def _root_file_bytes(root: str) -> int:
+    total = 0
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        return 0
+    return total
+
+
+def folder_size_bytes(path: PathLike, workers: int = 8) -> int:
+    """One-off parallel size of a directory tree in bytes."""
+    return sum(scan_entries(path, workers).values())
+
+
+class StorageLedger:
+    """Running byte usage of one download tree."""
+
+    def __init__(self, root: PathLike, scan_workers: int = 8, reconcile_interval_seconds: float = 600.0):
+        """
+        Initialize storage ledger.
+
+        Args:
+            root: Download tree to account for
+            scan_workers: Threads used by full scans
+            reconcile_interval_seconds: Seconds between background rescans (0 = never)
+        """
+        self.root = os.path.abspath(os.fspath(root))
+        self._prefix = os.path.normcase(os.path.join(self.root, ""))
+        self.scan_workers = max(1, scan_workers)
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, int] = {}
+        self._total = 0
+        # Deltas applied while a scan is running, one log per scan
+        self._scan_logs: List[Dict[str, int]] = []
+        self._reconcile_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"scans": 0, "refreshes": 0, "deltas": 0,
+                      "last_scan_seconds": 0.0, "last_drift_bytes": 0, "last_scan_at": None}
+
+    @classmethod
+    def from_config(cls, root: PathLike, config: Optional[Dict[str, Any]]) -> "StorageLedger":
+        """
+        Build a ledger from the ``storage`` section of the config.
+
+        Args:
+            root: Download tree to account for
+            config: Full configuration dictionary (may be None)
+
+        Returns:
+            Configured (not yet started) StorageLedger
+        """
+        storage_config = (config or {}).get("storage", {})
+        return cls(
+            root,
+            scan_workers=int(storage_config.get("ledger_scan_workers", 8)),
+            reconcile_interval_seconds=float(storage_config.get("ledger_reconcile_seconds", 600))
+        )
+
+    # ------------------------
+    # Lifecycle
+    # ------------------------
+
+    def start(self) -> "StorageLedger":
+        """Run the initial scan (once) and start the background reconciler."""
+        if self.stats["scans"] == 0:
+            self.reconcile()
+        if self.reconcile_interval_seconds > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._reconcile_loop, name="storage-ledger", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background reconciler."""
+        self._stopped.set()
+        self._wake.set()
+
+    def request_reconcile(self) -> None:
+        """Ask the background reconciler to rescan now instead of at its next interval."""
+        self._wake.set()
+
+    def _reconcile_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.reconcile_interval_seconds)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.warning(f"Storage reconciliation of {self.root} failed: {e}")
+
+    # ------------------------
+    # Queries (O(1))
+    # ------------------------
+
+    def usage_bytes(self) -> int:
+        """Current usage of the tree in bytes."""
+        return self._total
+
+    def usage_mb(self) -> float:
+        """Current usage of the tree in MB."""
+        return self._total / (1024 * 1024)
+
+    def usage_gb(self) -> float:
+        """Current usage of the tree in GB."""
+        return self._total / (1024 ** 3)
+
+    # ------------------------
+    # Deltas
+    # ------------------------
+
+    def _entry(self, path: PathLike) -> Optional[Tuple[str, str]]:
+        """(subtotal key, path of the top-level entry) of a path inside the root, else None."""
+        full = os.path.abspath(os.fspath(path))
+        if not os.path.normcase(full).startswith(self._prefix):
+            return None
+        head, sep, _ = full[len(self._prefix):].partition(os.sep)
+        key = os.path.normcase(head)
+        # A bare name is a top-level directory (possibly just deleted) or a file in the root
+        if not sep and key not in self._sizes and not os.path.isdir(full):
+            return ROOT_FILES, self.root
+        return key, os.path.join(self.root, head)
+
+    def covers(self, path: PathLike) -> bool:
+        """Whether a path lies inside the ledger's tree."""
+        return self._entry(path) is not None
+
+    def _remove_log(self, log: Dict[str, int]) -> None:
+        """Drop a scan's delta log (by identity: empty logs compare equal; lock held)."""
+        self._scan_logs = [other for other in self._scan_logs if other is not log]
+
+    def _apply(self, key: str, delta: int) -> None:
+        with self._lock:
+            self._sizes[key] = self._sizes.get(key, 0) + delta
+            self._total += delta
+            self.stats["deltas"] += 1
+            for log in self._scan_logs:
+                log[key] = log.get(key, 0) + delta
+
+    def record(self, path: PathLike, delta_bytes: int) -> None:
+        """
+        Apply a size change of a file (bytes written, or negative when shrunk).
+
+        Args:
+            path: File that changed (ignored if outside the tree)
+            delta_bytes: Change in bytes
+        """
+        entry = self._entry(path)
+        if entry is not None and delta_bytes:
+            self._apply(entry[0], delta_bytes)
+
+    def discard(self, path: PathLike) -> bool:
+        """
+        Delete a file and subtract its size.
+
+        Args:
+            path: File to delete (missing files are fine)
+
+        Returns:
+            True if a file was removed
+        """
+        try:
+            size = os.stat(path).st_size
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        self.record(path, -size)
+        return True
+
+    def track(self, *paths: PathLike) -> "_Tracker":
+        """
+        Account for the files an operation touches.
+
+        The files' sizes are taken on entry and on exit and the difference
+        is applied; bytes reported live through ``add()`` inside the block
+        show up in usage immediately and are reconciled on exit.
+
+        Args:
+            paths: Files the operation may create, grow, rename or delete
+                (all within one top-level entry)
+
+        Returns:
+            Context manager yielding the tracker
+        """
+        return _Tracker(self, paths)
+
+    def refresh(self, path: PathLike) -> int:
+        """
+        Re-measure the top-level entry containing a path (e.g. a video
+        folder an external downloader just finished).
+
+        Args:
+            path: Any path inside the entry
+
+        Returns:
+            The entry's size in bytes (0 if outside the tree)
+        """
+        entry = self._entry(path)
+        if entry is None:
+            return 0
+        key, entry_path = entry
+        log: Dict[str, int] = {}
+        with self._lock:
+            self._scan_logs.append(log)
+        try:
+            size = _root_file_bytes(self.root) if key == ROOT_FILES else scan_tree_bytes(entry_path)
+        finally:
+            with self._lock:
+                self._remove_log(log)
+                # Writes during the scan may or may not be in it; keep the running figure then
+                if key not in log:
+                    self._total += size - self._sizes.get(key, 0)
+                    self._sizes[key] = size
+                    # A full scan still running measured this entry earlier; it must not overwrite it
+                    for other in self._scan_logs:
+                        other.setdefault(key, 0)
+                else:
+                    size = self._sizes.get(key, 0)
+                self.stats["refreshes"] += 1
+        return size
+
+    # ------------------------
+    # Reconciliation
+    # ------------------------
+
+    def reconcile(self) -> int:
+        """
+        Rescan the whole tree and correct the running total.
+
+        Entries that received deltas while the scan ran keep their running
+        figure (the scan may have seen those writes or not); the next scan
+        corrects them.
+
+        Returns:
+            Drift corrected, in bytes (positive = usage was under-reported)
+        """
+        with self._reconcile_lock:
+            log: Dict[str, int] = {}
+            with self._lock:
+                self._scan_logs.append(log)
+            started = time.monotonic()
+            try:
+                sizes = scan_entries(self.root, self.scan_workers)
+            finally:
+                with self._lock:
+                    self._remove_log(log)
+            elapsed = time.monotonic() - started
+
+            with self._lock:
+                for key in log:
+                    sizes[key] = self._sizes.get(key, 0)
+                total = sum(sizes.values())
+                drift = total - self._total
+                self._sizes = sizes
+                self._total = total
+                first_scan = self.stats["scans"] == 0
+                self.stats["scans"] += 1
+                self.stats["last_scan_seconds"] = round(elapsed, 3)
+                self.stats["last_drift_bytes"] = drift
+                self.stats["last_scan_at"] = time.time()
+
+        if first_scan:
+            logger.info(f"Storage ledger for {self.root}: {total / (1024 ** 3):.2f} GB "
+                        f"in {len(sizes)} entries (scanned in {elapsed:.1f}s)")
+        elif drift:
+            logger.debug(f"Storage ledger for {self.root} corrected by {drift} bytes (scan {elapsed:.1f}s)")
+        return drift
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ledger statistics."""
+        with self._lock:
+            return {**self.stats, "root": self.root, "usage_bytes": self._total, "entries": len(self._sizes)}
+
+
+class _Tracker:
+    """Size snapshot of the files one operation touches (see StorageLedger.track)."""
+
+    def __init__(self, ledger: StorageLedger, paths):
+        self.ledger = ledger
+        self.paths = [path for path in paths if ledger.covers(path)]
+        self.reported = 0
+
+    def _sizes(self) -> int:
+        total = 0
+        for path in self.paths:
+            try:
+                total += os.stat(path).st_size
+            except OSError:
+                continue
+        return total
+
+    def add(self, delta_bytes: int) -> None:
+        """Report bytes as they are written (negative for truncation)."""
+        if self.paths:
+            self.ledger.record(self.paths[0], delta_bytes)
+            self.reported += delta_bytes
+
+    def __enter__(self) -> "_Tracker":
+        self.before = self._sizes() if self.paths else 0
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.paths:
+            self.ledger.record(self.paths[0], self._sizes() - self.before - self.reported)
+        return False
+
+
+_ledgers: Dict[str, StorageLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_storage_ledger(root: PathLike, config: Optional[Dict[str, Any]] = None) -> StorageLedger:
+    """
+    The process-wide ledger of a download tree, scanned on first use.
+
+    Args:
+        root: Download tree
+        config: Full configuration dictionary (used only when the ledger is created)
+
+    Returns:
+        Started StorageLedger shared by every caller of the same root
+    """
+    key = os.path.normcase(os.path.abspath(os.fspath(root)))
+    with _ledgers_lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = StorageLedger.from_config(root, config).start()
+            _ledgers[key] = ledger
+        return ledger
+
+
+def refresh_storage(path: PathLike) -> None:
+    """Re-measure ``path`` in every ledger whose tree contains it (after out-of-band deletes)."""
+    with _ledgers_lock:
+        ledgers = list(_ledgers.values())
+    for ledger in ledgers:
+        if ledger.covers(path):
+            ledger.refresh(path)
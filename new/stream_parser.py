@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Stream Parser Module
+
+Incremental feed parser for video detail pages. The HTTP fetcher feeds
+the response body to it chunk by chunk while it downloads; the parser
+(an lxml HTMLPullParser) builds the page tree as the bytes arrive and
+tracks which page sections have fully arrived. The sections holding the
+video fields are the JSON-LD block in the head and the ``#tab_video_info``
+block (info row, tags, categories, uploader, download links), so once
+those are closed the rest of the body can be skipped and the tree built
+so far is handed straight to the DOM extractor.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+from typing import Any, Iterable, List, Optional, Set
+import logging
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Sections the parser can detect
+SECTION_HEAD = "head"
+SECTION_JSON_LD = "json_ld"
+SECTION_VIDEO_INFO = "video_info"
+KNOWN_SECTIONS = (SECTION_HEAD, SECTION_JSON_LD, SECTION_VIDEO_INFO)
+
+VIDEO_INFO_ID = "tab_video_info"
+
+
+class VideoPageStreamParser:
+    """Builds a tree from body chunks and reports when the wanted sections are complete."""
+
+    def __init__(self, required_sections: Iterable[str] = (SECTION_JSON_LD, SECTION_VIDEO_INFO),
+                 encoding: Optional[str] = None):
+        """
+        Initialize stream parser.
+
+        Args:
+            required_sections: Sections that must be closed before the
+                rest of the page may be skipped (see KNOWN_SECTIONS)
+            encoding: Body encoding from the response headers (None lets
+                lxml detect it from the document)
+        """
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml is required for VideoPageStreamParser")
+
+        unknown = set(required_sections) - set(KNOWN_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown stream sections: {sorted(unknown)}")
+
+        self.required_sections = list(required_sections)
+        self._parser = etree.HTMLPullParser(events=("end",), encoding=encoding)
+        self.closed: Set[str] = set()
+        self.bytes_fed = 0
+        self.complete = False
+        self.failed = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Feed the next body chunk.
+
+        Args:
+            chunk: Raw bytes as received
+
+        Returns:
+            True once every required section has been closed
+        """
+        self.bytes_fed += len(chunk)
+        if self.complete or self.failed:
+            return self.complete
+
+        try:
+            self._parser.feed(chunk)
+            for _, element in self._parser.read_events():
+                self._track(element)
+        except (etree.ParserError, LookupError) as e:
+            # Never stop early on a page the parser cannot follow
+            logger.debug(f"Stream parser gave up after {self.bytes_fed} bytes: {e}")
+            self.failed = True
+            return False
+
+        self.complete = all(section in self.closed for section in self.required_sections)
+        return self.complete
+
+    def _track(self, element) -> None:
+        """Record the section an element closes, if any."""
+        tag = element.tag.lower() if isinstance(element.tag, str) else ""
+        if tag == "head":
+            self.closed.add(SECTION_HEAD)
+        elif tag == "script" and (element.get("type") or "").lower() == "application/ld+json":
+            self.closed.add(SECTION_JSON_LD)
+        elif SECTION_VIDEO_INFO not in self.closed and element.get("id") == VIDEO_INFO_ID:
+            self.closed.add(SECTION_VIDEO_INFO)
+
+    @property
+    def sections_closed(self) -> List[str]:
+        """Sections fully received so far."""
+        return sorted(self.closed)
+
+    def close(self) -> Optional[Any]:
+        """
+        Finish the parse of everything fed so far.
+
+        Returns:
+            Root element of the (possibly truncated) page, or None if the
+            parser failed or saw no markup
+        """
+        try:
+            root = self._parser.close()
+        except Exception:
+            return None
+        return None if self.failed else root
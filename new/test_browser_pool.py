@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Browser Pool
+
+Runs the pool against a fake Playwright driver to check that a failed
+start releases what it created and can be retried, and that close()
+leaves nothing bound to the finished event loop.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, driver):
+        self.driver = driver
+        self.closed = False
+
+    async def new_page(self):
+        self.driver.pages_opened += 1
+        if self.driver.fail_on_page == self.driver.pages_opened:
+            raise RuntimeError("page crashed")
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.closed = False
+
+    async def new_context(self, **options):
+        context = FakeContext(self.driver)
+        self.driver.contexts.append(context)
+        return context
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeDriver:
+    """Stands in for async_playwright(); records everything it hands out."""
+
+    def __init__(self, fail_on_page=None):
+        self.fail_on_page = fail_on_page
+        self.pages_opened = 0
+        self.browsers = []
+        self.contexts = []
+        self.stopped = 0
+        self.chromium = self
+
+    def __call__(self):
+        return self
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped += 1
+
+    async def launch(self, **options):
+        browser = FakeBrowser(self)
+        self.browsers.append(browser)
+        return browser
+
+
+class TestBrowserPoolLifecycle:
+    """Start failures, restarts and close."""
+
+    @pytest.fixture
+    def driver(self, monkeypatch):
+        driver = FakeDriver()
+        monkeypatch.setattr(browser_pool, "async_playwright", driver)
+        return driver
+
+    @staticmethod
+    def pool():
+        return BrowserPool(contexts=2, pages_per_context=2)
+
+    def test_failed_start_tears_down_and_restarts(self, driver):
+        """A start that fails half-way closes what it opened; the next start succeeds."""
+        driver.fail_on_page = 3
+        pool = self.pool()
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(pool.start())
+
+        assert not pool.is_started
+        assert driver.browsers[0].closed
+        assert all(context.closed for context in driver.contexts)
+        assert driver.stopped == 1
+        assert pool.get_stats()["idle_pages"] == 0
+
+        driver.fail_on_page = None
+        asyncio.run(pool.start())
+
+        assert pool.is_started
+        assert len(driver.browsers) == 2
+        assert pool.get_stats()["idle_pages"] == pool.size
+        asyncio.run(pool.close())
+
+    def test_close_resets_locks_between_loops(self, driver):
+        """Each asyncio.run can start, lease from and close the same pool."""
+        pool = self.pool()
+
+        async def batch():
+            async with pool.page() as page:
+                assert isinstance(page, FakePage)
+            await pool.close()
+
+        for _ in range(2):
+            asyncio.run(batch())
+            assert pool._start_lock is None
+            assert pool._restart_lock is None
+            assert not pool.is_started
+
+        assert pool.get_stats()["leases"] == 2
+        assert driver.stopped == 2
+        assert all(browser.closed for browser in driver.browsers)
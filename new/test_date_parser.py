@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Date Parser
+
+Checks that the precompiled, cached DateParser returns what the original
+per-call implementation returned. The original implementation is kept
+below as a reference.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+dateutil = pytest.importorskip("dateutil")
+import dateutil.parser  # noqa: E402
+from dateutil.relativedelta import relativedelta  # noqa: E402
+
+# date_parser lives in the project root, next to the legacy scraper
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from date_parser import DateParser  # noqa: E402
+
+DATE_TEXTS = [
+    "5 days ago", "1 day ago", "3d ago", "2 weeks ago", "1 w ago", "4 months ago", "1 mon ago",
+    "2 years ago", "1y ago", "6 hours ago", "3h ago", "45 minutes ago", "10 min ago", "7m ago",
+    "Yesterday", "today", "  5   DAYS   ago ", "2023-01-15", "01/15/2023", "15/01/2023",
+    "January 15, 2023", "Jan 15, 2023", "15 January 2023", "15 Jan 2023", "2022-12-31",
+    "Uploaded on March 3, 2021", "2021.06.07", "sometime", "", "   ", None,
+]
+
+
+def reference_parse_upload_date(text, current_time):
+    """DateParser.parse_upload_date_to_epoch before precompiling and caching."""
+    if not text or not text.strip():
+        return None
+    text = text.strip().lower()
+    units = [
+        (r'(\d+)\s*(?:days?|d)\s*ago', 'days'),
+        (r'(\d+)\s*(?:weeks?|w)\s*ago', 'weeks'),
+        (r'(\d+)\s*(?:months?|mon)\s*ago', 'months'),
+        (r'(\d+)\s*(?:years?|y)\s*ago', 'years'),
+        (r'(\d+)\s*(?:hours?|h)\s*ago', 'hours'),
+        (r'(\d+)\s*(?:minutes?|min|m)\s*ago', 'minutes'),
+        (r'yesterday', 'yesterday'),
+        (r'today', 'today'),
+    ]
+    for pattern, unit in units:
+        if unit == 'yesterday':
+            if 'yesterday' in text:
+                return int((current_time - timedelta(days=1)).timestamp() * 1000)
+        elif unit == 'today':
+            if 'today' in text:
+                return int(current_time.timestamp() * 1000)
+        else:
+            match = re.search(pattern, text)
+            if match:
+                amount = int(match.group(1))
+                if unit in ('months', 'years'):
+                    date = current_time - relativedelta(**{unit: amount})
+                else:
+                    date = current_time - timedelta(**{unit: amount})
+                return int(date.timestamp() * 1000)
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y"):
+        try:
+            return int(datetime.strptime(text, fmt).timestamp() * 1000)
+        except ValueError:
+            continue
+    try:
+        return int(dateutil.parser.parse(text, fuzzy=True).timestamp() * 1000)
+    except Exception:
+        return None
+
+
+class TestDateParser:
+    """DateParser against the original implementation."""
+
+    @pytest.fixture
+    def parser(self):
+        return DateParser()
+
+    @staticmethod
+    def assert_close(actual, expected, text):
+        # Relative dates are taken from the clock; allow the time between the two calls
+        if expected is None or actual is None:
+            assert actual == expected, text
+        else:
+            assert abs(actual - expected) < 2000, text
+
+    def test_single_values_match_reference(self, parser):
+        """parse_upload_date_to_epoch agrees with the original parser on every input."""
+        for text in DATE_TEXTS:
+            expected = reference_parse_upload_date(text, datetime.now())
+            self.assert_close(parser.parse_upload_date_to_epoch(text), expected, text)
+
+    def test_cached_values_are_stable(self, parser):
+        """A second (cached) lookup returns the same value."""
+        first = [parser.parse_upload_date_to_epoch(text) for text in DATE_TEXTS]
+        second = [parser.parse_upload_date_to_epoch(text) for text in DATE_TEXTS]
+
+        assert first == second
+        assert parser.cache_info().hits > 0
+
+    def test_parse_many_matches_single_calls(self, parser):
+        """parse_many gives the single-call results in input order."""
+        batch = DATE_TEXTS * 3
+        expected = [reference_parse_upload_date(text, datetime.now()) for text in batch]
+        for text, actual, wanted in zip(batch, parser.parse_many(batch), expected):
+            self.assert_close(actual, wanted, text)
+
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the DOM Extraction Engine
+
+Checks that the lxml engine returns the same video data as the regex
+engine on the captured fragments and on synthetic full pages, and that
+both return the original extractor's output (html/baseline_video_data.json).
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import json
+import logging
+
+import pytest
+
+from parser_benchmark import BASE_URL, FIXTURE_DIR, SYNTHETIC_PAGES, VIDEO_URL, build_synthetic_page, load_fixtures
+from video_data_parser import OptimizedVideoDataParser
+
+LABEL_PAGE = """<html><head><title>Label &amp; Page</title>
+<meta name="keywords" content="alpha, beta">
+</head><body>
+<h1>Heading</h1>
+<div class="info">Category: Animation</div>
+<div class="info">Genre:
+  Fantasy</div>
+<p>Uploaded by: Some&nbsp;Uploader</p>
+<p>Artist: First Artist</p>
+<span class="artist">Second Artist</span>
+<p>Performer: Third &amp; Fourth</p>
+<span class="tag">short</span><span class="keyword">loop</span>
+<div class="stats"><span>1,204 likes</span></div>
+<a class="dl" href="https://example.com/v_720p.mp4?a=1&amp;b=2">MP4 720p</a>
+<a download="x" href="https://example.com/v_1080p.mp4">1080p</a>
+</body></html>"""
+
+
+class TestDomExtractor:
+    """Field equivalence of the dom and regex engines."""
+
+    @pytest.fixture
+    def parser(self):
+        parser = OptimizedVideoDataParser(BASE_URL, use_http=False)
+        parser.logger.setLevel(logging.ERROR)
+        return parser
+
+    @pytest.fixture
+    def documents(self):
+        fixtures = load_fixtures()
+        documents = dict(fixtures)
+        documents.update((name, build_synthetic_page(fixtures, cards)) for name, cards in SYNTHETIC_PAGES.items())
+        documents["label_page"] = LABEL_PAGE
+        return documents
+
+    @staticmethod
+    def build(parser, engine, html_content):
+        parser.extraction_engine = engine
+        return parser.build_video_data(VIDEO_URL, html_content)
+
+    def test_fields_match_regex_engine(self, parser, documents):
+        """Every field, tags included, is identical on every captured fixture and synthetic page."""
+        for name, html_content in documents.items():
+            dom = self.build(parser, "dom", html_content)
+            regex = self.build(parser, "regex", html_content)
+            for field in parser.VIDEO_FIELDS:
+                assert dom[field] == regex[field], f"{name}: {field}"
+
+    @pytest.mark.parametrize("engine", ["dom", "regex"])
+    def test_fixtures_match_baseline_output(self, parser, engine):
+        """Both engines return the dict the original extractor produced for each captured fixture."""
+        expected = json.loads((FIXTURE_DIR / "baseline_video_data.json").read_text(encoding="utf-8"))
+        fixtures = load_fixtures()
+
+        assert sorted(expected) == sorted(fixtures)
+        for name, html_content in fixtures.items():
+            assert self.build(parser, engine, html_content) == expected[name], name
+
+    def test_tags_keep_hashtags_in_markup(self, parser):
+        """'#name' inside attributes and styles still counts as a hashtag, as in the regex engine."""
+        html_content = LABEL_PAGE.replace('<h1>Heading</h1>',
+                                          '<h1 style="color:#fff">Heading</h1><a href="#comments">#shown</a>')
+        dom = self.build(parser, "dom", html_content)["tags"]
+
+        assert dom == self.build(parser, "regex", html_content)["tags"]
+        assert dom[2:5] == ["fff", "comments", "shown"]
+
+    def test_label_page_values(self, parser):
+        """Labels, likes and download links come from visible text and element attributes."""
+        video_data = self.build(parser, "dom", LABEL_PAGE)
+
+        assert video_data["title"] == "Label & Page"
+        assert video_data["categories"] == ["Animation", "Fantasy"]
+        assert video_data["uploaded_by"] == "Some\xa0Uploader"
+        assert video_data["artists"] == ["First Artist", "Second Artist", "Third & Fourth"]
+        assert video_data["tags"] == ["alpha", "beta", "short", "loop"]
+        assert video_data["likes"] == 1204
+        assert video_data["video_url"] == "https://example.com/v_1080p.mp4"
+
+    def test_urls_keep_source_spelling(self, parser):
+        """Download URLs keep '&amp;' exactly like the regex engine."""
+        html_content = LABEL_PAGE.replace('<a download="x" href="https://example.com/v_1080p.mp4">1080p</a>', "")
+        dom = self.build(parser, "dom", html_content)
+        regex = self.build(parser, "regex", html_content)
+
+        assert dom["video_url"] == regex["video_url"] == "https://example.com/v_720p.mp4?a=1&amp;b=2"
+
+    def test_unparseable_page_falls_back_to_regex(self, parser):
+        """A page lxml cannot parse is handled by the regex engine."""
+        parser.extraction_engine = "dom"
+        result = parser.build_video_result(VIDEO_URL, "")
+
+        assert result.field_sources["title"] == "regex"
+        assert "field_sources" not in result.data
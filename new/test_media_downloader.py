@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for MediaDownloader Resume
+
+Serves a file from a local aiohttp server and checks how both download
+engines continue, or restart, a .part file left by an earlier attempt.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+pytest.importorskip("aiohttp")
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from media_downloader import RESUME_META_SUFFIX, MediaDownloader  # noqa: E402
+
+DATA = bytes(range(256)) * 4096  # 1 MiB
+ETAG = '"v1"'
+PART_BYTES = 300000
+
+
+class TestMediaDownloaderResume:
+    """Resume decisions on 206, 200 and 416 responses."""
+
+    @pytest.fixture(autouse=True)
+    def quiet(self):
+        logging.getLogger("media_downloader").setLevel(logging.CRITICAL)
+
+    @staticmethod
+    def make_part(dest_path, url):
+        """Leave the first PART_BYTES of DATA and the validator sidecar behind."""
+        tmp_path = dest_path.with_suffix(dest_path.suffix + ".part")
+        tmp_path.write_bytes(DATA[:PART_BYTES])
+        with tmp_path.with_suffix(RESUME_META_SUFFIX).open("w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": ETAG, "last_modified": None}, f)
+        return tmp_path
+
+    @classmethod
+    def download(cls, tmp_path, engine, mode):
+        """Run one download against a server in the given mode; returns (result, stats, requests seen)."""
+        seen = []
+
+        async def handler(request):
+            range_header = request.headers.get("Range")
+            seen.append(range_header)
+            headers = {"ETag": ETAG}
+            if range_header and mode == "416":
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{len(DATA)}"})
+            if range_header and mode == "range" and request.headers.get("If-Range") == ETAG:
+                start = int(range_header.split("=")[1].rstrip("-"))
+                headers["Content-Range"] = f"bytes {start}-{len(DATA) - 1}/{len(DATA)}"
+                return web.Response(status=206, body=DATA[start:], headers=headers)
+            return web.Response(body=DATA, headers=headers)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/video.mp4", handler)
+            server = TestServer(app)
+            await server.start_server()
+            url = str(server.make_url("/video.mp4"))
+            dest_path = tmp_path / "1.mp4"
+            cls.make_part(dest_path, url)
+            downloader = MediaDownloader(engine=engine)
+            try:
+                if engine == "async":
+                    async with aiohttp.ClientSession() as client:
+                        result = await downloader.download_file_async(client, url, dest_path, "1", "mp4")
+                else:
+                    result = await asyncio.to_thread(downloader.download_file, url, dest_path, "1", "mp4")
+            finally:
+                downloader.close()
+                await server.close()
+            return result, downloader.get_transfer_stats()
+
+        result, stats = asyncio.run(run())
+        return result, stats, seen
+
+    @pytest.mark.parametrize("engine", ["async", "threads"])
+    def test_matching_content_range_resumes(self, tmp_path, engine):
+        """A 206 starting at the .part size appends to it."""
+        result, stats, seen = self.download(tmp_path, engine, "range")
+
+        assert result["success"]
+        assert result["resumed_bytes"] == PART_BYTES
+        assert (tmp_path / "1.mp4").read_bytes() == DATA
+        assert stats["resumed"] == 1
+        assert stats["restarted"] == 0
+        assert stats["bytes_downloaded"] == len(DATA) - PART_BYTES
+        assert seen == [f"bytes={PART_BYTES}-"]
+        assert not (tmp_path / "1.mp4.part").exists()
+        assert not (tmp_path / ("1.mp4" + RESUME_META_SUFFIX)).exists()
+
+    @pytest.mark.parametrize("engine", ["async", "threads"])
+    def test_full_response_to_range_restarts(self, tmp_path, engine):
+        """A 200 to a range request overwrites the .part with the whole body."""
+        result, stats, seen = self.download(tmp_path, engine, "full")
+
+        assert result["success"]
+        assert result["resumed_bytes"] == 0
+        assert (tmp_path / "1.mp4").read_bytes() == DATA
+        assert stats["restarted"] == 1
+        assert stats["resumed"] == 0
+        assert len(seen) == 1
+
+    @pytest.mark.parametrize("engine", ["async", "threads"])
+    def test_unsatisfiable_range_restarts(self, tmp_path, engine):
+        """A 416 drops the .part and downloads the file again without a range."""
+        result, stats, seen = self.download(tmp_path, engine, "416")
+
+        assert result["success"]
+        assert result["resumed_bytes"] == 0
+        assert (tmp_path / "1.mp4").read_bytes() == DATA
+        assert stats["restarted"] == 1
+        assert seen == [f"bytes={PART_BYTES}-", None]
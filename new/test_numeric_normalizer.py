@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Numeric Normaliser
+
+Checks that the shared parse_count, and the batch normalize_counts built
+on it, return what the original parse_views_number returned. The
+original implementation is kept below as a reference.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import re
+
+import pytest
+
+from numeric_normalizer import NUMPY_AVAILABLE, normalize_counts, parse_count
+
+COUNT_TEXTS = [
+    "9.4K (9,425)", "2.4K (24875)", "3M", "1.5m", "2B", "1,204", "1,204 views", "12 likes",
+    "0", "", None, "no views", "K", "1.2.3K", "(1,000,000)", "7.25K", "100", " 42 ", "1.0B (1,000,000,000)",
+]
+
+
+def reference_parse_views_number(views_text):
+    """VideoInfoExtractor.parse_views_number before it delegated to parse_count."""
+    if not views_text:
+        return 0
+    paren_match = re.search(r'\((\d+(?:,\d{3})*)\)', views_text)
+    if paren_match:
+        return int(paren_match.group(1).replace(',', ''))
+    short_match = re.search(r'([\d,.]+)\s*([KkMmBb]?)', views_text)
+    if short_match:
+        try:
+            value = float(short_match.group(1).replace(',', ''))
+        except ValueError:
+            digits = re.sub(r'\D', '', views_text)
+            return int(digits) if digits else 0
+        multiplier = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}.get(short_match.group(2).upper(), 1)
+        return int(value * multiplier)
+    digits = re.sub(r'\D', '', views_text)
+    return int(digits) if digits else 0
+
+class TestParseCount:
+    """parse_count against the original parse_views_number."""
+
+    def test_matches_reference(self):
+        """Every counter string parses to the same number."""
+        for text in COUNT_TEXTS:
+            assert parse_count(text) == reference_parse_views_number(text), text
+
+    def test_numbers_pass_through(self):
+        """Already numeric values are returned as ints."""
+        assert parse_count(9425) == 9425
+        assert parse_count(12.0) == 12
+        assert parse_count(float("nan")) == 0
+
+    @pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+    def test_batch_matches_single_values(self):
+        """normalize_counts equals parse_count value by value."""
+        values = COUNT_TEXTS * 5
+        assert normalize_counts(values).tolist() == [parse_count(value) for value in values]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the HTTP Page Fetcher
+
+Streams a synthetic detail page from a local aiohttp server and checks
+that the streamed tree feeds the DOM extractor and that an early stop
+keeps the keep-alive connection in the pool.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import logging
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from page_fetcher import HttpPageFetcher  # noqa: E402
+from parser_benchmark import BASE_URL, VIDEO_URL, build_synthetic_page, load_fixtures  # noqa: E402
+from video_data_parser import OptimizedVideoDataParser  # noqa: E402
+
+
+class TestHttpPageFetcher:
+    """Streamed fetches against a local server."""
+
+    @pytest.fixture
+    def page(self):
+        return build_synthetic_page(load_fixtures(), 400)
+
+    @staticmethod
+    def serve(page, fetches, **fetcher_args):
+        """Fetch the page once per entry of fetches; returns (results, fetcher, peer ports)."""
+        peers = []
+
+        async def handler(request):
+            peers.append(request.transport.get_extra_info("peername")[1])
+            return web.Response(text=page, content_type="text/html")
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/video", handler)
+            server = TestServer(app)
+            await server.start_server()
+            fetcher = HttpPageFetcher(**fetcher_args)
+            try:
+                results = []
+                for stream in fetches:
+                    results.append(await fetcher.fetch(str(server.make_url("/video")), stream=stream))
+                    # Let the background drain finish before the next request
+                    await asyncio.sleep(0.05)
+            finally:
+                await fetcher.close()
+                await server.close()
+            return results, fetcher
+
+        results, fetcher = asyncio.run(run())
+        return results, fetcher, peers
+
+    def test_streamed_tree_matches_full_parse(self, page):
+        """The stream parser's tree gives the same video data as parsing the full page."""
+        (result,), fetcher, _ = self.serve(page, [True], stream_sections=["json_ld", "video_info"])
+        parser = OptimizedVideoDataParser(BASE_URL, use_http=False)
+        parser.logger.setLevel(logging.ERROR)
+
+        assert result.truncated
+        assert result.tree is not None
+        assert len(result.body) < len(page.encode("utf-8"))
+        streamed = parser.build_video_result(VIDEO_URL, result.html, result.tree)
+        assert streamed.data == parser.build_video_data(VIDEO_URL, page)
+        assert streamed.field_sources["title"] == "json_ld"
+
+    def test_early_stop_keeps_connection(self, page):
+        """The rest of the body is drained and the next request reuses the connection."""
+        results, fetcher, peers = self.serve(page, [True, False], stream_sections=["json_ld", "video_info"])
+
+        assert results[0].truncated
+        assert not results[1].truncated
+        assert fetcher.stats["early_stops"] == 1
+        assert fetcher.stats["bytes_drained"] > 0
+        assert fetcher.stats["connections_closed"] == 0
+        assert peers[0] == peers[1]
+
+    def test_large_remainder_closes_connection(self, page):
+        """A remainder over stream_drain_max_bytes is dropped with its connection."""
+        results, fetcher, peers = self.serve(page, [True, False], stream_sections=["json_ld", "video_info"],
+                                             stream_drain_max_bytes=0)
+
+        assert results[0].truncated
+        assert fetcher.stats["connections_closed"] == 1
+        assert fetcher.stats["bytes_skipped"] > 0
+        assert peers[0] != peers[1]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Page Parser
+
+Replaces the video data parser's network calls with coroutines to check
+the bounded fan-out over detail pages, listing-only mode and the
+concurrent listing prefetch.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import logging
+
+import pytest
+
+from page_parser import PageParser
+from video_data_parser import VideoParseResult
+
+BASE_URL = "https://rule34video.com"
+
+
+def listing_item(video_id, **values):
+    item = {"video_id": video_id, "title": f"Title {video_id}", "duration": "1:00", "upload_date": "",
+            "thumbnail_url": f"{BASE_URL}/t/{video_id}.jpg", "video_url": "", "tags": [],
+            "source_url": f"{BASE_URL}/video/{video_id}/x/"}
+    item.update(values)
+    return item
+
+
+class _Concurrency:
+    """Counts coroutines inside a block and remembers the peak."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def run(self, delay, value):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(delay)
+            return value
+        finally:
+            self.active -= 1
+
+
+class TestPageParser:
+    """Fan-out, listing-only mode and listing prefetch."""
+
+    @pytest.fixture
+    def page_parser(self, tmp_path):
+        logging.getLogger("page_parser").setLevel(logging.CRITICAL)
+        config = {"processing": {"max_concurrent_videos": 3, "max_concurrent_listings": 2,
+                                 "listing_detail_fields": ["video_url", "tags"]}}
+        return PageParser(BASE_URL, downloads_dir=str(tmp_path), config=config)
+
+    def test_run_entries_bounded_and_ordered(self, page_parser):
+        """At most max_concurrent_videos run at once and outcomes keep entry order."""
+        concurrency = _Concurrency()
+        # Later entries finish first
+        entries = [(lambda i=i: concurrency.run(0.05 - i * 0.004, (i, None))) for i in range(10)]
+
+        outcomes = asyncio.run(page_parser._run_entries(entries, concurrent=True))
+
+        assert outcomes == [(i, None) for i in range(10)]
+        assert concurrency.peak == 3
+
+    def test_run_entries_sequential(self, page_parser):
+        """concurrent=False runs one entry at a time."""
+        concurrency = _Concurrency()
+        entries = [(lambda i=i: concurrency.run(0.001, (i, None))) for i in range(4)]
+
+        assert asyncio.run(page_parser._run_entries(entries, concurrent=False)) == [(i, None) for i in range(4)]
+        assert concurrency.peak == 1
+
+    def test_listing_only_fetches_details_for_missing_fields(self, page_parser):
+        """Only entries missing a listing_detail_fields value fetch their detail page; listing values win."""
+        items = [listing_item("1", video_url=f"{BASE_URL}/1.mp4", tags=["a"]),
+                 listing_item("2"),
+                 listing_item("3", video_url=f"{BASE_URL}/3.mp4")]
+        fetched = []
+
+        async def extract_listing_items(page_url):
+            return items
+
+        async def parse_video_result(video_url):
+            fetched.append(video_url)
+            return VideoParseResult({"video_id": "x", "title": "Detail title", "video_url": f"{video_url}v.mp4",
+                                     "tags": ["detail"]}, {}, [{"url": f"{video_url}v.mp4"}])
+
+        page_parser.parser.extract_listing_items = extract_listing_items
+        page_parser.parser.parse_video_result = parse_video_result
+
+        result = asyncio.run(page_parser.parse_page(5, save_metadata=False, listing_only=True))
+
+        assert result.success
+        assert fetched == [items[1]["source_url"], items[2]["source_url"]]
+        videos = {video.video_id: video for video in result.videos}
+        assert videos["1"].download_candidates == []
+        assert videos["2"].title == "Title 2"
+        assert videos["2"].tags == ["detail"]
+        assert videos["3"].video_url == f"{BASE_URL}/3.mp4"
+        assert videos["3"].download_candidates == [{"url": f"{items[2]['source_url']}v.mp4"}]
+        assert page_parser.listing_stats["videos_from_listing"] == 1
+        assert page_parser.listing_stats["detail_fetches"] == 2
+
+    def test_listing_only_filter_skips_before_fetching(self, page_parser):
+        """Filtered videos are skipped before any detail fetch and the page still succeeds."""
+        async def extract_listing_items(page_url):
+            return [listing_item("1"), listing_item("2")]
+
+        async def parse_video_result(video_url):
+            raise AssertionError("no detail fetch expected")
+
+        page_parser.parser.extract_listing_items = extract_listing_items
+        page_parser.parser.parse_video_result = parse_video_result
+
+        result = asyncio.run(page_parser.parse_page(5, save_metadata=False, listing_only=True,
+                                                    video_filter=PageParser.downloaded_video_filter(["1", "2"])))
+
+        assert result.success
+        assert result.skipped_video_ids == ["1", "2"]
+        assert result.videos == []
+
+    def test_prefetch_listings_bounded(self, page_parser):
+        """Listings are fetched at most max_concurrent_listings at a time; failures map to []."""
+        concurrency = _Concurrency()
+
+        async def extract_video_urls(page_url):
+            if page_url.endswith("/3"):
+                raise RuntimeError("listing down")
+            return await concurrency.run(0.01, [page_url])
+
+        page_parser.parser.extract_video_urls = extract_video_urls
+
+        listings = asyncio.run(page_parser.prefetch_listings([5, 4, 3, 2], listing_only=False))
+
+        assert list(listings) == [5, 4, 3, 2]
+        assert listings[5] == [f"{BASE_URL}/latest-updates/5"]
+        assert listings[3] == []
+        assert concurrency.peak == 2
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Parse Pool
+
+Covers the opt-in default and the non-blocking shutdown of the worker
+processes.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+
+from parse_pool import ParsePool
+from parser_benchmark import BASE_URL, VIDEO_URL, build_synthetic_page, load_fixtures
+
+
+class TestParsePool:
+    """Test suite for ParsePool."""
+
+    def test_disabled_by_default(self):
+        """Without parsing.process_pool the parser parses inline."""
+        assert ParsePool.from_config(BASE_URL, {}) is None
+        assert ParsePool.from_config(BASE_URL, {"parsing": {"workers": 2}}) is None
+
+    def test_enabled_from_config(self):
+        """process_pool: true builds a pool with the configured settings."""
+        pool = ParsePool.from_config(BASE_URL, {"parsing": {"process_pool": True, "workers": 2, "chunk_size": 3}})
+
+        assert pool is not None
+        assert pool.workers == 2
+        assert pool.chunk_size == 3
+
+    def test_parse_and_close(self):
+        """Pages parse in a worker; close() is awaited and stops the workers."""
+        page = build_synthetic_page(load_fixtures(), 5)
+
+        async def run():
+            pool = ParsePool(BASE_URL, workers=1, chunk_size=1, chunk_linger_ms=0)
+            result = await pool.parse(VIDEO_URL, page.encode("utf-8"), "utf-8")
+            await pool.close()
+            return pool, result
+
+        pool, result = asyncio.run(run())
+
+        assert result.data["video_id"] == "4022809"
+        assert result.data["title"]
+        assert result.field_sources["video_id"] == "url"
+        assert pool._executor is None
+        assert pool.get_stats()["pages"] == 1
+
+    def test_close_without_workers(self):
+        """Closing a pool that never started is a no-op."""
+        pool = ParsePool(BASE_URL, workers=1)
+        asyncio.run(pool.close())
+        assert pool._executor is None
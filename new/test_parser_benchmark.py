@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Parser Benchmark Comparison
+
+Checks that the baseline comparison tolerates round-to-round noise and
+still reports real slowdowns.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+from dataclasses import asdict
+
+from parser_benchmark import BenchmarkResult, compare_with_baseline
+
+
+def make_result(p50_us, spread_us=0.0, calibration_us=1000.0, alloc=1000):
+    return BenchmarkResult(name="case", iterations=50, ops_per_sec=1.0, p50_us=p50_us, p99_us=p50_us,
+                           alloc_peak_bytes=alloc, calibration_us=calibration_us, p50_spread_us=spread_us)
+
+
+class TestCompareWithBaseline:
+    """Test suite for compare_with_baseline."""
+
+    @staticmethod
+    def baseline(result):
+        return {"results": {result.name: asdict(result)}}
+
+    def test_noise_within_spread_passes(self):
+        """A +37% p50 inside the measured spread is not a regression."""
+        baseline = self.baseline(make_result(1000.0, spread_us=300.0))
+        assert compare_with_baseline([make_result(1370.0, spread_us=200.0)], baseline) == []
+
+    def test_slowdown_beyond_spread_fails(self):
+        """A slowdown larger than tolerance plus both spreads is reported."""
+        baseline = self.baseline(make_result(1000.0, spread_us=50.0))
+        regressions = compare_with_baseline([make_result(1500.0, spread_us=50.0)], baseline)
+
+        assert len(regressions) == 1
+        assert "+50%" in regressions[0]
+
+    def test_machine_speed_scales_baseline(self):
+        """A uniformly slower machine (calibration) is not a regression."""
+        baseline = self.baseline(make_result(1000.0))
+        assert compare_with_baseline([make_result(1900.0, calibration_us=2000.0)], baseline) == []
+
+    def test_baseline_without_spread(self):
+        """Baselines recorded before spreads were stored still compare."""
+        stored = asdict(make_result(1000.0))
+        del stored["p50_spread_us"]
+        assert compare_with_baseline([make_result(1200.0)], {"results": {"case": stored}}) == []
+        assert compare_with_baseline([make_result(1400.0)], {"results": {"case": stored}})
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Quality Resolver
+
+Covers the selection policies, the max_size_mb cap, HEAD probing against
+a local HTTP server and the fallback to the listed candidates when no
+probe is answered. Also checks that the video data parser returns the
+candidates beside the video dict.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from quality_resolver import (POLICY_BEST_UNDER_MB, POLICY_MAX_QUALITY, POLICY_SIZE_CAP, QualityCandidate,
+                              QualityResolver, parse_candidates, select_candidate)
+from video_data_parser import OptimizedVideoDataParser
+
+MB = 1024 * 1024
+# Path -> (status, size in bytes)
+FILES = {
+    "/v_2160p.mp4": (200, 900 * MB),
+    "/v_1080p.mp4": (200, 300 * MB),
+    "/v_720p.mp4": (200, 120 * MB),
+    "/v_480p.mp4": (404, 0),
+}
+
+CANDIDATE_PAGE = """<html><head><title>Candidates</title></head><body>
+<a class="dl" href="https://example.com/v_720p.mp4">MP4 720p</a>
+<a download="x" href="https://example.com/v_1080p.mp4">1080p</a>
+</body></html>"""
+
+
+def candidates(*specs):
+    """QualityCandidates from (resolution, size in MB or None) pairs."""
+    return [QualityCandidate(url=f"https://example.com/{resolution}.mp4", resolution=resolution,
+                             size_bytes=None if size_mb is None else size_mb * MB)
+            for resolution, size_mb in specs]
+
+
+class _HeadHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        status, size = FILES.get(self.path, (404, 0))
+        self.server.heads.append(self.path)
+        self.send_response(status)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+
+
+class TestSelectCandidate:
+    """Selection policies and the size cap."""
+
+    def test_max_quality_ignores_size(self):
+        """max_quality takes the highest resolution, first of equals."""
+        listed = candidates((720, 100), (2160, 900), (1080, 300), (2160, 800))
+        assert select_candidate(listed, POLICY_MAX_QUALITY, max_size_mb=200) is listed[1]
+
+    def test_size_cap_skips_known_oversize(self):
+        """size_cap drops renditions known to exceed the cap and keeps unknown sizes."""
+        listed = candidates((2160, 900), (1080, None), (720, 100))
+        assert select_candidate(listed, POLICY_SIZE_CAP, max_size_mb=500).resolution == 1080
+        assert select_candidate(listed[:1], POLICY_SIZE_CAP, max_size_mb=500) is None
+
+    def test_best_under_mb(self):
+        """best_under_mb needs a known size; nothing fitting gives the smallest."""
+        listed = candidates((2160, 900), (1080, 300), (720, None))
+        assert select_candidate(listed, POLICY_BEST_UNDER_MB, max_size_mb=500).resolution == 1080
+        assert select_candidate(listed, POLICY_BEST_UNDER_MB, max_size_mb=100).resolution == 1080
+
+    def test_dead_links_dropped(self):
+        """Candidates probed unreachable are never chosen."""
+        listed = candidates((2160, None), (720, None))
+        listed[0].reachable = False
+        assert select_candidate(listed, POLICY_MAX_QUALITY).resolution == 720
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            select_candidate([], "fastest")
+
+
+class TestQualityResolverProbe:
+    """Probing over HTTP and its fallback."""
+
+    @pytest.fixture(autouse=True)
+    def quiet(self):
+        logging.getLogger("quality_resolver").setLevel(logging.CRITICAL)
+
+    @pytest.fixture
+    def base_url(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _HeadHandler)
+        server.heads = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    @staticmethod
+    def links(base_url):
+        return [{"url": f"{base_url}{path}", "quality": path[3:-4]} for path in FILES]
+
+    def test_probe_fills_sizes_and_applies_cap(self, base_url):
+        """HEAD sizes decide the size policies; 404s count as dead links."""
+        resolver = QualityResolver(policy=POLICY_BEST_UNDER_MB, max_size_mb=500, probe=True)
+
+        chosen = resolver.resolve(self.links(base_url))
+
+        assert chosen.resolution == 1080
+        assert chosen.size_bytes == 300 * MB
+        assert resolver.stats["probes"] == len(FILES)
+        assert resolver.stats["dead_links"] == 1
+
+    def test_size_cap_probes_without_probe_flag(self, base_url):
+        """A size limit makes the resolver probe even when probing is off."""
+        resolver = QualityResolver(policy=POLICY_SIZE_CAP, max_size_mb=200, probe=False)
+        assert resolver.resolve(self.links(base_url)).resolution == 720
+        assert resolver.stats["probes"] == len(FILES)
+
+    def test_probe_failure_falls_back_to_listed(self):
+        """When no probe is answered the listed candidates are used, their listed sizes still capped."""
+        resolver = QualityResolver(policy=POLICY_BEST_UNDER_MB, max_size_mb=500, probe=True,
+                                   timeout_seconds=1)
+        dead_port = "http://127.0.0.1:9"
+        links = [{"url": f"{dead_port}/v_2160p.mp4", "quality": "2160p", "size_bytes": 900 * MB},
+                 {"url": f"{dead_port}/v_1080p.mp4", "quality": "1080p"},
+                 {"url": f"{dead_port}/v_720p.mp4", "quality": "720p"}]
+
+        chosen = resolver.resolve(links)
+
+        assert chosen.resolution == 1080
+        assert resolver.stats["dead_links"] == 3
+        assert resolver.stats["probe_fallbacks"] == 1
+
+    def test_partial_probe_failure_keeps_dead_links_out(self, base_url):
+        """If some probes are answered, the unanswered ones stay dropped."""
+        resolver = QualityResolver(probe=True, timeout_seconds=1)
+        links = [{"url": "http://127.0.0.1:9/v_2160p.mp4", "quality": "2160p"},
+                 {"url": f"{base_url}/v_720p.mp4", "quality": "720p"}]
+
+        assert resolver.resolve(links).resolution == 720
+        assert resolver.stats["probe_fallbacks"] == 0
+
+
+class TestParserCandidates:
+    """Candidates produced by the video data parser."""
+
+    def test_candidates_returned_beside_data(self):
+        """Download candidates travel in the result, not in the video dict."""
+        parser = OptimizedVideoDataParser("https://rule34video.com", use_http=False)
+        parser.logger.setLevel(logging.ERROR)
+
+        result = parser.build_video_result("https://rule34video.com/video/1/a/", CANDIDATE_PAGE)
+
+        assert list(result.data) == parser.VIDEO_FIELDS
+        assert [candidate["url"] for candidate in result.download_candidates] == [
+            "https://example.com/v_1080p.mp4", "https://example.com/v_720p.mp4"]
+        assert parse_candidates(result.download_candidates)[0].resolution == 1080
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Readiness Waits
+
+Uses a fake Playwright page to check that single waits are clamped to the
+page deadline, that an expired deadline skips the wait, and that a page
+whose readiness signal never shows up is still read after the timeout.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from page_fetcher import BrowserPageFetcher
+from readiness import DETAIL_READY_SELECTORS, PageDeadline, ReadinessWaiter
+
+
+class FakePage:
+    """Page whose selectors appear after ``ready_after_ms`` (never if None)."""
+
+    def __init__(self, ready_after_ms=None):
+        self.ready_after_ms = ready_after_ms
+        self.waits = []
+
+    async def wait_for_selector(self, selector, state="attached", timeout=0):
+        self.waits.append((selector, state, timeout))
+        if self.ready_after_ms is not None and self.ready_after_ms <= timeout:
+            await asyncio.sleep(self.ready_after_ms / 1000)
+            return object()
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+    async def goto(self, url, wait_until="load"):
+        return SimpleNamespace(status=200)
+
+    async def content(self):
+        return "<html><body>partial</body></html>"
+
+
+class TestReadinessWaiter:
+    """Deadlines, timeouts and metrics."""
+
+    @pytest.fixture
+    def waiter(self):
+        return ReadinessWaiter(page_deadline_ms=15000, default_timeout_ms=10000)
+
+    def test_ready_page_returns_early(self, waiter):
+        page = FakePage(ready_after_ms=5)
+        started = time.monotonic()
+
+        assert asyncio.run(waiter.wait_for_any(page, ["a", "b"], "ready"))
+        assert time.monotonic() - started < 1
+        assert page.waits == [("a, b", "attached", 10000)]
+        assert waiter.get_metrics()["ready"]["timeouts"] == 0
+
+    def test_wait_clamped_to_deadline(self, waiter):
+        """A single wait never outlives the page deadline, and a miss counts as a timeout."""
+        page = FakePage()
+        deadline = waiter.new_deadline(total_ms=60)
+
+        assert not asyncio.run(waiter.wait_for_any(page, ["a"], "clamped", deadline=deadline))
+        assert page.waits[0][2] <= 60
+        assert deadline.expired
+        metric = waiter.get_metrics()["clamped"]
+        assert metric["count"] == 1
+        assert metric["timeouts"] == 1
+
+    def test_expired_deadline_skips_wait(self, waiter):
+        page = FakePage(ready_after_ms=0)
+        deadline = PageDeadline(0)
+
+        assert not asyncio.run(waiter.wait_for_any(page, ["a"], "expired", deadline=deadline))
+        assert page.waits == []
+        assert waiter.get_metrics()["expired"]["timeouts"] == 1
+
+    def test_from_config(self):
+        waiter = ReadinessWaiter.from_config({"readiness": {"page_deadline_ms": 500, "default_timeout_ms": 100}})
+        assert waiter.new_deadline().total_ms == 500
+        assert waiter.default_timeout_ms == 100
+
+
+class TestBrowserFetcherReadiness:
+    """The browser fetcher reads the page whether or not it became ready."""
+
+    @staticmethod
+    def fetcher(page, waiter):
+        @asynccontextmanager
+        async def open_page():
+            yield page
+
+        return BrowserPageFetcher(open_page, waiter=waiter)
+
+    def test_timeout_falls_back_to_current_content(self):
+        """When no readiness selector appears the HTML is read at the deadline."""
+        page = FakePage()
+        waiter = ReadinessWaiter(page_deadline_ms=50, default_timeout_ms=10000)
+
+        result = asyncio.run(self.fetcher(page, waiter).fetch("https://rule34video.com/video/1/a/"))
+
+        assert result.html == "<html><body>partial</body></html>"
+        assert result.elapsed_seconds < 1
+        assert page.waits[0][0] == ", ".join(DETAIL_READY_SELECTORS)
+        assert waiter.get_metrics()["detail_ready"]["timeouts"] == 1
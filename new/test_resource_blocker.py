@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Resource Blocker
+
+Checks the blocked resource types, URL patterns and per-mode allowlists
+of ResourceBlockPolicy, and the route handler installed on pooled pages.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from resource_blocker import ResourceBlockPolicy
+
+PAGE = "https://rule34video.com/video/1/a/"
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakePage:
+    def __init__(self):
+        self.handler = None
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+class TestResourceBlockPolicy:
+    """Blocking decisions per mode."""
+
+    @pytest.fixture
+    def policy(self):
+        config = json.loads((Path(__file__).parent / "config.json").read_text(encoding="utf-8"))
+        return ResourceBlockPolicy.from_config(config)
+
+    @pytest.mark.parametrize("resource_type", ["image", "media", "font", "stylesheet"])
+    def test_heavy_types_blocked_on_detail(self, policy, resource_type):
+        assert policy.should_block(resource_type, "https://cdn.example.com/x", mode="detail")
+
+    @pytest.mark.parametrize("resource_type", ["document", "script", "xhr", "fetch"])
+    def test_page_resources_allowed(self, policy, resource_type):
+        assert not policy.should_block(resource_type, PAGE, mode="detail")
+
+    @pytest.mark.parametrize("url", [
+        "https://pagead2.googlesyndication.com/pagead/show_ads.js",
+        "https://www.googletagmanager.com/gtm.js?id=1",
+        "https://a.exoclick.com/tag.php",
+        "https://cdn.example.com/preview/123_360p.mp4",
+        "https://cdn.example.com/preview/123.webm?t=5",
+    ])
+    def test_url_patterns_blocked_for_any_type(self, policy, url):
+        assert policy.should_block("script", url, mode="detail")
+
+    def test_url_patterns_do_not_overmatch(self, policy):
+        assert not policy.should_block("script", "https://cdn.example.com/player.mp4.js", mode="detail")
+
+    def test_listing_mode_allows_stylesheets(self, policy):
+        """The listing allowlist keeps stylesheets (age-gate visibility) but not images."""
+        assert not policy.should_block("stylesheet", "https://cdn.example.com/site.css", mode="listing")
+        assert policy.should_block("stylesheet", "https://cdn.example.com/site.css", mode="detail")
+        assert policy.should_block("image", "https://cdn.example.com/t.jpg", mode="listing")
+
+    def test_allow_url_patterns(self):
+        policy = ResourceBlockPolicy(modes={"detail": {"allow_url_patterns": [r"/player/"]}})
+        assert not policy.should_block("image", "https://cdn.example.com/player/poster.jpg", mode="detail")
+        assert policy.should_block("image", "https://cdn.example.com/player/poster.jpg", mode="listing")
+        assert policy.should_block("image", "https://cdn.example.com/player/poster.jpg")
+
+    def test_disabled_allows_everything(self):
+        policy = ResourceBlockPolicy(enabled=False)
+        assert not policy.should_block("media", "https://cdn.example.com/v.mp4")
+
+    def test_route_handler_follows_page_mode(self, policy):
+        """The installed handler reads the pooled page's current mode per request."""
+        page = FakePage()
+        mode = {"value": "listing"}
+        asyncio.run(policy.install(page, lambda: mode["value"]))
+
+        first = FakeRoute("stylesheet", "https://cdn.example.com/site.css")
+        asyncio.run(page.handler(first))
+        mode["value"] = "detail"
+        second = FakeRoute("stylesheet", "https://cdn.example.com/site.css")
+        asyncio.run(page.handler(second))
+
+        assert first.outcome == "continued"
+        assert second.outcome == "aborted"
+        assert policy.get_stats()["blocked_by_type"] == {"stylesheet": 1}
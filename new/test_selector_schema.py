@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Selector Schema
+
+Checks that every "css" entry of selector_schema.json is real CSS (it is
+handed to Crawl4AI and Playwright as is) and that the detail columns
+select the same elements through CSS and XPath.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+from pathlib import Path
+
+import pytest
+
+from selector_schema import load_schema
+
+cssselect = pytest.importorskip("lxml.cssselect")
+from lxml import html  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / "html"
+
+
+class TestSelectorSchema:
+    """CSS validity of the shared selector schema."""
+
+    @pytest.fixture
+    def schema(self):
+        return load_schema()
+
+    def test_css_selectors_compile(self, schema):
+        """Every css value parses as a CSS selector."""
+        for group_name in ("listing", "detail", "video_page", "navigator"):
+            group = schema.group(group_name)
+            for selector in group.base:
+                if selector.css:
+                    cssselect.CSSSelector(selector.css)
+            for name, field in group.fields.items():
+                for label, css in field.css_selectors():
+                    try:
+                        cssselect.CSSSelector(css)
+                    except Exception as e:
+                        pytest.fail(f"{group_name}.{name} [{label}] is not CSS: {css} ({e})")
+
+    @pytest.mark.parametrize("field_name", ["categories", "artists"])
+    def test_detail_columns_match_xpath(self, schema, field_name):
+        """The CSS and XPath forms of a detail column pick the same links."""
+        tree = html.fromstring((FIXTURE_DIR / "entire_element.txt").read_text(encoding="utf-8"))
+        selector = schema.group("detail").field(field_name).selectors[0]
+
+        by_css = cssselect.CSSSelector(selector.css)(tree)
+        by_xpath = tree.xpath(selector.xpath)
+
+        assert by_css
+        assert by_css == by_xpath
+
+    def test_crawl4ai_schema_uses_css(self, schema):
+        """The Crawl4AI detail schema carries the CSS form of the columns."""
+        crawl4ai_schema = schema.group("detail").to_crawl4ai_schema("detail")
+        selectors = {field["name"]: field["selector"] for field in crawl4ai_schema["fields"]}
+
+        assert selectors["categories"].startswith("#tab_video_info > div:nth-of-type(2)")
+        assert "//" not in selectors["artists"]
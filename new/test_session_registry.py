@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Session Registry
+
+Checks that idle eviction never closes a session a transfer still holds,
+that released and unleased sessions are evicted after the timeout, and
+that connection reuse counts survive eviction.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from session_registry import SessionRegistry
+
+IDLE_TIMEOUT = 0.05
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+
+class TestSessionEviction:
+    """Idle eviction and leases."""
+
+    @pytest.fixture
+    def registry(self):
+        registry = SessionRegistry(idle_timeout_seconds=IDLE_TIMEOUT)
+        yield registry
+        registry.close()
+
+    @pytest.fixture
+    def base_url(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    @staticmethod
+    def idle():
+        time.sleep(IDLE_TIMEOUT * 3)
+
+    @staticmethod
+    def lookup(registry, url):
+        """Session a short transfer on url would get."""
+        with registry.lease(url) as session:
+            return session
+
+    def test_leased_session_survives_timeout(self, registry):
+        """Lookups by other transfers do not evict a session that is still leased."""
+        with registry.lease("https://cdn.example.com/a.mp4") as session:
+            self.idle()
+            self.lookup(registry, "https://other.example.com/")
+            assert self.lookup(registry, "https://cdn.example.com/b.jpg") is session
+            assert registry.get_stats()["active_leases"] == 1
+
+        assert registry.get_stats()["sessions_evicted"] == 0
+
+    def test_released_session_evicted_after_timeout(self, registry):
+        """The idle timeout runs from the last release, not the first lookup."""
+        with registry.lease("https://cdn.example.com/a.mp4") as session:
+            self.idle()
+        self.lookup(registry, "https://other.example.com/")
+        assert self.lookup(registry, "https://cdn.example.com/b.jpg") is session
+
+        self.idle()
+        self.lookup(registry, "https://other.example.com/")
+        assert self.lookup(registry, "https://cdn.example.com/b.jpg") is not session
+        stats = registry.get_stats()
+        assert stats["active_leases"] == 0
+        assert stats["sessions_evicted"] == 2
+
+    def test_nested_leases(self, registry):
+        """A session stays protected until its last lease is released."""
+        url = "https://cdn.example.com/a.mp4"
+        outer = registry.acquire(url)
+        with registry.lease(url):
+            pass
+        self.idle()
+        assert self.lookup(registry, "https://cdn.example.com/b.jpg") is outer
+
+        registry.release(url)
+        self.idle()
+        assert self.lookup(registry, "https://cdn.example.com/b.jpg") is not outer
+        assert registry.get_stats()["leases"] == 4
+
+    def test_counts_survive_eviction(self, registry, base_url):
+        """Requests and connections of evicted sessions stay in the stats."""
+        with registry.lease(base_url) as session:
+            for _ in range(3):
+                session.get(f"{base_url}/video.mp4", timeout=5).close()
+        self.idle()
+        self.lookup(registry, "https://other.example.com/")
+
+        stats = registry.get_stats()
+        assert stats["sessions_evicted"] == 1
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 2
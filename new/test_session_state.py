@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Session State Store
+
+Checks that saved age-gate state is reused while fresh and treated as
+expired once the file is older than max_age_hours or a consent cookie
+has expired.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from session_state import SessionStateStore
+
+HOUR = 3600
+
+
+def consent_state(expires=-1):
+    return {"cookies": [{"name": "kt_agecheck", "value": "1", "domain": ".rule34video.com", "path": "/",
+                         "expires": expires, "secure": True}],
+            "origins": []}
+
+
+class FakeContext:
+    async def storage_state(self):
+        return consent_state(expires=time.time() + HOUR)
+
+
+class TestSessionStateStore:
+    """Expiry and reuse of the saved session."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return SessionStateStore(path=str(tmp_path / "state" / "session_state.json"), max_age_hours=2)
+
+    @staticmethod
+    def age(store, hours):
+        """Backdate the state file by some hours."""
+        mtime = time.time() - hours * HOUR
+        os.utime(store.path, (mtime, mtime))
+
+    def test_fresh_state_reused(self, store):
+        store.save(consent_state())
+
+        assert store.load() == consent_state()
+        assert store.context_options() == {"storage_state": consent_state()}
+        assert store.get_http_cookies()["kt_agecheck"].value == "1"
+
+    def test_state_older_than_max_age_expires(self, store):
+        """A file older than max_age_hours is ignored, also by a second store reading it."""
+        store.save(consent_state())
+        self.age(store, 1.5)
+        assert store.load() is not None
+
+        self.age(store, 2.5)
+        assert store.load() is None
+        assert store.context_options() == {}
+        assert store.get_cookies() == []
+        assert store.get_stats()["expired"] >= 1
+
+        other = SessionStateStore(path=str(store.path), max_age_hours=2)
+        assert other.load() is None
+
+    def test_expired_cookie_expires_state(self, store):
+        store.save(consent_state(expires=time.time() - 60))
+        assert store.load() is None
+
+    def test_state_without_cookies_expires(self, store):
+        store.save({"cookies": [], "origins": []})
+        assert store.load() is None
+
+    def test_rewritten_file_reloaded(self, store):
+        """Another worker's save is picked up through the file's mtime."""
+        store.save(consent_state())
+        state = consent_state()
+        state["cookies"][0]["value"] = "2"
+        with open(store.path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        later = time.time() + 5
+        os.utime(store.path, (later, later))
+
+        assert store.load()["cookies"][0]["value"] == "2"
+
+    def test_save_from_context_and_invalidate(self, store):
+        state = asyncio.run(store.save_from_context(FakeContext()))
+
+        assert state is not None
+        assert json.loads(store.path.read_text(encoding="utf-8")) == state
+        store.invalidate()
+        assert not store.path.exists()
+        assert store.load() is None
+
+    def test_disabled_store(self, tmp_path):
+        store = SessionStateStore(path=str(tmp_path / "s.json"), enabled=False)
+        store.save(consent_state())
+        assert not (tmp_path / "s.json").exists()
+        assert store.load() is None
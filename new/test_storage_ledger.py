@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Storage Ledger
+
+Checks that the ledger follows bytes written behind its back (IDM) through
+per-folder refreshes, and that the orchestrator's storage check only
+rescans the whole tree when usage is close to the limit, and then at
+most once per spacing interval.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import json
+import logging
+
+import pytest
+
+from scrape_orchestrator import NEAR_LIMIT_RECONCILE_MIN_SECONDS, ScrapeOrchestrator
+from storage_ledger import StorageLedger
+
+MB = 1024 * 1024
+# 10 MB limit
+MAX_STORAGE_GB = 10 / 1024
+
+
+def write_file(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+
+
+class TestStorageLedger:
+    """Deltas, refreshes and full scans."""
+
+    @pytest.fixture
+    def ledger(self, tmp_path):
+        write_file(tmp_path / "page_1" / "10" / "10.mp4", 3000)
+        return StorageLedger(tmp_path, reconcile_interval_seconds=0).start()
+
+    def test_deltas_and_refresh(self, ledger, tmp_path):
+        """Reported writes count at once; unreported ones after refreshing their folder only."""
+        ledger.record(tmp_path / "page_1" / "11" / "11.mp4", 500)
+        assert ledger.usage_bytes() == 3500
+
+        write_file(tmp_path / "page_2" / "20" / "20.mp4", 7000)
+        assert ledger.usage_bytes() == 3500
+        assert ledger.refresh(tmp_path / "page_2" / "20") == 7000
+
+        # page_1 keeps its running figure (the 500 reported bytes are not on disk)
+        assert ledger.usage_bytes() == 10500
+        assert ledger.get_stats()["scans"] == 1
+
+        assert ledger.reconcile() == -500
+        assert ledger.usage_bytes() == 10000
+
+
+class TestOrchestratorStorageCheck:
+    """Storage checks of the scrape orchestrator against the ledger."""
+
+    @pytest.fixture
+    def orchestrator(self, tmp_path):
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({
+            "general": {"max_storage_gb": MAX_STORAGE_GB},
+            "storage": {"ledger_reconcile_seconds": 0}
+        }))
+        orchestrator = ScrapeOrchestrator(config_file=str(config_file),
+                                          progress_file=str(tmp_path / "progress.json"),
+                                          downloads_dir=str(tmp_path / "downloads"))
+        logging.getLogger("scrape_orchestrator").setLevel(logging.CRITICAL)
+        yield orchestrator
+        orchestrator.storage_ledger.stop()
+
+    @staticmethod
+    def idm_writes(orchestrator, page_number, size):
+        """Write a video into a page folder the way IDM does, without telling the ledger."""
+        video_folder = orchestrator.page_parser._get_video_folder(page_number, str(page_number))
+        write_file(video_folder / f"{page_number}.mp4", size)
+
+    def test_validation_refreshes_page(self, orchestrator):
+        """Validating a page picks up IDM's bytes without a full scan."""
+        self.idm_writes(orchestrator, 1, 2 * MB)
+        orchestrator._validate_page_downloads(1, [])
+
+        ledger = orchestrator.storage_ledger
+        assert ledger.usage_bytes() == 2 * MB
+        assert ledger.get_stats()["scans"] == 1
+        assert ledger.get_stats()["refreshes"] == 1
+
+    def test_check_far_from_limit_does_not_scan(self, orchestrator, monkeypatch):
+        """Repeated checks well below the limit neither rescan nor wake the reconciler."""
+        requested = []
+        monkeypatch.setattr(orchestrator.storage_ledger, "request_reconcile", lambda: requested.append(1))
+        self.idm_writes(orchestrator, 1, 2 * MB)
+        orchestrator._validate_page_downloads(1, [])
+
+        for _ in range(5):
+            assert not orchestrator._check_storage_limits()
+        assert orchestrator.storage_ledger.get_stats()["scans"] == 1
+        assert requested == []
+
+    def test_check_near_limit_reconciles(self, orchestrator):
+        """Close to the limit, a rescan finds bytes no refresh reported yet."""
+        self.idm_writes(orchestrator, 1, 9 * MB)
+        orchestrator._validate_page_downloads(1, [])
+        self.idm_writes(orchestrator, 2, 1 * MB)
+
+        assert orchestrator._check_storage_limits()
+        assert orchestrator.storage_ledger.usage_bytes() == 10 * MB
+        assert orchestrator.storage_ledger.get_stats()["scans"] == 2
+
+    def test_repeated_near_limit_checks_rescan_once(self, orchestrator):
+        """Checks near the limit rescan at most once per spacing interval, not every time."""
+        self.idm_writes(orchestrator, 1, 9 * MB)
+        orchestrator._validate_page_downloads(1, [])
+        ledger = orchestrator.storage_ledger
+
+        for _ in range(5):
+            assert not orchestrator._check_storage_limits()
+        assert ledger.get_stats()["scans"] == 2
+
+        # Unreported bytes wait for the next rescan slot
+        self.idm_writes(orchestrator, 2, 1 * MB)
+        assert not orchestrator._check_storage_limits()
+        assert ledger.get_stats()["scans"] == 2
+
+        orchestrator._last_near_limit_reconcile -= NEAR_LIMIT_RECONCILE_MIN_SECONDS
+        assert orchestrator._check_storage_limits()
+        assert ledger.get_stats()["scans"] == 3
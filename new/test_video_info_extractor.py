@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Crawl4AI Video Info Extractor
+
+Replaces Crawl4AI's crawler with a fake to check the warm crawler pool and
+its throwaway fallback, and the sliding-window scheduler of
+parallel_extract_multiple_videos.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("crawl4ai")
+pytest.importorskip("selenium")
+
+# video_info_extractor lives in the project root, next to the legacy scraper
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import video_info_extractor  # noqa: E402
+from date_parser import DateParser  # noqa: E402
+from video_info_extractor import VideoInfoExtractor  # noqa: E402
+
+
+class FakeCrawler:
+    """Stands in for AsyncWebCrawler and records its lifecycle."""
+
+    instances = []
+
+    def __init__(self, config=None):
+        self.started = False
+        self.closed = False
+        FakeCrawler.instances.append(self)
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class _Concurrency:
+    """Counts coroutines inside a block and remembers the peak."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def run(self, delay, value):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(delay)
+            return value
+        finally:
+            self.active -= 1
+
+
+def make_extractor(**processing):
+    extractor = VideoInfoExtractor({"processing": processing}, driver_manager=None, date_parser=DateParser())
+    extractor.logger = logging.getLogger("test_video_info_extractor")
+    extractor.logger.setLevel(logging.CRITICAL)
+    return extractor
+
+
+class TestCrawlerPool:
+    """Warm crawlers and the throwaway fallback."""
+
+    @pytest.fixture(autouse=True)
+    def fake_crawl4ai(self, monkeypatch):
+        FakeCrawler.instances = []
+        monkeypatch.setattr(video_info_extractor, "AsyncWebCrawler", FakeCrawler)
+        monkeypatch.setattr(video_info_extractor, "BrowserConfig", lambda **options: options)
+
+    def test_started_pool_reused(self):
+        """On the loop it was started on, the extractor hands out its warm crawlers in turn."""
+        extractor = make_extractor(crawler_pool_size=2)
+
+        async def run():
+            await extractor.start()
+            used = []
+            for _ in range(4):
+                async with extractor._crawler() as crawler:
+                    used.append(crawler)
+            await extractor.close()
+            return used
+
+        used = asyncio.run(run())
+
+        assert len(FakeCrawler.instances) == 2
+        assert used == FakeCrawler.instances * 2
+        assert all(crawler.closed for crawler in FakeCrawler.instances)
+
+    def test_closed_pool_falls_back_to_throwaway(self):
+        """After close() every call gets its own crawler, closed when the call ends."""
+        extractor = make_extractor()
+
+        async def run():
+            await extractor.start()
+            await extractor.close()
+            async with extractor._crawler() as crawler:
+                assert crawler.started and not crawler.closed
+            return crawler
+
+        crawler = asyncio.run(run())
+
+        assert len(FakeCrawler.instances) == 2
+        assert crawler is FakeCrawler.instances[1]
+        assert crawler.closed
+
+    def test_other_loop_falls_back_to_throwaway(self):
+        """A pool started on a finished loop is not used from a new one."""
+        extractor = make_extractor()
+        asyncio.run(extractor.start())
+
+        async def use():
+            async with extractor._crawler() as crawler:
+                return crawler
+
+        crawler = asyncio.run(use())
+
+        assert crawler is not FakeCrawler.instances[0]
+        assert crawler.closed
+
+
+class TestSlidingWindow:
+    """parallel_extract_multiple_videos scheduling."""
+
+    def test_window_bounds_concurrency_and_keeps_order(self, monkeypatch):
+        extractor = make_extractor(parallel_batch_size=3, video_task_timeout_seconds=5)
+        concurrency = _Concurrency()
+        urls = [f"https://rule34video.com/video/{i}/x/" for i in range(10)]
+
+        async def extract(url):
+            index = urls.index(url)
+            # Uneven durations: a slot frees up as soon as any task ends
+            return await concurrency.run(0.002 * (index % 4), {"url": url})
+
+        monkeypatch.setattr(extractor, "extract_video_details_crawl4ai", extract)
+        results = asyncio.run(extractor.parallel_extract_multiple_videos(urls))
+
+        assert results == [{"url": url} for url in urls]
+        assert concurrency.peak == 3
+
+    def test_timeout_yields_empty_result(self, monkeypatch):
+        """A task exceeding video_task_timeout_seconds gives {} without holding up the others."""
+        extractor = make_extractor(parallel_batch_size=2, video_task_timeout_seconds=0.05)
+        urls = ["slow", "a", "b", "c"]
+
+        async def extract(url):
+            await asyncio.sleep(10 if url == "slow" else 0.001)
+            return {"url": url}
+
+        monkeypatch.setattr(extractor, "extract_video_details_crawl4ai", extract)
+        loop_time = []
+
+        async def run():
+            started = asyncio.get_running_loop().time()
+            results = await extractor.parallel_extract_multiple_videos(urls)
+            loop_time.append(asyncio.get_running_loop().time() - started)
+            return results
+
+        results = asyncio.run(run())
+
+        assert results == [{}, {"url": "a"}, {"url": "b"}, {"url": "c"}]
+        assert loop_time[0] < 1
+
+    def test_failures_yield_empty_result(self, monkeypatch):
+        extractor = make_extractor(parallel_batch_size=4)
+
+        async def extract(url):
+            if url == "bad":
+                raise RuntimeError("crawler crashed")
+            return {"url": url}
+
+        monkeypatch.setattr(extractor, "extract_video_details_crawl4ai", extract)
+
+        assert asyncio.run(extractor.parallel_extract_multiple_videos(["a", "bad", "c"])) == [
+            {"url": "a"}, {}, {"url": "c"}]
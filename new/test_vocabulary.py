@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Packed Record Store
+
+Covers PackedRecords and the parsed_video_data list of the video data
+parser, whose records share the vocabulary's strings.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import asyncio
+import copy
+import json
+import logging
+from array import array
+
+import pytest
+
+from vocabulary import PackedRecords, Vocabulary
+from video_data_parser import OptimizedVideoDataParser
+
+RECORDS = [
+    {"video_id": "1", "tags": ["alpha", "beta"], "categories": ["one"], "artists": []},
+    {"video_id": "2", "tags": ["beta"], "categories": [], "artists": ["someone"]},
+]
+
+
+class TestPackedRecords:
+    """Test suite for PackedRecords."""
+
+    @pytest.fixture
+    def records(self):
+        return PackedRecords(RECORDS, Vocabulary())
+
+    def test_stores_packed_reads_plain(self, records):
+        """Name lists are stored as ID arrays and read back as strings."""
+        assert isinstance(records.packed[0]["tags"], array)
+        assert records[0] == RECORDS[0]
+        assert list(records) == RECORDS
+        assert records[1:] == RECORDS[1:]
+        assert json.loads(json.dumps(list(records))) == RECORDS
+
+    def test_items_are_snapshots(self, records):
+        """Editing a read item only sticks once it is assigned back."""
+        video = records[0]
+        video["tags"].append("gamma")
+        assert records[0]["tags"] == ["alpha", "beta"]
+
+        records[0] = video
+        assert records[0]["tags"] == ["alpha", "beta", "gamma"]
+
+    def test_list_operations(self, records):
+        """append, insert and del keep the store packed."""
+        records.append({"video_id": "3", "tags": ["alpha"]})
+        records.insert(0, {"video_id": "0", "tags": []})
+        del records[1]
+
+        assert [video["video_id"] for video in records] == ["0", "2", "3"]
+        assert all(isinstance(packed["tags"], array) for packed in records.packed)
+
+
+class TestParsedVideoData:
+    """The parser's parsed_video_data list."""
+
+    @pytest.fixture
+    def parser(self, monkeypatch):
+        parser = OptimizedVideoDataParser("https://rule34video.com", use_http=False)
+        parser.logger.setLevel(logging.ERROR)
+        parser.video_urls = ["https://rule34video.com/video/1/a/", "https://rule34video.com/video/2/b/"]
+        videos = iter(RECORDS)
+
+        async def parse_individual_video(video_url):
+            return copy.deepcopy(next(videos))
+
+        async def no_sleep(delay):
+            pass
+
+        monkeypatch.setattr(parser, "parse_individual_video", parse_individual_video)
+        # parse_all_videos pauses 2s between videos
+        monkeypatch.setattr(asyncio, "sleep", no_sleep)
+        return parser
+
+    def test_parse_all_videos_returns_parsed_video_data(self, parser):
+        """parse_all_videos returns parsed_video_data itself, as plain dicts."""
+        videos = asyncio.run(parser.parse_all_videos())
+
+        assert videos is parser.parsed_video_data
+        assert videos == RECORDS
+        assert all(type(video) is dict for video in videos)
+
+    def test_item_edits_kept(self, parser):
+        """Items can be edited in place, including their name lists."""
+        asyncio.run(parser.parse_all_videos())
+
+        parser.parsed_video_data[0]["title"] = "Edited"
+        parser.parsed_video_data[1]["tags"].append("gamma")
+
+        assert parser.parsed_video_data[0]["title"] == "Edited"
+        assert parser.parsed_video_data[1]["tags"] == ["beta", "gamma"]
+
+    def test_json_dump_and_save(self, parser, tmp_path):
+        asyncio.run(parser.parse_all_videos())
+
+        assert json.loads(json.dumps(parser.parsed_video_data)) == RECORDS
+        assert parser.save_data(str(tmp_path / "video_data.json"))
+        assert json.loads((tmp_path / "video_data.json").read_text(encoding="utf-8")) == RECORDS
@@ -19,6 +19,8 @@ from datetime import datetime
 import logging
 import threading
 
+from storage_ledger import folder_size_bytes, refresh_storage
+
 logger = logging.getLogger(__name__)
 
 
@@ -63,11 +65,14 @@ class SafeFileOperations:
                 trash_path = trash_dir / trash_name
 
                 shutil.move(str(folder), str(trash_path))
+                refresh_storage(trash_path)
                 logger.info(f"Moved to trash: {folder_path} -> {trash_path}")
             else:
                 shutil.rmtree(folder)
                 logger.info(f"Deleted folder: {folder_path}")
 
+            refresh_storage(folder)
+
             return True
 
         except Exception as e:
@@ -302,7 +307,8 @@ class ThreadSafeCounter:
 
 def calculate_folder_size(folder_path: str) -> float:
     """
-    Calculate total size of a folder in MB.
+    Calculate total size of a folder in MB (one-off parallel scan; use a
+    StorageLedger for sizes that are queried repeatedly).
 
     Args:
         folder_path: Path to folder
@@ -311,17 +317,7 @@ def calculate_folder_size(folder_path: str) -> float:
         Size in MB
     """
     try:
-        total_size = 0
-        folder = Path(folder_path)
-
-        if not folder.exists():
-            return 0.0
-
-        for file_path in folder.rglob('*'):
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
-
-        return total_size / (1024 * 1024)  # Convert to MB
+        return folder_size_bytes(folder_path) / (1024 * 1024)  # Convert to MB
 
     except Exception as e:
         logger.error(f"Error calculating folder size for {folder_path}: {e}")
@@ -2,6 +2,9 @@ import asyncio
 import json
 import re
 import logging
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from html import unescape
 from playwright.async_api import async_playwright
@@ -9,15 +12,63 @@ from urllib.parse import urljoin, urlparse
 from lxml import html
 from typing import Optional, List, Dict, Any
 from video_extractor import VideoExtractor
+from dom_extractor import DomVideoExtractor
+from page_fetcher import AIOHTTP_AVAILABLE, BrowserPageFetcher, HttpPageFetcher, PageFetcher
+from resource_blocker import ResourceBlockPolicy
+from readiness import AGE_GATE_SELECTOR, LISTING_READY_SELECTORS, PageDeadline, ReadinessWaiter
+from session_state import SessionStateStore
+from parse_pool import ParsePool
+from quality_resolver import select_candidate
+from vocabulary import get_vocabulary, intern_record
+
+
+@dataclass
+class VideoParseResult:
+    """A parsed video page: the video data dict plus what is kept out of it."""
+    data: Dict[str, Any]
+    # Field name -> json_ld, download_links, dom, regex or url (kept out of the saved dict)
+    field_sources: Dict[str, str] = field(default_factory=dict)
+    # Every download rendition (QualityCandidate.to_dict) for VideoMetadata and the manifest
+    download_candidates: List[Dict[str, Any]] = field(default_factory=list)
+
 
 class OptimizedVideoDataParser:
     """Main video data parser class with delegation to VideoExtractor."""
     
-    def __init__(self, base_url: str):
+    # Fields that must be present in plain-HTTP results before the browser fallback is skipped
+    DEFAULT_REQUIRED_FIELDS = ['video_url']
+    
+    # Keys of the video data dict, in output order
+    VIDEO_FIELDS = ['video_id', 'title', 'description', 'tags', 'categories', 'uploaded_by',
+                    'artists', 'duration', 'views', 'likes', 'upload_date', 'thumbnail_url',
+                    'video_url', 'source_url']
+    
+    def __init__(self, base_url: str, browser_pool=None, fetcher: Optional[PageFetcher] = None,
+                 use_http: bool = True, required_fields: Optional[List[str]] = None,
+                 resource_policy: Optional[ResourceBlockPolicy] = None,
+                 readiness_waiter: Optional[ReadinessWaiter] = None,
+                 session_store: Optional[SessionStateStore] = None,
+                 extraction_engine: str = "dom", parse_pool: Optional[ParsePool] = None):
         self.base_url = base_url
+        self.browser_pool = browser_pool
+        # Saved age-gate consent, shared with the pool and the HTTP fetcher
+        self.session_store = session_store or SessionStateStore()
+        # Pooled pages use the pool's policy; this one covers throwaway browsers
+        self.resource_policy = resource_policy
         self.video_urls = []
+        # Tags/categories/artists share one string table; parsed videos reuse its strings
+        self.vocabulary = get_vocabulary()
         self.parsed_video_data = []
         
+        # Fetch engines: plain HTTP first, Playwright only as fallback
+        if fetcher is None and use_http and AIOHTTP_AVAILABLE:
+            fetcher = HttpPageFetcher(session_store=self.session_store)
+        self.fetcher = fetcher
+        self.waiter = readiness_waiter or ReadinessWaiter()
+        self.browser_fetcher = BrowserPageFetcher(lambda: self._open_page(mode="detail"), waiter=self.waiter)
+        self.required_fields = required_fields or list(self.DEFAULT_REQUIRED_FIELDS)
+        self.fetch_stats = {"http": 0, "browser": 0, "browser_fallbacks": 0}
+        
         # Set up logging
         self.logger = logging.getLogger(__name__)
         if not self.logger.handlers:
@@ -29,16 +80,52 @@ class OptimizedVideoDataParser:
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
         
-        # Initialize extractor
+        # Initialize extractors ("dom" parses each page once; "regex" is the original engine)
         self.extractor = VideoExtractor(self.logger)
+        self.extraction_engine = extraction_engine
+        self.dom_extractor = DomVideoExtractor(self.extractor)
+        # Optional process pool that runs build_video_data off the event loop
+        self.parse_pool = parse_pool
+        
+        # JSON-LD fast path: fields answered without touching the full document
+        self.json_ld_readers = {
+            'title': self.extractor.json_ld_title,
+            'description': self.extractor.json_ld_description,
+            'duration': self.extractor.json_ld_duration,
+            'views': self.extractor.json_ld_views,
+            'upload_date': self.extractor.json_ld_upload_date,
+            'thumbnail_url': self.extractor.json_ld_thumbnail_url
+        }
+        self.field_source_stats: Dict[str, Dict[str, int]] = {}
         
         self.logger.info("Initialized parser", extra={"base_url": base_url})
     
-    async def handle_age_verification(self, page) -> bool:
+    @asynccontextmanager
+    async def _open_page(self, mode: Optional[str] = None):
+        """Yield a page from the shared browser pool, or a throwaway browser if no pool is set"""
+        if self.browser_pool is not None:
+            async with self.browser_pool.page(mode=mode) as page:
+                yield page
+            return
+        
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                context = await browser.new_context(**self.session_store.context_options())
+                page = await context.new_page()
+                if self.resource_policy is not None:
+                    await self.resource_policy.install(page, lambda: mode)
+                yield page
+            finally:
+                await browser.close()
+    
+    async def handle_age_verification(self, page, deadline: Optional[PageDeadline] = None) -> bool:
         """Handle age verification popup if it appears - FROM NEW PARSER"""
         try:
             self.logger.info("Checking for age verification popup")
-            await page.wait_for_timeout(2000)
+            # Either the popup or the listing itself shows the page is ready to inspect
+            await self.waiter.wait_for_any(page, [AGE_GATE_SELECTOR] + LISTING_READY_SELECTORS,
+                                           "age_gate_check", timeout_ms=2000, deadline=deadline)
             
             popup_selector = '.popup.popup_access'
             popup = await page.query_selector(popup_selector)
@@ -55,15 +142,16 @@ class OptimizedVideoDataParser:
                     if continue_button:
                         self.logger.info("Clicking Continue button")
                         await continue_button.click()
-                        await page.wait_for_timeout(3000)
+                        await self.waiter.wait_for_any(page, [AGE_GATE_SELECTOR], "age_gate_dismiss",
+                                                       timeout_ms=3000, deadline=deadline, state="hidden")
                         
-                        try:
-                            await page.wait_for_selector('#custom_list_videos_most_recent_videos_items', timeout=10000)
+                        if await self.waiter.wait_for_any(page, ['#custom_list_videos_most_recent_videos_items'],
+                                                          "age_gate_content", timeout_ms=10000, deadline=deadline):
                             self.logger.info("Age verification bypassed successfully")
-                            return True
-                        except:
+                        else:
                             self.logger.warning("Content took longer to load, continuing anyway")
-                            return True
+                        await self.persist_session_state(page)
+                        return True
                     else:
                         self.logger.error("Continue button not found")
                         return False
@@ -78,74 +166,55 @@ class OptimizedVideoDataParser:
             self.logger.error("Error handling age verification", extra={"error": str(e)})
             return True
     
-    async def extract_video_urls(self) -> List[str]:
-        """Extract video URLs from main page - FROM OLD PARSER WITH NEW ENHANCEMENTS"""
-        self.logger.info("Starting video URL extraction", extra={"base_url": self.base_url})
+    async def extract_video_urls(self, listing_url: Optional[str] = None) -> List[str]:
+        """Extract video URLs from a listing page (main page by default) - FROM OLD PARSER WITH NEW ENHANCEMENTS"""
+        listing_url = listing_url or self.base_url
+        self.logger.info("Starting video URL extraction", extra={"url": listing_url})
+        # Local list: concurrent calls for different listing pages must not share results
+        video_urls = []
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
+        async with self._open_page(mode="listing") as page:
             try:
-                self.logger.info("Loading main page", extra={"url": self.base_url})
-                await page.goto(self.base_url, wait_until='domcontentloaded')
+                self.logger.info("Loading listing page", extra={"url": listing_url})
+                deadline = self.waiter.new_deadline()
+                await page.goto(listing_url, wait_until='domcontentloaded')
                 
                 # Handle age verification
-                await self.handle_age_verification(page)
-                await page.wait_for_timeout(3000)
-                
-                # Extract using XPath
-                xpath = '//*[@id="custom_list_videos_most_recent_videos_items"]/div'
-                video_elements = await page.query_selector_all(f'xpath={xpath}')
+                await self.handle_age_verification(page, deadline)
+                await self.waiter.wait_for_any(page, LISTING_READY_SELECTORS, "listing_ready", deadline=deadline)
                 
-                # Try alternative selectors if primary fails
-                if len(video_elements) == 0:
-                    self.logger.warning("No videos found with primary selector, trying alternatives")
-                    alternative_selectors = ['.video-item', '[class*="video"]', '.th.js-open-popup', 'a[href*="/video"]']
-                    
-                    for selector in alternative_selectors:
-                        video_elements = await page.query_selector_all(selector)
-                        if video_elements:
-                            self.logger.info("Found videos with alternative selector", 
-                                           extra={"selector": selector, "count": len(video_elements)})
-                            break
-                
-                self.logger.info("Found video elements", extra={"count": len(video_elements)})
+                # Card selectors and their fallbacks come from the shared selector schema
+                listing_group = self.extractor.listing_group
+                video_elements, matched_selector = await listing_group.items_from_page(page)
+                if matched_selector:
+                    self.logger.info("Found video elements", 
+                                   extra={"selector": matched_selector, "count": len(video_elements)})
+                else:
+                    self.logger.warning("No video elements found with any listing selector")
                 
-                video_urls = []
+                link_field = listing_group.field('video_link')
                 for i, element in enumerate(video_elements):
                     try:
-                        # Primary link selector
-                        link_element = await element.query_selector('a.th.js-open-popup')
-                        if not link_element:
-                            # Alternative selectors
-                            link_element = await element.query_selector('a[href*="/video"]')
-                            if not link_element:
-                                link_element = await element.query_selector('a')
-                        
-                        if link_element:
-                            href = await link_element.get_attribute('href')
-                            if href:
-                                full_url = urljoin(self.base_url, href)
-                                video_urls.append(full_url)
+                        href = await link_field.extract_from_page(element)
+                        if href:
+                            full_url = urljoin(self.base_url, href)
+                            video_urls.append(full_url)
                         
                     except Exception as e:
                         self.logger.warning("Error extracting URL from video element", 
                                           extra={"element_index": i, "error": str(e)})
                 
                 self.video_urls = video_urls
-                self.logger.info("Video URL extraction completed", extra={"count": len(self.video_urls)})
+                self.logger.info("Video URL extraction completed", extra={"count": len(video_urls)})
                 
-                if self.video_urls:
-                    sample_urls = self.video_urls[:3]
+                if video_urls:
+                    sample_urls = video_urls[:3]
                     self.logger.info("Sample URLs", extra={"sample": sample_urls})
                 
             except Exception as e:
-                self.logger.error("Error loading main page", extra={"error": str(e)})
-            finally:
-                await browser.close()
+                self.logger.error("Error loading listing page", extra={"url": listing_url, "error": str(e)})
         
-        return self.video_urls
+        return video_urls
     
     def extract_json_ld_data(self, html_content: str) -> Optional[Dict[str, Any]]:
         """Extract data from JSON-LD script tag - FROM OLD PARSER"""
@@ -271,47 +340,210 @@ class OptimizedVideoDataParser:
             return None
     
     async def parse_individual_video(self, video_url: str) -> Dict[str, Any]:
-        """Parse individual video from URL - FROM OLD PARSER"""
+        """Parse individual video from URL - plain HTTP first, browser fallback for missing fields"""
+        result = await self.parse_video_result(video_url)
+        return result.data if result is not None else {}
+    
+    async def parse_video_result(self, video_url: str) -> Optional[VideoParseResult]:
+        """Parse individual video with its field provenance (None if parsing failed)"""
         self.logger.info("Parsing individual video", extra={"url": video_url})
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        try:
+            parsed = None
+            
+            if self.fetcher is not None:
+                if isinstance(self.fetcher, HttpPageFetcher):
+                    result = await self.fetcher.fetch(video_url, stream=True)
+                else:
+                    result = await self.fetcher.fetch(video_url)
+                if result:
+                    self.fetch_stats["http"] += 1
+                    parsed = await self.build_video_data_async(video_url, result)
+                    
+                    missing = self.get_missing_required_fields(parsed.data)
+                    if not missing:
+                        self.record_field_sources(parsed)
+                        self.logger.info("Video parsing completed", 
+                                       extra={"video_id": parsed.data['video_id'], "engine": result.engine})
+                        return parsed
+                    
+                    self.logger.info("Required fields missing from HTTP fetch, falling back to browser", 
+                                   extra={"url": video_url, "missing": missing})
+                self.fetch_stats["browser_fallbacks"] += 1
             
+            self.logger.info("Loading video page", extra={"url": video_url})
             try:
-                self.logger.info("Loading video page", extra={"url": video_url})
-                await page.goto(video_url, wait_until='domcontentloaded')
-                await page.wait_for_timeout(3000)
-                
-                html_content = await page.content()
-                json_ld_data = self.extract_json_ld_data(html_content)
-                
-                # Extract all video data
-                video_data = {
-                    'video_id': self.extract_video_id(video_url),
-                    'title': self.extract_title(json_ld_data, html_content),
-                    'description': self.extract_description(json_ld_data, html_content),
-                    'tags': self.extract_tags(html_content),
-                    'categories': self.extract_categories(html_content),
-                    'uploaded_by': self.extract_uploaded_by(html_content),
-                    'artists': self.extract_artists(html_content),
-                    'duration': self.extract_duration(json_ld_data, html_content),
-                    'views': self.extract_views(json_ld_data, html_content),
-                    'likes': self.extract_likes(html_content),
-                    'upload_date': self.extract_upload_date(json_ld_data, html_content),
-                    'thumbnail_url': self.extract_thumbnail_src(json_ld_data, html_content),
-                    'video_url': self.extract_video_src(html_content),
-                    'source_url': video_url
-                }
-                
-                self.logger.info("Video parsing completed", extra={"video_id": video_data['video_id']})
-                return video_data
-                
+                result = await self.browser_fetcher.fetch(video_url)
             except Exception as e:
-                self.logger.error("Error parsing individual video", extra={"url": video_url, "error": str(e)})
-                return {}
-            finally:
-                await browser.close()
+                if parsed is None or not parsed.data:
+                    raise
+                self.logger.warning("Browser fallback failed, keeping HTTP result", 
+                                  extra={"url": video_url, "error": str(e)})
+                self.record_field_sources(parsed)
+                return parsed
+            self.fetch_stats["browser"] += 1
+            browser_parsed = await self.build_video_data_async(video_url, result)
+            
+            # Keep the HTTP result if the rendered page is no better
+            if (parsed is not None and parsed.data and
+                    len(self.get_missing_required_fields(browser_parsed.data)) >=
+                    len(self.get_missing_required_fields(parsed.data))):
+                browser_parsed = parsed
+            
+            self.record_field_sources(browser_parsed)
+            self.logger.info("Video parsing completed", 
+                           extra={"video_id": browser_parsed.data['video_id'], "engine": result.engine})
+            return browser_parsed
+            
+        except Exception as e:
+            self.logger.error("Error parsing individual video", extra={"url": video_url, "error": str(e)})
+            return None
+    
+    async def extract_listing_items(self, listing_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Build per-video metadata from one listing page fetch - plain HTTP first, browser fallback"""
+        listing_url = listing_url or self.base_url
+        self.logger.info("Extracting listing metadata", extra={"url": listing_url})
+        
+        try:
+            if self.fetcher is not None:
+                result = await self.fetcher.fetch(listing_url)
+                if result:
+                    self.fetch_stats["http"] += 1
+                    items = self.extractor.extract_listing_items(result.html, self.base_url)
+                    if items:
+                        return items
+                    self.logger.info("No listing items in HTTP response, falling back to browser", 
+                                   extra={"url": listing_url})
+                self.fetch_stats["browser_fallbacks"] += 1
+            
+            async with self._open_page(mode="listing") as page:
+                deadline = self.waiter.new_deadline()
+                await page.goto(listing_url, wait_until='domcontentloaded')
+                await self.handle_age_verification(page, deadline)
+                await self.waiter.wait_for_any(page, LISTING_READY_SELECTORS, "listing_ready", deadline=deadline)
+                html_content = await page.content()
+            self.fetch_stats["browser"] += 1
+            return self.extractor.extract_listing_items(html_content, self.base_url)
+            
+        except Exception as e:
+            self.logger.error("Error extracting listing metadata", extra={"url": listing_url, "error": str(e)})
+            return []
+    
+    async def build_video_data_async(self, video_url: str, result) -> VideoParseResult:
+        """Build video data for a fetch result in the parse pool, or inline without one"""
+        # A streamed fetch already parsed the page; only the field queries are left
+        if self.parse_pool is not None and result.tree is None:
+            body, encoding = result.raw_bytes()
+            try:
+                parsed = await self.parse_pool.parse(video_url, body, encoding)
+                if parsed is not None and parsed.data:
+                    # Worker processes intern into their own tables; share the strings here
+                    parsed.data = intern_record(parsed.data, self.vocabulary)
+                    return parsed
+                self.logger.warning("Parse pool returned no data, parsing inline", extra={"url": video_url})
+            except BrokenProcessPool as e:
+                self.logger.warning("Parse pool unavailable, parsing inline", extra={"url": video_url, "error": str(e)})
+        
+        parsed = self.build_video_result(video_url, result.html, result.tree)
+        parsed.data = intern_record(parsed.data, self.vocabulary)
+        return parsed
+    
+    def build_video_data(self, video_url: str, html_content: str) -> Dict[str, Any]:
+        """Run the extractors over a video page's HTML - JSON-LD first, full document only for the rest"""
+        return self.build_video_result(video_url, html_content).data
+    
+    def build_video_result(self, video_url: str, html_content: str, tree=None) -> VideoParseResult:
+        """build_video_data plus the source of every field and all download candidates (tree: lxml root of html_content)"""
+        # Tier 1: the first JSON-LD block (the search stops there) answers most metadata fields
+        json_ld_data = self.extract_json_ld_data(html_content)
+        values = {'video_id': self.extract_video_id(video_url), 'source_url': video_url}
+        sources = {'video_id': 'url', 'source_url': 'url'}
+        
+        if json_ld_data:
+            for name, reader in self.json_ld_readers.items():
+                try:
+                    value = reader(json_ld_data)
+                except Exception:
+                    # Malformed value: the full extractor reports it and returns its default
+                    value = None
+                if value is not None:
+                    values[name] = value
+                    sources[name] = 'json_ld'
+        
+        # The DOM engine parses the page once; an unparseable page falls back to the regex engine
+        doc = self.dom_extractor.parse(html_content, tree) if self.extraction_engine == "dom" else None
+        engine = "dom" if doc is not None else "regex"
+        
+        # Every download rendition is kept so the downloader can re-pick by size and reachability
+        if doc is not None:
+            candidates = self.dom_extractor.get_download_candidates(doc)
+        else:
+            candidates = self.extractor.get_download_candidates(html_content)
+        best = select_candidate(candidates)
+        if best is not None:
+            values['video_url'] = best.url
+            sources['video_url'] = 'download_links'
+        
+        # Tier 2: only the fields JSON-LD did not answer touch the full document
+        missing = [name for name in self.VIDEO_FIELDS if name not in values]
+        if doc is not None:
+            document_values = self.dom_extractor.extract_fields(doc, json_ld_data, missing)
+        else:
+            document_values = self.extract_document_fields(html_content, json_ld_data, missing)
+        
+        values.update(document_values)
+        sources.update((name, engine) for name in document_values)
+        
+        video_data = {name: values[name] for name in self.VIDEO_FIELDS}
+        return VideoParseResult(video_data, sources, [candidate.to_dict() for candidate in candidates])
+    
+    def extract_document_fields(self, html_content: str, json_ld_data: Optional[Dict[str, Any]],
+                                names: List[str]) -> Dict[str, Any]:
+        """Regex engine for the requested fields"""
+        extractors = {
+            'title': lambda: self.extract_title(json_ld_data, html_content),
+            'description': lambda: self.extract_description(json_ld_data, html_content),
+            'tags': lambda: self.extract_tags(html_content),
+            'categories': lambda: self.extract_categories(html_content),
+            'uploaded_by': lambda: self.extract_uploaded_by(html_content),
+            'artists': lambda: self.extract_artists(html_content),
+            'duration': lambda: self.extract_duration(json_ld_data, html_content),
+            'views': lambda: self.extract_views(json_ld_data, html_content),
+            'likes': lambda: self.extract_likes(html_content),
+            'upload_date': lambda: self.extract_upload_date(json_ld_data, html_content),
+            'thumbnail_url': lambda: self.extract_thumbnail_src(json_ld_data, html_content),
+            'video_url': lambda: self.extract_video_src(html_content)
+        }
+        return {name: extractors[name]() for name in names if name in extractors}
+    
+    def record_field_sources(self, parsed: VideoParseResult) -> None:
+        """Count where each field of a parsed video came from (json_ld, download_links, dom, regex, url)"""
+        for name, source in parsed.field_sources.items():
+            field_counts = self.field_source_stats.setdefault(name, {})
+            field_counts[source] = field_counts.get(source, 0) + 1
+    
+    def get_missing_required_fields(self, video_data: Dict[str, Any]) -> List[str]:
+        """List required fields that came back empty"""
+        return [field for field in self.required_fields if not video_data.get(field)]
+    
+    async def persist_session_state(self, page) -> None:
+        """Save the accepted age-gate session and share it with pooled contexts and the HTTP session"""
+        state = await self.session_store.save_from_context(page.context)
+        if not state:
+            return
+        
+        if self.browser_pool is not None:
+            await self.browser_pool.apply_session_state(state)
+        if isinstance(self.fetcher, HttpPageFetcher):
+            self.fetcher.apply_session_cookies()
+        self.logger.info("Persisted age-gate session state", extra={"cookies": len(state.get("cookies", []))})
+    
+    async def close(self) -> None:
+        """Close the HTTP fetch session and the parse pool workers"""
+        if self.fetcher is not None:
+            await self.fetcher.close()
+        if self.parse_pool is not None:
+            await self.parse_pool.close()
     
     async def parse_single_video(self, video_url: str) -> Dict[str, Any]:
         """Parse single video - alias for parse_individual_video"""
@@ -9,13 +9,19 @@ from urllib.parse import urljoin, urlparse
 from lxml import html
 from typing import Optional, List, Dict, Any
 
+from quality_resolver import QualityCandidate, parse_candidates, select_candidate
+from selector_schema import SelectorSchema, load_schema
 
 
 class VideoExtractor:
     """Class responsible for extracting video data from HTML content and JSON-LD."""
     
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, schema: Optional[SelectorSchema] = None):
         self.logger = logger
+        # Compiled fallback selectors shared with the other extractors
+        self.schema = schema or load_schema()
+        self.page_fields = self.schema.group("video_page")
+        self.listing_group = self.schema.group("listing")
     
     def extract_video_id(self, video_url: str) -> str:
         """Extract video ID from URL."""
@@ -52,39 +58,119 @@ class VideoExtractor:
             self.logger.error("Error extracting video ID from URL", extra={"url": video_url, "error": str(e)})
             return ""
     
+    def extract_listing_items(self, html_content: str, base_url: str) -> List[Dict[str, Any]]:
+        """Extract per-video metadata from a listing page (same fields as the Crawl4AI listing schema)."""
+        try:
+            tree = html.fromstring(html_content)
+            fields = self.listing_group.fields
+            items = []
+            
+            for card in self.listing_group.items_from_tree(tree):
+                link = fields['video_link'].extract(tree=card)
+                if not link:
+                    continue
+                source_url = urljoin(base_url, link)
+                video_id = self.extract_video_id_from_url(source_url)
+                if not video_id:
+                    continue
+                
+                thumbnail = fields['thumbnail'].extract(tree=card)
+                thumbnail_url = urljoin(base_url, thumbnail) if thumbnail else ""
+                
+                items.append({
+                    'video_id': video_id,
+                    'title': fields['title'].extract(tree=card, default=""),
+                    'duration': fields['duration'].extract(tree=card, default=""),
+                    'upload_date': fields['upload_date'].extract(tree=card, default=""),
+                    'thumbnail_url': thumbnail_url,
+                    'video_url': "",
+                    'tags': [],
+                    'source_url': source_url
+                })
+            
+            self.logger.info("Extracted listing items", extra={"count": len(items)})
+            return items
+        except Exception as e:
+            self.logger.error("Error extracting listing items", extra={"error": str(e)})
+            return []
+    
+    # JSON-LD readers: the first priority of the matching extract_* method.
+    # They return None when JSON-LD does not answer the field and may raise
+    # on malformed values (the extract_* method then returns its default).
+    
+    def json_ld_title(self, json_ld_data: Optional[Dict]) -> Optional[str]:
+        """Title from the JSON-LD name field."""
+        if json_ld_data and 'name' in json_ld_data:
+            title = json_ld_data['name'].strip()
+            if title:
+                return title
+        return None
+    
+    def json_ld_description(self, json_ld_data: Optional[Dict]) -> Optional[str]:
+        """Description from JSON-LD (longer than 5 characters)."""
+        if json_ld_data and 'description' in json_ld_data:
+            description = json_ld_data['description'].strip()
+            if description and len(description) > 5:
+                return description
+        return None
+    
+    def json_ld_duration(self, json_ld_data: Optional[Dict]) -> Optional[str]:
+        """Readable duration from the JSON-LD ISO 8601 duration."""
+        if json_ld_data and 'duration' in json_ld_data:
+            duration = json_ld_data['duration']
+            if duration:
+                return self.convert_iso_duration_to_readable(duration)
+        return None
+    
+    def json_ld_views(self, json_ld_data: Optional[Dict]) -> Optional[int]:
+        """View count from the JSON-LD WatchAction interaction statistic."""
+        if json_ld_data and 'interactionStatistic' in json_ld_data:
+            interaction_stats = json_ld_data['interactionStatistic']
+            if isinstance(interaction_stats, list):
+                for stat in interaction_stats:
+                    if stat.get('interactionType') == 'http://schema.org/WatchAction':
+                        view_count = stat.get('userInteractionCount')
+                        if view_count:
+                            return int(view_count)
+        return None
+    
+    def json_ld_upload_date(self, json_ld_data: Optional[Dict]) -> Optional[str]:
+        """Upload date (YYYY-MM-DD when parseable) from uploadDate, datePublished or dateCreated."""
+        if json_ld_data:
+            for date_field in ['uploadDate', 'datePublished', 'dateCreated']:
+                if date_field in json_ld_data:
+                    date_str = json_ld_data[date_field]
+                    if date_str:
+                        try:
+                            # Parse ISO format date
+                            parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                            return parsed_date.strftime('%Y-%m-%d')
+                        except:
+                            return date_str
+        return None
+    
+    def json_ld_thumbnail_url(self, json_ld_data: Optional[Dict]) -> Optional[str]:
+        """Absolute thumbnail URL from the JSON-LD thumbnailUrl field."""
+        if json_ld_data and 'thumbnailUrl' in json_ld_data:
+            thumbnail_url = json_ld_data['thumbnailUrl']
+            if thumbnail_url and thumbnail_url.startswith('http'):
+                return thumbnail_url
+        return None
+    
     def extract_title(self, json_ld_data: Optional[Dict], html_content: str) -> str:
         """Extract title with fallback methods - FROM OLD PARSER"""
         try:
             # Priority 1: JSON-LD name field
-            if json_ld_data and 'name' in json_ld_data:
-                title = json_ld_data['name'].strip()
-                if title:
-                    self.logger.info("Extracted title from JSON-LD", extra={"title": title})
-                    return title
-            
-            # Priority 2: HTML title tag
-            title_match = re.search(r'<title[^>]*>([^<]*)</title>', html_content, re.IGNORECASE)
-            if title_match:
-                title = unescape(title_match.group(1)).strip()
-                if title and title != "404 Not Found":
-                    self.logger.info("Extracted title from HTML", extra={"title": title})
-                    return title
-            
-            # Priority 3: H1 tag
-            h1_match = re.search(r'<h1[^>]*>([^<]*)</h1>', html_content, re.IGNORECASE)
-            if h1_match:
-                title = unescape(h1_match.group(1)).strip()
-                if title:
-                    self.logger.info("Extracted title from H1", extra={"title": title})
-                    return title
-            
-            # Priority 4: Meta property og:title
-            og_title_match = re.search(r'<meta[^>]*property="og:title"[^>]*content="([^"]*)"', html_content, re.IGNORECASE)
-            if og_title_match:
-                title = unescape(og_title_match.group(1)).strip()
-                if title:
-                    self.logger.info("Extracted title from OG meta", extra={"title": title})
-                    return title
+            title = self.json_ld_title(json_ld_data)
+            if title:
+                self.logger.info("Extracted title from JSON-LD", extra={"title": title})
+                return title
+            
+            # Priority 2-4: <title>, <h1>, og:title (selector schema order)
+            title = self.page_fields.field('title').extract(html_content)
+            if title:
+                self.logger.info("Extracted title from HTML", extra={"title": title})
+                return title
             
             self.logger.warning("No title found, setting default")
             return "Unknown Title"
@@ -96,41 +182,16 @@ class VideoExtractor:
         """Extract description with fallback methods - FROM OLD PARSER"""
         try:
             # Priority 1: JSON-LD description field
-            if json_ld_data and 'description' in json_ld_data:
-                description = json_ld_data['description'].strip()
-                if description and len(description) > 5:
-                    self.logger.info("Extracted description from JSON-LD", extra={"length": len(description)})
-                    return description
-            
-            # Priority 2: Meta description
-            meta_desc_match = re.search(r'<meta[^>]*name="description"[^>]*content="([^"]*)"', html_content, re.IGNORECASE)
-            if meta_desc_match:
-                description = unescape(meta_desc_match.group(1)).strip()
-                if description and len(description) > 5:
-                    self.logger.info("Extracted description from meta", extra={"length": len(description)})
-                    return description
-            
-            # Priority 3: OG description
-            og_desc_match = re.search(r'<meta[^>]*property="og:description"[^>]*content="([^"]*)"', html_content, re.IGNORECASE)
-            if og_desc_match:
-                description = unescape(og_desc_match.group(1)).strip()
-                if description and len(description) > 5:
-                    self.logger.info("Extracted description from OG meta", extra={"length": len(description)})
-                    return description
-            
-            # Priority 4: Various description patterns
-            desc_patterns = [
-                r'<div[^>]*class="[^"]*description[^"]*"[^>]*>([^<]*)',
-                r'<p[^>]*class="[^"]*desc[^"]*"[^>]*>([^<]*)'
-            ]
+            description = self.json_ld_description(json_ld_data)
+            if description:
+                self.logger.info("Extracted description from JSON-LD", extra={"length": len(description)})
+                return description
             
-            for pattern in desc_patterns:
-                desc_match = re.search(pattern, html_content, re.IGNORECASE | re.DOTALL)
-                if desc_match:
-                    description = unescape(desc_match.group(1)).strip()
-                    if description and len(description) > 10:
-                        self.logger.info("Extracted description from HTML", extra={"length": len(description)})
-                        return description
+            # Priority 2-4: meta description, og:description, description blocks
+            description = self.page_fields.field('description').extract(html_content)
+            if description:
+                self.logger.info("Extracted description from HTML", extra={"length": len(description)})
+                return description
             
             self.logger.warning("No description found")
             return ""
@@ -314,34 +375,21 @@ class VideoExtractor:
         """Extract duration with fallback methods - FROM OLD PARSER"""
         try:
             # Priority 1: JSON-LD duration field
-            if json_ld_data and 'duration' in json_ld_data:
-                duration = json_ld_data['duration']
-                if duration:
-                    readable_duration = self.convert_iso_duration_to_readable(duration)
-                    self.logger.info("Extracted duration from JSON-LD", extra={"duration": readable_duration})
+            readable_duration = self.json_ld_duration(json_ld_data)
+            if readable_duration is not None:
+                self.logger.info("Extracted duration from JSON-LD", extra={"duration": readable_duration})
+                return readable_duration
+            
+            # Priority 2: HTML duration patterns (the schema keeps MM:SS, HH:MM:SS or ISO values)
+            duration_str = self.page_fields.field('duration').extract(html_content)
+            if duration_str is not None:
+                # If it's ISO format, convert it
+                if duration_str.startswith('PT'):
+                    readable_duration = self.convert_iso_duration_to_readable(duration_str)
+                    self.logger.info("Extracted duration from HTML (ISO)", extra={"duration": readable_duration})
                     return readable_duration
-            
-            # Priority 2: HTML duration patterns
-            duration_patterns = [
-                r'duration="([^"]*)"',
-                r"duration='([^']*)'",
-                r'<meta[^>]*property="video:duration"[^>]*content="([^"]*)"',
-                r'([0-9]+:[0-9]+(?::[0-9]+)?)'  # MM:SS or HH:MM:SS format
-            ]
-            
-            for pattern in duration_patterns:
-                duration_match = re.search(pattern, html_content, re.IGNORECASE)
-                if duration_match:
-                    duration_str = duration_match.group(1)
-                    # If it's already in readable format, return it
-                    if re.match(r'^[0-9]+:[0-9]+(?::[0-9]+)?$', duration_str):
-                        self.logger.info("Extracted duration from HTML", extra={"duration": duration_str})
-                        return duration_str
-                    # If it's ISO format, convert it
-                    elif duration_str.startswith('PT'):
-                        readable_duration = self.convert_iso_duration_to_readable(duration_str)
-                        self.logger.info("Extracted duration from HTML (ISO)", extra={"duration": readable_duration})
-                        return readable_duration
+                self.logger.info("Extracted duration from HTML", extra={"duration": duration_str})
+                return duration_str
             
             self.logger.warning("No duration found")
             return "Unknown"
@@ -353,42 +401,16 @@ class VideoExtractor:
         """Extract view count with fallback methods - FROM OLD PARSER"""
         try:
             # Priority 1: JSON-LD interactionStatistic
-            if json_ld_data and 'interactionStatistic' in json_ld_data:
-                interaction_stats = json_ld_data['interactionStatistic']
-                if isinstance(interaction_stats, list):
-                    for stat in interaction_stats:
-                        if stat.get('interactionType') == 'http://schema.org/WatchAction':
-                            view_count = stat.get('userInteractionCount')
-                            if view_count:
-                                views = int(view_count)
-                                self.logger.info("Extracted views from JSON-LD", extra={"views": views})
-                                return views
-            
-            # Priority 2: HTML patterns like "1.2K (1,194)" views
-            views_pattern = r'([0-9.,KM]+)\s*\(([0-9,]+)\)'
-            views_match = re.search(views_pattern, html_content)
-            if views_match:
-                full_number = views_match.group(2).replace(',', '')
-                if full_number.isdigit():
-                    views = int(full_number)
-                    self.logger.info("Extracted views from HTML (parentheses)", extra={"views": views})
-                    return views
-            
-            # Priority 3: Simple number patterns
-            simple_views_patterns = [
-                r'([0-9,]+)\s*views?',
-                r'Views?:\s*([0-9,]+)',
-                r'([0-9,]+)\s*Views?'
-            ]
+            views = self.json_ld_views(json_ld_data)
+            if views is not None:
+                self.logger.info("Extracted views from JSON-LD", extra={"views": views})
+                return views
             
-            for pattern in simple_views_patterns:
-                views_match = re.search(pattern, html_content, re.IGNORECASE)
-                if views_match:
-                    views_str = views_match.group(1).replace(',', '')
-                    if views_str.isdigit():
-                        views = int(views_str)
-                        self.logger.info("Extracted views from HTML", extra={"views": views})
-                        return views
+            # Priority 2-3: "1.2K (1,194)" counters, then simple number patterns
+            views = self.page_fields.field('views').extract(html_content)
+            if views is not None:
+                self.logger.info("Extracted views from HTML", extra={"views": views})
+                return views
             
             self.logger.warning("No views found")
             return 0
@@ -399,23 +421,10 @@ class VideoExtractor:
     def extract_likes(self, html_content: str) -> int:
         """Extract like count from HTML content."""
         try:
-            # Look for like patterns
-            like_patterns = [
-                r'([0-9,]+)\s*likes?',
-                r'Likes?:\s*([0-9,]+)',
-                r'<[^>]*class="[^"]*like[^"]*"[^>]*>([0-9,]+)',
-                r'👍\s*([0-9,]+)',
-                r'♥\s*([0-9,]+)'
-            ]
-            
-            for pattern in like_patterns:
-                like_match = re.search(pattern, html_content, re.IGNORECASE)
-                if like_match:
-                    likes_str = like_match.group(1).replace(',', '')
-                    if likes_str.isdigit():
-                        likes = int(likes_str)
-                        self.logger.info("Extracted likes", extra={"likes": likes})
-                        return likes
+            likes = self.page_fields.field('likes').extract(html_content)
+            if likes is not None:
+                self.logger.info("Extracted likes", extra={"likes": likes})
+                return likes
             
             self.logger.warning("No likes found")
             return 0
@@ -427,46 +436,26 @@ class VideoExtractor:
         """Extract upload date with fallback methods - FROM OLD PARSER"""
         try:
             # Priority 1: JSON-LD uploadDate or datePublished
-            if json_ld_data:
-                for date_field in ['uploadDate', 'datePublished', 'dateCreated']:
-                    if date_field in json_ld_data:
-                        date_str = json_ld_data[date_field]
-                        if date_str:
-                            try:
-                                # Parse ISO format date
-                                parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                                formatted_date = parsed_date.strftime('%Y-%m-%d')
-                                self.logger.info("Extracted upload date from JSON-LD", extra={"date": formatted_date})
-                                return formatted_date
-                            except:
-                                self.logger.info("Extracted upload date from JSON-LD", extra={"date": date_str})
-                                return date_str
-            
-            # Priority 2: HTML meta tags
-            date_patterns = [
-                r'<meta[^>]*property="article:published_time"[^>]*content="([^"]*)"',
-                r'<meta[^>]*name="publish_date"[^>]*content="([^"]*)"',
-                r'<meta[^>]*property="video:release_date"[^>]*content="([^"]*)"',
-                r'Upload(?:ed)?\s*(?:on|date)?:?\s*([0-9]{1,2}[/-][0-9]{1,2}[/-][0-9]{2,4})',
-                r'([0-9]{4}-[0-9]{2}-[0-9]{2})'
-            ]
-            
-            for pattern in date_patterns:
-                date_match = re.search(pattern, html_content, re.IGNORECASE)
-                if date_match:
-                    date_str = date_match.group(1)
-                    try:
-                        # Try to parse and format the date
-                        if 'T' in date_str:  # ISO format
-                            parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                            formatted_date = parsed_date.strftime('%Y-%m-%d')
-                        else:
-                            formatted_date = date_str
-                        self.logger.info("Extracted upload date from HTML", extra={"date": formatted_date})
-                        return formatted_date
-                    except:
-                        self.logger.info("Extracted upload date from HTML", extra={"date": date_str})
-                        return date_str
+            date_str = self.json_ld_upload_date(json_ld_data)
+            if date_str is not None:
+                self.logger.info("Extracted upload date from JSON-LD", extra={"date": date_str})
+                return date_str
+            
+            # Priority 2: HTML meta tags, upload labels, ISO dates
+            date_str = self.page_fields.field('upload_date').extract(html_content)
+            if date_str is not None:
+                try:
+                    # Try to parse and format the date
+                    if 'T' in date_str:  # ISO format
+                        parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                        formatted_date = parsed_date.strftime('%Y-%m-%d')
+                    else:
+                        formatted_date = date_str
+                    self.logger.info("Extracted upload date from HTML", extra={"date": formatted_date})
+                    return formatted_date
+                except:
+                    self.logger.info("Extracted upload date from HTML", extra={"date": date_str})
+                    return date_str
             
             self.logger.warning("No upload date found")
             return "Unknown"
@@ -492,33 +481,12 @@ class VideoExtractor:
         """Extract thumbnail URL with fallback methods - FROM OLD PARSER"""
         try:
             # Priority 1: JSON-LD thumbnailUrl field
-            if json_ld_data and 'thumbnailUrl' in json_ld_data:
-                thumbnail_url = json_ld_data['thumbnailUrl']
-                if thumbnail_url and thumbnail_url.startswith('http'):
-                    return thumbnail_url
-            
-            # Priority 2: Video poster attribute
-            poster_match = re.search(r'poster="([^"]*)"', html_content)
-            if poster_match:
-                poster_url = poster_match.group(1)
-                if poster_url and poster_url.startswith('http'):
-                    return poster_url
-            
-            # Priority 3: Meta image tags
-            meta_image_match = re.search(r'<meta[^>]*property="og:image"[^>]*content="([^"]*)"', html_content, re.IGNORECASE)
-            if meta_image_match:
-                image_url = meta_image_match.group(1)
-                if image_url and image_url.startswith('http'):
-                    return image_url
-            
-            # Priority 4: Link rel image_src
-            link_image_match = re.search(r'<link[^>]*rel="image_src"[^>]*href="([^"]*)"', html_content)
-            if link_image_match:
-                image_url = link_image_match.group(1)
-                if image_url and image_url.startswith('http'):
-                    return image_url
+            thumbnail_url = self.json_ld_thumbnail_url(json_ld_data)
+            if thumbnail_url is not None:
+                return thumbnail_url
             
-            return ""
+            # Priority 2-4: video poster, og:image, link rel image_src
+            return self.page_fields.field('thumbnail_url').extract(html_content, default="")
         except Exception as e:
             self.logger.error("Error extracting thumbnail URL", extra={"error": str(e)})
             return ""
@@ -580,56 +548,16 @@ class VideoExtractor:
     def find_highest_quality_download_url(self, html_content: str) -> str:
         """Find highest quality download URL - FROM OLD PARSER"""
         try:
-            download_links = self.get_download_links_from_html(html_content)
-            if not download_links:
-                return ""
-            
-            # Quality priority (higher number = better quality)
-            quality_order = {
-                '4K': 10, '2160p': 10,
-                '1440p': 9, '2K': 9,
-                '1080p': 8, 'Full HD': 8,
-                '720p': 7, 'HD': 7,
-                '480p': 6,
-                '360p': 5,
-                '240p': 4,
-                '144p': 3
-            }
-            
-            best_quality = 0
-            best_url = ""
-            
-            for link in download_links:
-                url = link.get('url', '')
-                quality = link.get('quality', '').lower()
-                
-                # Find quality score
-                quality_score = 0
-                for q, score in quality_order.items():
-                    if q.lower() in quality:
-                        quality_score = score
-                        break
-                
-                # If no quality found, check URL for quality indicators
-                if quality_score == 0:
-                    for q, score in quality_order.items():
-                        if q.lower() in url.lower():
-                            quality_score = score
-                            break
-                
-                # Default score for unspecified quality
-                if quality_score == 0:
-                    quality_score = 1
-                
-                if quality_score > best_quality:
-                    best_quality = quality_score
-                    best_url = url
-            
-            return best_url
+            best = select_candidate(self.get_download_candidates(html_content))
+            return best.url if best else ""
         except Exception as e:
             self.logger.error("Error finding highest quality download URL", extra={"error": str(e)})
             return ""
     
+    def get_download_candidates(self, html_content: str) -> List[QualityCandidate]:
+        """Download links of a page as structured candidates (resolution, label, url)."""
+        return parse_candidates(self.get_download_links_from_html(html_content))
+    
     def get_download_links_from_html(self, html_content: str) -> List[Dict[str, str]]:
         """Extract download links from HTML content - FROM OLD PARSER"""
         try:
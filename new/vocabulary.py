@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Vocabulary Module
+
+Process-wide string table for the tags, categories and artists of parsed
+videos. The same few thousand names repeat across every record a run
+holds in memory, so each distinct name is interned once and given a small
+integer ID. Records can then either share the canonical strings
+(``intern_record``) or store their name lists as compact unsigned integer
+arrays (``pack_record``). ``unpack_record`` and ``load_packed`` restore the
+usual JSON shape (lists of strings), so files written by the parser stay
+unchanged; ``PackedRecords`` is a list that keeps records packed and
+unpacks them on access.
+
+Author: AI Assistant
+Version: 1.0
+"""
+
+import json
+import sys
+import threading
+from array import array
+from collections.abc import MutableSequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Record keys holding name lists
+VOCAB_FIELDS = ("tags", "categories", "artists")
+
+# Array typecode for packed ID lists (unsigned int, 4 bytes on supported platforms)
+ID_TYPECODE = "I"
+
+
+class Vocabulary:
+    """Thread-safe string <-> ID table."""
+
+    def __init__(self, names: Optional[Iterable[str]] = None):
+        """
+        Initialize vocabulary.
+
+        Args:
+            names: Initial names, in ID order (e.g. a saved vocabulary)
+        """
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0}
+        for name in names or []:
+            self.id_for(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def id_for(self, name: str) -> int:
+        """
+        Get the ID of a name, adding it on first sight.
+
+        Args:
+            name: Tag, category or artist name
+
+        Returns:
+            Integer ID (stable for the lifetime of the vocabulary)
+        """
+        self.stats["lookups"] += 1
+        name_id = self._ids.get(name)
+        if name_id is not None:
+            self.stats["hits"] += 1
+            return name_id
+
+        with self._lock:
+            # Another thread may have added it while we waited
+            name_id = self._ids.get(name)
+            if name_id is None:
+                name = sys.intern(name)
+                name_id = len(self._names)
+                self._names.append(name)
+                self._ids[name] = name_id
+            return name_id
+
+    def intern(self, name: str) -> str:
+        """Return the canonical copy of a name (adding it if new)."""
+        return self._names[self.id_for(name)]
+
+    def name_for(self, name_id: int) -> str:
+        """Get the name of an ID (IndexError if unknown)."""
+        return self._names[name_id]
+
+    def intern_list(self, names: Iterable[str]) -> List[str]:
+        """Replace each name with its canonical copy (order and duplicates kept)."""
+        return [self.intern(name) for name in names if isinstance(name, str)]
+
+    def encode(self, names: Iterable[str]) -> array:
+        """
+        Convert names to a compact ID array.
+
+        Args:
+            names: Name list (non-strings are skipped)
+
+        Returns:
+            ``array('I')`` of IDs in input order
+        """
+        return array(ID_TYPECODE, [self.id_for(name) for name in names if isinstance(name, str)])
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Convert an ID array back to its (canonical) names."""
+        names = self._names
+        return [names[name_id] for name_id in ids]
+
+    def to_list(self) -> List[str]:
+        """Names in ID order (the serialized form)."""
+        with self._lock:
+            return list(self._names)
+
+    @classmethod
+    def from_list(cls, names: Iterable[str]) -> "Vocabulary":
+        """Rebuild a vocabulary from to_list() output (same IDs)."""
+        return cls(names)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the vocabulary as a JSON list of names."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_list(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Vocabulary":
+        """Read a vocabulary written by save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_list(json.load(f))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get vocabulary statistics."""
+        lookups = self.stats["lookups"]
+        return {
+            "size": len(self._names),
+            "lookups": lookups,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+
+_global_vocabulary = Vocabulary()
+
+
+def get_vocabulary() -> Vocabulary:
+    """The process-wide vocabulary shared by the parsers."""
+    return _global_vocabulary
+
+
+def intern_record(record: Dict[str, Any], vocabulary: Optional[Vocabulary] = None,
+                  fields: Iterable[str] = VOCAB_FIELDS) -> Dict[str, Any]:
+    """
+    Swap the name lists of a record for canonical strings (in place).
+
+    Args:
+        record: Video data dict
+        vocabulary: Table to intern into (the global one by default)
+        fields: Keys holding name lists
+
+    Returns:
+        The same record
+    """
+    vocabulary = _global_vocabulary if vocabulary is None else vocabulary
+    for name in fields:
+        values = record.get(name)
+        if isinstance(values, list):
+            record[name] = vocabulary.intern_list(values)
+    return record
+
+
+def pack_record(record: Dict[str, Any], vocabulary: Optional[Vocabulary] = None,
+                fields: Iterable[str] = VOCAB_FIELDS) -> Dict[str, Any]:
+    """
+    Copy a record with its name lists stored as ID arrays.
+
+    Args:
+        record: Video data dict
+        vocabulary: Table to encode with (the global one by default)
+        fields: Keys holding name lists
+
+    Returns:
+        New dict; other keys are shared with the input
+    """
+    vocabulary = _global_vocabulary if vocabulary is None else vocabulary
+    packed = dict(record)
+    for name in fields:
+        values = packed.get(name)
+        if isinstance(values, list):
+            packed[name] = vocabulary.encode(values)
+    return packed
+
+
+def unpack_record(packed: Dict[str, Any], vocabulary: Optional[Vocabulary] = None,
+                  fields: Iterable[str] = VOCAB_FIELDS) -> Dict[str, Any]:
+    """
+    Restore the JSON shape of a packed record (name lists of strings).
+
+    Args:
+        packed: Output of pack_record (or a plain record, returned as a copy)
+        vocabulary: Table the record was packed with
+        fields: Keys holding name lists
+
+    Returns:
+        New dict
+    """
+    vocabulary = _global_vocabulary if vocabulary is None else vocabulary
+    record = dict(packed)
+    for name in fields:
+        values = record.get(name)
+        if isinstance(values, array):
+            record[name] = vocabulary.decode(values)
+    return record
+
+
+def dump_packed(records: Iterable[Dict[str, Any]], vocabulary: Optional[Vocabulary] = None,
+                fields: Iterable[str] = VOCAB_FIELDS) -> Dict[str, Any]:
+    """
+    Serialize packed records with their vocabulary in one JSON-ready dict.
+
+    Args:
+        records: Packed records
+        vocabulary: Table the records were packed with
+        fields: Keys holding name lists
+
+    Returns:
+        ``{"vocabulary": [...], "videos": [...]}`` with ID lists
+    """
+    vocabulary = _global_vocabulary if vocabulary is None else vocabulary
+    fields = tuple(fields)
+    videos = []
+    for packed in records:
+        video = dict(packed)
+        for name in fields:
+            if isinstance(video.get(name), array):
+                video[name] = video[name].tolist()
+        videos.append(video)
+    return {"vocabulary": vocabulary.to_list(), "videos": videos}
+
+
+def load_packed(data: Dict[str, Any], vocabulary: Optional[Vocabulary] = None,
+                fields: Iterable[str] = VOCAB_FIELDS) -> List[Dict[str, Any]]:
+    """
+    Restore plain records (lists of strings) from dump_packed output.
+
+    Args:
+        data: Output of dump_packed
+        vocabulary: Table to intern the names into (the global one by default)
+        fields: Keys holding name lists
+
+    Returns:
+        Records in the usual JSON shape
+    """
+    vocabulary = _global_vocabulary if vocabulary is None else vocabulary
+    names = [vocabulary.intern(name) for name in data.get("vocabulary", [])]
+    fields = tuple(fields)
+    records = []
+    for video in data.get("videos", []):
+        record = dict(video)
+        for name in fields:
+            ids = record.get(name)
+            if isinstance(ids, list):
+                record[name] = [names[name_id] for name_id in ids]
+        records.append(record)
+    return records
+
+
+class PackedRecords(MutableSequence):
+    """
+    List of records held packed (pack_record) and unpacked on access.
+
+    Reading an item returns a new plain dict, so editing it does not touch
+    the stored record; assign it back (``records[i] = record``) to keep the
+    change. Appending, inserting and assigning pack the given records.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = (), vocabulary: Optional[Vocabulary] = None,
+                 fields: Iterable[str] = VOCAB_FIELDS):
+        """
+        Initialize packed record list.
+
+        Args:
+            records: Initial records (plain JSON shape)
+            vocabulary: Table to pack with (the global one by default)
+            fields: Keys holding name lists
+        """
+        self.vocabulary = _global_vocabulary if vocabulary is None else vocabulary
+        self.fields = tuple(fields)
+        self._packed: List[Dict[str, Any]] = []
+        self.extend(records)
+
+    def _pack(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return pack_record(record, self.vocabulary, self.fields)
+
+    def _unpack(self, packed: Dict[str, Any]) -> Dict[str, Any]:
+        return unpack_record(packed, self.vocabulary, self.fields)
+
+    def __len__(self) -> int:
+        return len(self._packed)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._unpack(packed) for packed in self._packed[index]]
+        return self._unpack(self._packed[index])
+
+    def __setitem__(self, index, record) -> None:
+        if isinstance(index, slice):
+            self._packed[index] = [self._pack(item) for item in record]
+        else:
+            self._packed[index] = self._pack(record)
+
+    def __delitem__(self, index) -> None:
+        del self._packed[index]
+
+    def insert(self, index: int, record: Dict[str, Any]) -> None:
+        self._packed.insert(index, self._pack(record))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PackedRecords, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PackedRecords({len(self._packed)} records)"
+
+    @property
+    def packed(self) -> List[Dict[str, Any]]:
+        """The stored packed records (no copy)."""
+        return self._packed
+
+    def dump(self) -> Dict[str, Any]:
+        """dump_packed output for these records."""
+        return dump_packed(self._packed, self.vocabulary, self.fields)
@@ -1,4 +1,3 @@
-import time
 import re
 import logging
 import traceback
@@ -6,6 +5,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from web_driver_manager import LISTING_READY_SELECTORS, PAGINATION_READY_SELECTORS
+from new.selector_schema import load_schema
 
 class PageNavigator:
     def __init__(self, config, driver_manager):
@@ -13,6 +14,8 @@ class PageNavigator:
         self.driver_manager = driver_manager
         self.base_url = "https://rule34video.com"
         self.logger = logging.getLogger('Rule34Scraper')
+        # Fallback selectors (and their hit statistics) live in new/selector_schema.json
+        self.selectors = load_schema().group("navigator")
     
     @property
     def driver(self):
@@ -29,19 +32,19 @@ class PageNavigator:
             videos_url = f"{self.base_url}/latest-updates/"
             self.logger.info(f"Navigating to: {videos_url}")
             self.driver.get(videos_url)
-            time.sleep(3)
+            self.driver_manager.wait_for_document_ready()
 
             # Bypass age gate if present
             self.driver_manager.handle_age_verification()
 
             # Ensure pagination container is loaded by scrolling to bottom
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            self.driver_manager.wait_until_ready(PAGINATION_READY_SELECTORS, label="pagination_ready")
 
-            # CORRECTED: Use the correct XPath based on your HTML structure
-            # The pagination container is: custom_list_videos_latest_videos_list_pagination
-            # The Last button is in div[11] within this container
-            xpath = '//*[@id="custom_list_videos_latest_videos_list_pagination"]/div[11]/a'
+            # The Last button is in div[11] of custom_list_videos_latest_videos_list_pagination
+            # (first last_page_link selector; the others are used by the fallback method)
+            last_link_field = self.selectors.field("last_page_link")
+            label, xpath = last_link_field.xpaths()[0]
             self.logger.info(f"Looking for Last button at XPath: {xpath}")
 
             # Wait for the element to be present
@@ -52,6 +55,7 @@ class PageNavigator:
             href = element.get_attribute("href")
             if not href:
                 raise RuntimeError("Last button has no href attribute")
+            last_link_field.record_hit(label)
 
             self.logger.info(f"Found Last button href: {href}")
 
@@ -66,7 +70,7 @@ class PageNavigator:
             # IMPORTANT: Navigate to the last page to verify it exists and start scraping from there
             self.logger.info(f"Verifying last page by navigating to: {href}")
             self.driver.get(href)
-            time.sleep(3)
+            self.driver_manager.wait_until_ready(LISTING_READY_SELECTORS, label="listing_ready")
             
             # Check if we successfully loaded the last page
             current_url = self.driver.current_url
@@ -91,20 +95,14 @@ class PageNavigator:
             if not self.handle_page_navigation(page_num):
                 return []
             
-            # Wait a moment for the page to fully load
-            time.sleep(2)
-            
-            # Use exact XPath to find video cards - updated to match the actual structure
-            video_selectors = [
-                "//div[contains(@class, 'video_')]",  # Original selector
-                "//div[@class='item']//a[contains(@href, '/video/')]",  # Alternative selector
-                "//a[contains(@class, 'js-open-popup')]",  # Direct popup links
-                "//div[@class='item']//a[@data-action='ajax']"  # Data-action links
-            ]
+            # Wait for video cards rather than a fixed delay
+            self.driver_manager.wait_until_ready(LISTING_READY_SELECTORS, label="listing_ready")
             
+            # Video card XPaths in fallback order (navigator.video_cards in the selector schema)
+            cards_field = self.selectors.field("video_cards")
             video_links = []
             
-            for selector in video_selectors:
+            for label, selector in cards_field.xpaths():
                 try:
                     elements = WebDriverWait(self.driver, 10).until(
                         EC.presence_of_all_elements_located((By.XPATH, selector))
@@ -132,12 +130,15 @@ class PageNavigator:
                     
                     # If we found videos with this selector, break
                     if video_links:
+                        cards_field.record_hit(label)
                         break
                         
                 except Exception as e:
                     self.logger.debug(f"Selector {selector} failed: {e}")
                     continue
             
+            if not video_links:
+                cards_field.record_hit(None)
             self.logger.info(f"Successfully extracted {len(video_links)} video links from page {page_num}")
             
             # Log first few URLs for debugging
@@ -166,9 +167,9 @@ class PageNavigator:
                 self.logger.error(f"Failed to navigate to page {page_num}")
                 return False
 
-            # Wait for page to load
+            # Wait for page to load (wait_time_ms is now the upper bound, not a fixed sleep)
             wait_time = self.config.get("scraping", {}).get("wait_time_ms", 3000) / 1000
-            time.sleep(wait_time)
+            self.driver_manager.wait_until_ready(LISTING_READY_SELECTORS, label="listing_ready", timeout=wait_time)
             
             # Verify we're on the correct page
             current_url = self.driver.current_url
@@ -198,17 +199,12 @@ class PageNavigator:
         try:
             # Scroll to bottom to ensure pagination is visible
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            self.driver_manager.wait_until_ready(PAGINATION_READY_SELECTORS, label="pagination_ready", timeout=2)
             
-            # Multiple selectors to find the "Last" button
-            last_selectors = [
-                "//a[contains(text(), 'Last')]",
-                "//a[@data-action='ajax' and contains(text(), 'Last')]",
-                "//*[@id='custom_list_videos_latest_videos_list_pagination']//a[contains(text(), 'Last')]",
-                "//div[@class='item']//a[contains(text(), 'Last')]"
-            ]
+            # Remaining last_page_link selectors (the first one already failed)
+            last_link_field = self.selectors.field("last_page_link")
             
-            for selector in last_selectors:
+            for label, selector in last_link_field.xpaths()[1:]:
                 try:
                     elements = self.driver.find_elements(By.XPATH, selector)
                     if elements:
@@ -222,12 +218,14 @@ class PageNavigator:
                             if match:
                                 last_page = int(match.group(1))
                                 self.logger.info(f"Extracted last page number: {last_page}")
+                                last_link_field.record_hit(label)
                                 return last_page
                                 
                 except Exception as e:
                     self.logger.debug(f"Selector {selector} failed: {e}")
                     continue
             
+            last_link_field.record_hit(None)
             self.logger.warning("Could not find Last button with any selector")
             return None
             
@@ -237,25 +235,20 @@ class PageNavigator:
 
     def extract_pagination_info(self):
         """Get pagination structure and available pages"""
-        pagination_selectors = [
-            "#custom_list_videos_latest_videos_list_pagination",
-            ".pagination",
-            ".pages", 
-            ".page-navigation",
-            "[class*='page']",
-            "nav"
-        ]
+        pagination_field = self.selectors.field("pagination_container")
         
-        for selector in pagination_selectors:
+        for label, selector in pagination_field.css_selectors():
             try:
                 pagination = WebDriverWait(self.driver, 5).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, selector))
                 )
                 self.logger.info(f"Found pagination with selector: {selector}")
+                pagination_field.record_hit(label)
                 return pagination
             except TimeoutException:
                 self.logger.debug(f"Pagination selector failed: {selector}")
                 continue
         
+        pagination_field.record_hit(None)
         self.logger.warning("No pagination container found")
         return None
\ No newline at end of file
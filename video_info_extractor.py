@@ -3,16 +3,33 @@ import time
 import json
 import logging
 import asyncio
+import itertools
+from contextlib import asynccontextmanager
 from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 from urllib.parse import urljoin
 from date_parser import DateParser
+from new.selector_schema import load_schema
+from new.numeric_normalizer import parse_count
+from new.quality_resolver import parse_candidates, parse_resolution, select_candidate
 
 # Crawl4AI imports
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
 
+# (minimum height, label, priority) of the download quality tiers, best first
+QUALITY_TIERS = [
+    (2160, '4K/2160p', 1),
+    (1440, '1440p', 2),
+    (1080, '1080p', 3),
+    (720, '720p', 4),
+    (480, '480p', 5),
+    (360, '360p', 6),
+    (240, '240p', 7),
+]
+
+
 class VideoInfoExtractor:
     def __init__(self, config, driver_manager, date_parser):
         self.config = config
@@ -21,45 +38,73 @@ class VideoInfoExtractor:
         self.base_url = "https://rule34video.com"
         self.logger = logging.getLogger('Rule34Scraper')
 
-        # Enhanced Crawl4AI schemas
-        self.listing_schema = {
-            "name": "rule34video.com Listing Schema",
-            "baseSelector": "#custom_list_videos_most_recent_videos_items > div",
-            	"fields": [
-				{"name": "upload_date", "selector": "a.th.js-open-popup > div.thumb_info > div.added:nth-of-type(1)", "type": "text"},
-				{"name": "duration", "selector": "a.th.js-open-popup > div.img.wrap_image > div.time:nth-of-type(3)", "type": "text"},
-				{"name": "title", "selector": "a.th.js-open-popup > div.thumb_title:nth-of-type(2)", "type": "text"},
-				{"name": "video_link", "selector": "a.th.js-open-popup", "type": "attribute", "attribute": "href"},
-				{"name": "thumbnail", "selector": "a.th.js-open-popup > div.img.wrap_image > img", "type": "attribute", "attribute": "data-src"}
-			]
-        }
-
-        # UPDATED: Better detail schema for views extraction
-        self.detail_schema = {
-            "name": "rule34video.com Detail Schema",
-            "baseSelector": "div.fancybox-inner > div",
-            "fields": [
-                {"name": "info_details", "selector": "#tab_video_info > div.info.row", "type": "text"},
-                {"name": "uploaded_by", "selector": "a.item.btn_link", "type": "text"},
-                {"name": "tags", "selector": "div.wrap", "type": "text"},
-                {"name": "video_source", "selector": "video", "type": "attribute", "attribute": "src"},
-                {"name": "video_poster", "selector": "video", "type": "attribute", "attribute": "poster"},
-                {"name": "views", "selector": "span", "type": "text"},
-				{"name": "description", "selector": "#tab_video_info div.description, #tab_video_info div.desc, #tab_video_info p", "type": "text"},
-				{"name": "categories", "selector": "#tab_video_info div[2]/div/div[1]//a[contains(@class, 'item btn_link')]", "type": "text"},
-                {"name": "artists", "selector": "#tab_video_info div[2]/div/div[2]//a[contains(@class, 'item btn_link')]", "type": "text"}
-            ]
-        }
+        # Warm Crawl4AI browsers kept for the extractor's lifetime (see start/close)
+        self.crawler_pool_size = max(1, self.config.get("processing", {}).get("crawler_pool_size", 1))
+        self._crawlers = []
+        self._crawler_cycle = None
+        self._crawler_loop = None
+
+        # Crawl4AI schemas generated from the shared selector schema (new/selector_schema.json)
+        self.selector_schema = load_schema()
+        self.listing_selectors = self.selector_schema.group("listing")
+        self.detail_selectors = self.selector_schema.group("detail")
+        self.listing_schema = self.listing_selectors.to_crawl4ai_schema("rule34video.com Listing Schema")
+        self.detail_schema = self.detail_selectors.to_crawl4ai_schema("rule34video.com Detail Schema")
 
     @property
     def driver(self):
         return self.driver_manager.get_driver()
 
+    async def start(self):
+        """Launch the shared Crawl4AI browser sessions (call once per event loop)"""
+        if self._crawlers:
+            return
+
+        browser_config = BrowserConfig(headless=True, verbose=False)
+        for _ in range(self.crawler_pool_size):
+            crawler = AsyncWebCrawler(config=browser_config)
+            await crawler.start()
+            self._crawlers.append(crawler)
+
+        self._crawler_cycle = itertools.cycle(self._crawlers)
+        self._crawler_loop = asyncio.get_running_loop()
+        self.logger.info(f"Started {len(self._crawlers)} shared Crawl4AI browser session(s)")
+
+    async def close(self):
+        """Close the shared Crawl4AI browser sessions"""
+        crawlers, self._crawlers = self._crawlers, []
+        self._crawler_cycle = None
+        self._crawler_loop = None
+
+        for crawler in crawlers:
+            try:
+                await crawler.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing Crawl4AI crawler: {e}")
+
+        if crawlers:
+            self.logger.info("Closed shared Crawl4AI browser sessions")
+
+        for key, entry in sorted(self.selector_schema.get_hit_report().items()):
+            self.logger.info(f"Selector hits for {key}: {entry['hits']} "
+                             f"(misses {entry['misses']}, never hit: {entry.get('never_hit', [])})")
+
+    @asynccontextmanager
+    async def _crawler(self):
+        """Yield a warm shared crawler, or a throwaway one when the extractor was not started on this loop"""
+        if self._crawlers and self._crawler_loop is asyncio.get_running_loop():
+            # crawl4ai opens a new page per arun, so one crawler serves concurrent calls
+            yield next(self._crawler_cycle)
+            return
+
+        browser_config = BrowserConfig(headless=True, verbose=False)
+        async with AsyncWebCrawler(config=browser_config) as crawler:
+            yield crawler
+
     async def extract_page_listings_crawl4ai(self, page_url):
         """Extract video listings from a page using Crawl4AI listing schema"""
         try:
             self.logger.info(f"Extracting video listings from: {page_url}")
-            browser_config = BrowserConfig(headless=True, verbose=False)
             extraction_strategy = JsonCssExtractionStrategy(schema=self.listing_schema)
             crawler_config = CrawlerRunConfig(
                 extraction_strategy=extraction_strategy,
@@ -67,7 +112,7 @@ class VideoInfoExtractor:
                 js_code="window.scrollTo(0, document.body.scrollHeight);"
             )
 
-            async with AsyncWebCrawler(config=browser_config) as crawler:
+            async with self._crawler() as crawler:
                 result = await crawler.arun(url=page_url, config=crawler_config)
 
                 if result.success and result.extracted_content:
@@ -75,9 +120,16 @@ class VideoInfoExtractor:
                     self.logger.info(f"Successfully extracted {len(data)} video listings")
                     processed_listings = []
                     for item in data:
-                        processed_item = self.process_listing_item(item)
+                        processed_item = self.process_listing_item(self.listing_selectors.resolve_crawl4ai(item),
+                                                                   parse_date=False)
                         if processed_item:
                             processed_listings.append(processed_item)
+
+                    # One batch pass converts the page's upload dates (repeats are parsed once)
+                    dated = [item for item in processed_listings if item["upload_date"]]
+                    epochs = self.date_parser.parse_many([item["upload_date"] for item in dated])
+                    for item, epoch in zip(dated, epochs):
+                        item["upload_date_epoch"] = epoch
                     return processed_listings
                 else:
                     self.logger.error(f"Listing extraction failed: {result.error_message}")
@@ -87,8 +139,8 @@ class VideoInfoExtractor:
             self.logger.error(f"Error in Crawl4AI listing extraction: {e}")
             return []
 
-    def process_listing_item(self, raw_item):
-        """Process and clean a raw listing item"""
+    def process_listing_item(self, raw_item, parse_date=True):
+        """Process and clean a raw listing item (parse_date=False leaves the epoch to a batch pass)"""
         try:
             processed = {
                 "title": raw_item.get("title", "").strip(),
@@ -110,7 +162,7 @@ class VideoInfoExtractor:
                 processed["thumbnail"] = urljoin(self.base_url, processed["thumbnail"])
 
             # Parse upload date to epoch if possible
-            if processed["upload_date"]:
+            if parse_date and processed["upload_date"]:
                 epoch = self.date_parser.parse_upload_date_to_epoch(processed["upload_date"])
                 processed["upload_date_epoch"] = epoch
 
@@ -124,7 +176,6 @@ class VideoInfoExtractor:
         """Extract detailed video information using Crawl4AI detail schema"""
         try:
             self.logger.info(f"Extracting video details from: {video_url}")
-            browser_config = BrowserConfig(headless=True, verbose=False)
             extraction_strategy = JsonCssExtractionStrategy(schema=self.detail_schema)
             crawler_config = CrawlerRunConfig(
                 extraction_strategy=extraction_strategy,
@@ -143,12 +194,12 @@ class VideoInfoExtractor:
                 """
             )
 
-            async with AsyncWebCrawler(config=browser_config) as crawler:
+            async with self._crawler() as crawler:
                 result = await crawler.arun(url=video_url, config=crawler_config)
 
                 if result.success and result.extracted_content:
                     data = json.loads(result.extracted_content)
-                    detail_info = data[0] if data else {}
+                    detail_info = self.detail_selectors.resolve_crawl4ai(data[0]) if data else {}
                     self.logger.info(f"Successfully extracted detailed info")
                     return detail_info
                 else:
@@ -160,29 +211,53 @@ class VideoInfoExtractor:
             return {}
 
     async def parallel_extract_multiple_videos(self, video_urls):
-        """Extract details from multiple video URLs in parallel using Crawl4AI"""
+        """Extract details from multiple video URLs using a sliding window of Crawl4AI tasks.
+
+        A new extraction starts as soon as any running one finishes, so one slow page
+        no longer stalls a whole chunk. Results keep the order of video_urls; failed or
+        timed-out extractions yield {}.
+        """
         try:
-            self.logger.info(f"Starting parallel extraction for {len(video_urls)} videos")
-            # Create tasks for parallel execution
-            tasks = [self.extract_video_details_crawl4ai(url) for url in video_urls]
-            
-            # Execute all tasks in parallel with some concurrency control
-            batch_size = min(self.config.get("processing", {}).get("parallel_batch_size", 5), len(tasks))
-            results = []
-            
-            for i in range(0, len(tasks), batch_size):
-                batch = tasks[i:i + batch_size]
-                batch_results = await asyncio.gather(*batch, return_exceptions=True)
-                for result in batch_results:
-                    if isinstance(result, Exception):
-                        self.logger.error(f"Parallel extraction failed: {result}")
-                        results.append({})
-                    else:
-                        results.append(result)
-                        
-                # Small delay between batches
-                if i + batch_size < len(tasks):
-                    await asyncio.sleep(1)
+            processing_config = self.config.get("processing", {})
+            window_size = max(1, min(processing_config.get("parallel_batch_size", 5), len(video_urls) or 1))
+            task_timeout = processing_config.get("video_task_timeout_seconds", 120)
+            # Optional cap on extraction starts per second (0 disables it)
+            rate_limit = processing_config.get("max_extractions_per_second", 0)
+            min_interval = 1.0 / rate_limit if rate_limit and rate_limit > 0 else 0.0
+
+            self.logger.info(f"Starting sliding-window extraction for {len(video_urls)} videos "
+                             f"(window {window_size}, timeout {task_timeout}s)")
+
+            semaphore = asyncio.Semaphore(window_size)
+            rate_lock = asyncio.Lock()
+            next_start = [0.0]
+            results = [{}] * len(video_urls)
+
+            async def wait_for_rate_slot():
+                if not min_interval:
+                    return
+                async with rate_lock:
+                    loop = asyncio.get_running_loop()
+                    delay = next_start[0] - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    next_start[0] = loop.time() + min_interval
+
+            async def run_one(index, url):
+                async with semaphore:
+                    await wait_for_rate_slot()
+                    try:
+                        if task_timeout:
+                            results[index] = await asyncio.wait_for(
+                                self.extract_video_details_crawl4ai(url), timeout=task_timeout)
+                        else:
+                            results[index] = await self.extract_video_details_crawl4ai(url)
+                    except asyncio.TimeoutError:
+                        self.logger.error(f"Extraction timed out after {task_timeout}s: {url}")
+                    except Exception as e:
+                        self.logger.error(f"Parallel extraction failed for {url}: {e}")
+
+            await asyncio.gather(*(run_one(i, url) for i, url in enumerate(video_urls)))
 
             self.logger.info(f"Parallel extraction completed: {len(results)} results")
             return results
@@ -499,41 +574,8 @@ class VideoInfoExtractor:
 
     def parse_views_number(self, views_text):
         """Convert view text like '24K' to actual numbers, prioritizing parentheses numbers"""
-        if not views_text:
-            return 0
-
-        # CHANGE: Prioritize number inside parentheses first: e.g. "2.4K (24875)"
-        paren_match = re.search(r'\((\d+(?:,\d{3})*)\)', views_text)
-        if paren_match:
-            num = paren_match.group(1).replace(',', '')
-            try:
-                return int(num)
-            except:
-                pass
-
-        # Parse K/M/B suffixes or plain numbers
-        short_match = re.search(r'([\d,.]+)\s*([KkMmBb]?)', views_text)
-        if short_match:
-            num_str = short_match.group(1).replace(',', '')
-            suffix = short_match.group(2).upper()
-            try:
-                value = float(num_str)
-            except:
-                # fallback: extract digits only
-                digits = re.sub(r'\D', '', views_text)
-                return int(digits) if digits else 0
-
-            if suffix == 'K':
-                return int(value * 1_000)
-            if suffix == 'M':
-                return int(value * 1_000_000)
-            if suffix == 'B':
-                return int(value * 1_000_000_000)
-            return int(value)
-
-        # Final fallback: extract digits
-        digits = re.sub(r'\D', '', views_text)
-        return int(digits) if digits else 0
+        # Shared with the batch normaliser (new/numeric_normalizer.py) so both agree
+        return parse_count(views_text)
 
     def extract_item_info_data(self, video_info):
         """Extract duration, views, and upload date from info row elements - FIXED with correct selectors"""
@@ -1491,59 +1533,28 @@ class VideoInfoExtractor:
         try:
             self.logger.info("Extracting video source with quality selection...")
             
-            # Look for the download section
-            download_section_xpath = "//div[@class='row row_spacer']//div[@class='wrap'][.//div[@class='label' and text()='Download']]"
-            download_section = self.driver.find_element(By.XPATH, download_section_xpath)
-            self.logger.debug("Found download section")
-            
-            # Get all download links
-            download_links = download_section.find_elements(By.XPATH, ".//a[@class='tag_item']")
+            download_links = self.find_download_links()
             self.logger.info(f"Found {len(download_links)} download options")
             
             if not download_links:
                 self.logger.warning("No download links found in download section")
                 return self.extract_video_source_fallback()
             
-            # Extract all qualities with their URLs
-            quality_options = []
-            for link in download_links:
-                try:
-                    link_text = link.text.strip()
-                    link_url = link.get_attribute('href')
-                    
-                    if link_url and link_text:
-                        quality_info = self.parse_quality_from_text(link_text)
-                        if quality_info:
-                            quality_options.append({
-                                'text': link_text,
-                                'url': link_url,
-                                'quality': quality_info['quality'],
-                                'resolution': quality_info['resolution'],
-                                'priority': quality_info['priority']
-                            })
-                            self.logger.debug(f"Found quality option: {link_text} -> {quality_info['quality']}p (priority: {quality_info['priority']})")
-                
-                except Exception as e:
-                    self.logger.warning(f"Error processing download link: {e}")
-                    continue
-            
+            # Structured candidates; links without a readable quality are skipped
+            quality_options = [candidate for candidate in parse_candidates(download_links) if candidate.resolution]
             if not quality_options:
                 self.logger.warning("No valid quality options found")
                 return self.extract_video_source_fallback()
             
-            # Sort by priority (lower number = higher priority/better quality)
-            quality_options.sort(key=lambda x: x['priority'])
-            
             # Log all found qualities
-            qualities_found = [f"{opt['quality']}p" for opt in quality_options]
+            qualities_found = [f"{opt.resolution}p" for opt in quality_options]
             self.logger.info(f"Available qualities: {', '.join(qualities_found)}")
             
-            # Select the best quality (first after sorting)
-            best_quality = quality_options[0]
-            self.logger.info(f"Selected best quality: {best_quality['text']} ({best_quality['quality']}p)")
-            self.logger.info(f"Best quality URL: {best_quality['url']}")
+            best_quality = select_candidate(quality_options)
+            self.logger.info(f"Selected best quality: {best_quality.label} ({best_quality.resolution}p)")
+            self.logger.info(f"Best quality URL: {best_quality.url}")
             
-            return best_quality['url']
+            return best_quality.url
             
         except NoSuchElementException:
             self.logger.warning("Download section not found, trying fallback methods")
@@ -1555,45 +1566,16 @@ class VideoInfoExtractor:
     def parse_quality_from_text(self, text):
         """Parse quality information from link text like 'MP4 1080p' or '4K MP4'"""
         try:
-            text_lower = text.lower()
-            
-            # Quality mappings with priorities (lower = better)
-            quality_patterns = [
-                # 4K/2160p patterns
-                (r'(?:4k|2160p)', {'quality': 2160, 'resolution': '4K/2160p', 'priority': 1}),
-                (r'(?:1440p)', {'quality': 1440, 'resolution': '1440p', 'priority': 2}),
-                (r'(?:1080p)', {'quality': 1080, 'resolution': '1080p', 'priority': 3}),
-                (r'(?:720p)', {'quality': 720, 'resolution': '720p', 'priority': 4}),
-                (r'(?:480p)', {'quality': 480, 'resolution': '480p', 'priority': 5}),
-                (r'(?:360p?)', {'quality': 360, 'resolution': '360p', 'priority': 6}),
-                (r'(?:240p)', {'quality': 240, 'resolution': '240p', 'priority': 7}),
-            ]
-            
-            for pattern, quality_info in quality_patterns:
-                if re.search(pattern, text_lower):
-                    return quality_info
-            
-            # If no pattern matches, try to extract numbers
-            number_match = re.search(r'(\d{3,4})p?', text_lower)
-            if number_match:
-                quality_num = int(number_match.group(1))
-                if quality_num >= 2160:
-                    return {'quality': 2160, 'resolution': '4K/2160p', 'priority': 1}
-                elif quality_num >= 1440:
-                    return {'quality': 1440, 'resolution': '1440p', 'priority': 2}
-                elif quality_num >= 1080:
-                    return {'quality': 1080, 'resolution': '1080p', 'priority': 3}
-                elif quality_num >= 720:
-                    return {'quality': 720, 'resolution': '720p', 'priority': 4}
-                elif quality_num >= 480:
-                    return {'quality': 480, 'resolution': '480p', 'priority': 5}
-                elif quality_num >= 360:
-                    return {'quality': 360, 'resolution': '360p', 'priority': 6}
-                else:
-                    return {'quality': quality_num, 'resolution': f'{quality_num}p', 'priority': 8}
-            
-            return None
-            
+            height = parse_resolution(text, allow_bare_number=True)
+            if not height:
+                return None
+
+            # Priorities (lower = better) bucket odd heights into the standard tiers
+            for tier, resolution, priority in QUALITY_TIERS:
+                if height >= tier:
+                    return {'quality': tier, 'resolution': resolution, 'priority': priority}
+            return {'quality': height, 'resolution': f'{height}p', 'priority': 8}
+
         except Exception as e:
             self.logger.error(f"Error parsing quality from '{text}': {e}")
             return None
@@ -1673,30 +1655,36 @@ class VideoInfoExtractor:
             self.logger.error(f"Error in extract_video_source: {e}")
             return ""
 
+    def find_download_links(self):
+        """Text and URL of every link in the Download section (raises NoSuchElementException without one)"""
+        download_section_xpath = "//div[@class='row row_spacer']//div[@class='wrap'][.//div[@class='label' and text()='Download']]"
+        download_section = self.driver.find_element(By.XPATH, download_section_xpath)
+        self.logger.debug("Found download section")
+        
+        links = []
+        for link in download_section.find_elements(By.XPATH, ".//a[@class='tag_item']"):
+            try:
+                text = link.text.strip()
+                url = link.get_attribute('href')
+                if text and url:
+                    links.append({'text': text, 'url': url})
+            except Exception as e:
+                self.logger.warning(f"Error processing download link: {e}")
+        return links
+
     def extract_all_download_qualities(self):
         """Extract all available download qualities for debugging/logging"""
         try:
-            download_section_xpath = "//div[@class='row row_spacer']//div[@class='wrap'][.//div[@class='label' and text()='Download']]"
-            download_section = self.driver.find_element(By.XPATH, download_section_xpath)
-            
-            download_links = download_section.find_elements(By.XPATH, ".//a[@class='tag_item']")
-            
             qualities = []
-            for link in download_links:
-                try:
-                    text = link.text.strip()
-                    url = link.get_attribute('href')
-                    if text and url:
-                        quality_info = self.parse_quality_from_text(text)
-                        if quality_info:
-                            qualities.append({
-                                'text': text,
-                                'url': url,
-                                'quality': quality_info['quality'],
-                                'resolution': quality_info['resolution']
-                            })
-                except Exception as e:
-                    continue
+            for link in self.find_download_links():
+                quality_info = self.parse_quality_from_text(link['text'])
+                if quality_info:
+                    qualities.append({
+                        'text': link['text'],
+                        'url': link['url'],
+                        'quality': quality_info['quality'],
+                        'resolution': quality_info['resolution']
+                    })
             
             return qualities
             
@@ -339,6 +339,7 @@ class VideoProcessor:
             video_dir = download_path / video_id
             if video_dir.exists():
                 shutil.rmtree(video_dir)
+                self.file_downloader.storage_ledger.refresh(video_dir)
                 self.log_info(f"Removed incomplete folder: {video_dir}")
         except Exception as e:
             self.log_error(f"Error removing folder {video_id}: {e}")
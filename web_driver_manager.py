@@ -1,8 +1,19 @@
+import os
+import json
 import time
 import logging
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+# Readiness selectors per page kind (any match means the page is usable)
+LISTING_READY_SELECTORS = ["#custom_list_videos_latest_videos_list_items > div",
+                           "#custom_list_videos_most_recent_videos_items > div",
+                           "a.js-open-popup"]
+PAGINATION_READY_SELECTORS = ["#custom_list_videos_latest_videos_list_pagination a"]
+DETAIL_READY_SELECTORS = ["script[type='application/ld+json']", "video", "#tab_video_info"]
 
 class WebDriverManager:
     def __init__(self, config):
@@ -10,6 +21,11 @@ class WebDriverManager:
         self.driver = None
         self.base_url = "https://rule34video.com"
         self.logger = logging.getLogger('Rule34Scraper')
+        self.wait_timeout = 10  # Upper bound for readiness waits, in seconds
+        self.wait_metrics = {}
+        scraping_config = config.get("scraping", {})
+        self.session_state_file = scraping_config.get("session_state_file", "selenium_session_state.json")
+        self.session_state_max_age = scraping_config.get("session_state_max_age_hours", 24) * 3600
     
     def setup_driver(self):
         """Initialize Selenium WebDriver with Chrome options"""
@@ -40,6 +56,7 @@ class WebDriverManager:
         self.driver.implicitly_wait(10)
         self.driver.maximize_window()  # Maximize for better element visibility
         self.logger.info("WebDriver initialized successfully")
+        self.restore_session_state()
         return self.driver
     
     def handle_age_verification(self):
@@ -54,22 +71,132 @@ class WebDriverManager:
                 )
                 if age_buttons:
                     age_buttons[0].click()
-                    time.sleep(3)
+                    self.wait_until_stale(age_buttons[0], label="age_gate_dismiss", timeout=3)
                     self.logger.info("Handled age verification")
+                    self.save_session_state()
         except Exception as e:
             self.logger.warning(f"Age verification handling failed: {e}")
     
+    def load_session_state(self):
+        """Load saved age-gate cookies if they exist and have not expired"""
+        if not self.session_state_file or not os.path.exists(self.session_state_file):
+            return []
+        try:
+            with open(self.session_state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Could not read session state: {e}")
+            return []
+
+        now = time.time()
+        cookies = state.get("cookies", [])
+        if now - state.get("saved_at", 0) > self.session_state_max_age:
+            self.logger.info("Saved session state expired, age gate will be accepted again")
+            return []
+        if any(0 < cookie.get("expiry", -1) < now for cookie in cookies):
+            self.logger.info("Saved session cookies expired, age gate will be accepted again")
+            return []
+        return cookies
+
+    def restore_session_state(self):
+        """Add saved age-gate cookies to the driver so the popup is skipped"""
+        cookies = self.load_session_state()
+        if not cookies:
+            return False
+        try:
+            # Selenium only accepts cookies for the domain currently loaded
+            self.driver.get(self.base_url)
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception as e:
+                    self.logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+            self.logger.info(f"Restored {len(cookies)} saved session cookies")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not restore session state: {e}")
+            return False
+
+    def save_session_state(self):
+        """Save the current cookies after the age gate has been accepted"""
+        if not self.session_state_file:
+            return
+        try:
+            state = {"saved_at": time.time(), "cookies": self.driver.get_cookies()}
+            temp_path = f"{self.session_state_file}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_path, self.session_state_file)
+            self.logger.info(f"Saved session state to {self.session_state_file}")
+        except Exception as e:
+            self.logger.warning(f"Could not save session state: {e}")
+
     def navigate_to_page(self, url):
         """Navigate to specific page URL with error handling"""
         try:
             self.driver.get(url)
-            time.sleep(3)
+            self.wait_for_document_ready()
             self.handle_age_verification()
             return True
         except Exception as e:
             self.logger.error(f"Error navigating to {url}: {e}")
             return False
     
+    def wait_until_ready(self, css_selectors, label="ready", timeout=None):
+        """Wait until any of the CSS selectors is present instead of sleeping a fixed time"""
+        selector = ", ".join(css_selectors)
+        return self._timed_wait(
+            lambda driver: len(driver.find_elements(By.CSS_SELECTOR, selector)) > 0,
+            label, timeout
+        )
+
+    def wait_for_document_ready(self, label="document_ready", timeout=None):
+        """Wait until document.readyState is interactive or complete"""
+        return self._timed_wait(
+            lambda driver: driver.execute_script("return document.readyState") in ("interactive", "complete"),
+            label, timeout
+        )
+
+    def wait_until_stale(self, element, label="stale", timeout=None):
+        """Wait until an element is detached or hidden (e.g. a dismissed popup)"""
+        def _gone(driver):
+            try:
+                return not element.is_displayed()
+            except Exception:
+                return True
+        return self._timed_wait(_gone, label, timeout)
+
+    def _timed_wait(self, condition, label, timeout):
+        """Run a WebDriverWait condition and record how long it actually took"""
+        timeout = self.wait_timeout if timeout is None else timeout
+        start = time.monotonic()
+        ready = False
+        # Implicit waits would stretch every find_elements poll to the full implicit timeout
+        self.driver.implicitly_wait(0)
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(condition)
+            ready = True
+        except TimeoutException:
+            self.logger.debug(f"Readiness wait '{label}' timed out after {timeout}s")
+        finally:
+            self.driver.implicitly_wait(10)
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        metric = self.wait_metrics.setdefault(label, {"count": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0})
+        metric["count"] += 1
+        metric["total_ms"] += elapsed_ms
+        metric["max_ms"] = max(metric["max_ms"], elapsed_ms)
+        if not ready:
+            metric["timeouts"] += 1
+        return ready
+
+    def get_wait_metrics(self):
+        """Get readiness wait metrics per label"""
+        return {
+            label: {**metric, "avg_ms": metric["total_ms"] / metric["count"] if metric["count"] else 0.0}
+            for label, metric in self.wait_metrics.items()
+        }
+
     def close_driver(self):
         """Properly close and cleanup WebDriver instance"""
         if self.driver: